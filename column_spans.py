@@ -0,0 +1,74 @@
+# H.E.R.O. Remake - Índice vertical por columna
+# Para cada columna del mapa guarda las corridas de tiles sólidos y vacíos
+# (ordenadas por fila), así "el sólido más cercano arriba/abajo de (row, col)"
+# es una búsqueda binaria en lugar de recorrer la columna. La solidez es la de
+# TileGrid.is_solid (el relleno fuera del ancho de la fila cuenta como sólido).
+# Cuando un tile cambia se invalida solo su columna (listener del TileGrid) y
+# se reconstruye la próxima vez que se consulta.
+
+from bisect import bisect_right
+
+
+class ColumnSpanIndex:
+    """Corridas sólido/vacío por columna de un TileGrid"""
+
+    def __init__(self, grid):
+        self._grid = grid
+        self._columns = [None] * grid.max_width  # col -> (inicios, sólidas) o None
+        grid.add_listener(self._on_tile_changed)
+
+    def _on_tile_changed(self, row, col, old, new):
+        if 0 <= col < len(self._columns):
+            self._columns[col] = None
+
+    def _runs(self, col):
+        """(inicios, sólidas): fila donde empieza cada corrida y si es sólida.
+        Las corridas alternan sólido/vacío y cubren toda la columna."""
+        runs = self._columns[col]
+        if runs is None:
+            grid = self._grid
+            starts = []
+            solid = []
+            for row in range(grid.height):
+                s = grid.is_solid(row, col)
+                if not solid or s != solid[-1]:
+                    starts.append(row)
+                    solid.append(s)
+            runs = (starts, solid)
+            self._columns[col] = runs
+        return runs
+
+    def first_solid_up(self, row, col):
+        """Fila del primer tile sólido en col desde row hacia arriba (incluida),
+        o None si no hay ninguno dentro del mapa"""
+        if row < 0:
+            return None
+        if not 0 <= col < len(self._columns) or row >= self._grid.height:
+            return row  # fuera de límites cuenta como sólido
+        starts, solid = self._runs(col)
+        i = bisect_right(starts, row) - 1
+        if solid[i]:
+            return row
+        if i == 0:
+            return None
+        return starts[i] - 1  # última fila de la corrida sólida anterior
+
+    def first_solid_down(self, row, col):
+        """Fila del primer tile sólido en col desde row hacia abajo (incluida).
+        Si no hay ninguno retorna grid.height (debajo del mapa es sólido)."""
+        row = max(row, 0)
+        height = self._grid.height
+        if row >= height or not 0 <= col < len(self._columns):
+            return row  # fuera de límites cuenta como sólido
+        starts, solid = self._runs(col)
+        i = bisect_right(starts, row) - 1
+        if solid[i]:
+            return row
+        if i + 1 < len(starts):
+            return starts[i + 1]
+        return height
+
+
+def column_spans(grid):
+    """ColumnSpanIndex del grid (se construye la primera vez y queda cacheado)"""
+    return grid.derived('column_spans', ColumnSpanIndex)
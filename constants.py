@@ -19,6 +19,9 @@ from evgamelib.constants import (
 # Window dimensions
 TILE_SIZE = 32
 FPS = 60
+SIM_DT = 1 / 60          # Paso fijo de la simulación (60 Hz, independiente del render)
+MAX_SIM_STEPS = 5        # Pasos de recuperación por frame (más atraso se descarta)
+VEC_ENV_MAX_ENTITIES = 48  # Filas de entidades por observación en HeroVecEnv
 RENDER_SCALE = 1.5  # Escala de la superficie de juego al screen final
 
 # Viewport (tamaño visible en tiles)
@@ -45,6 +48,7 @@ PLAYER_SPEED_X = 150  # Velocidad horizontal
 WALK_STEP_DISTANCE = 16  # Pixeles entre pasos
 PLAYER_FOOT_INSET = 8    # Margen interior del hitbox de colision (hitbox = 16px centrado)
 MAX_FALL_SPEED = 400  # Velocidad máxima de caída
+SWEEP_SNAP_EPSILON = 1e-6  # Error de punto flotante tolerado al ajustar un contacto a píxel entero
 DIVE_POWER = 400      # Poder de descenso activo (helice invertida)
 LASER_SPEED = 600
 LASER_COOLDOWN = 0.12         # Segundos entre disparos (~8 disparos/seg)
@@ -56,6 +60,7 @@ ENERGY_DRAIN_FLYING = 150     # Energía por segundo volando
 MAX_ENERGY = 3000  # Suficiente para jugar un nivel
 DYNAMITE_FUSE_TIME = 1.5  # Tiempo antes de explotar (desde que se suelta)
 DYNAMITE_EXPLOSION_RADIUS = 64
+DESTRUCTIBLE_TILES = ('#', 'R', 'W')  # Tierra, rocas y roca lava (G, X indestructibles)
 DYNAMITE_QUANTITY = 5
 INITIAL_LIVES = 3
 MAX_LIVES = 3
@@ -238,10 +243,33 @@ ENEMY_TILE_CHARS = {'bat': 'V', 'spider': 'A', 'bug': 'B', 'snake_left': '<', 's
 
 # Scores file
 SCORES_FILE = _os.path.join(_BASE_DIR, "scores.json")
+SCORES_POLL_INTERVAL = 1.0  # Segundos entre chequeos de cambios externos en scores.json
 
 # Screens file (niveles del juego)
 SCREENS_FILE = _os.path.join(_BASE_DIR, "screens.json")
 
+# Cache de niveles compilados (mapa normalizado + overlays pre-generados)
+# Se llena al jugar o con: python hero.py --build-cache
+LEVEL_CACHE_DIR = _os.path.join(_BASE_DIR, ".level_cache")
+
+# Overlays por chunks del tamaño del viewport (se generan al entrar la cámara)
+OVERLAY_CHUNK_W = GAME_WIDTH
+OVERLAY_CHUNK_H = GAME_VIEWPORT_HEIGHT
+OVERLAY_CHUNK_CACHE_SIZE = 4  # Chunks en memoria por capa (LRU)
+STATIC_LAYER_CACHE_SIZE = 4   # Compuestos estáticos de viewport en memoria (LRU)
+HUD_BAR_CACHE_SIZE = 64       # Barras de energía del HUD en memoria, por ancho del relleno (LRU)
+TEXT_LINE_CACHE_SIZE = 64     # Líneas de texto compuestas desde el atlas de glifos (LRU)
+LASER_MASK_CACHE_SIZE = 16    # Masks llenas del tramo barrido por los láseres, por tamaño (LRU)
+
+# Presentación por rectángulos sucios (bloques de screen comparados por frame)
+PRESENT_BLOCK_W = 32
+PRESENT_BLOCK_H = 16
+PRESENT_FULL_RATIO = 0.6  # Si cambia más que esta fracción de screen, flip completo
+
+# Índice espacial de entidades: celdas dentro de cada viewport (deben dividirlo exacto)
+SPATIAL_CELL_W = GAME_WIDTH // 4
+SPATIAL_CELL_H = GAME_VIEWPORT_HEIGHT // 2
+
 # SID Audio Effects (Commodore 64 emulation)
 SID_INTENSITY = 'light'  # 'light', 'medium', o 'heavy'
 SID_BITDEPTH = 8         # bits (1-8)
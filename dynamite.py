@@ -3,6 +3,8 @@
 import pygame
 from constants import *
 from evgamelib.entity import PhysicsEntity
+from tilegrid import as_grid
+from column_spans import column_spans
 
 class Dynamite(PhysicsEntity):
     def __init__(self, x, y):
@@ -14,10 +16,13 @@ class Dynamite(PhysicsEntity):
         self.explosion_sprites = []  # bomb1, bomb2, bomb3 sprites
         # Límites del viewport donde se colocó (explosión no puede afectar otro viewport)
         self.vp_left, self.vp_top, self.vp_right, self.vp_bottom = get_viewport_bounds(x, y)
+        # Tiles destruidos por la explosión: (row, col, tile_anterior). None hasta
+        # que se resuelve la explosión (una sola vez, al detonar)
+        self.destroyed_tiles = None
 
     def check_collision(self, x, y, level_map):
         """Check collision with tiles"""
-        level_h = len(level_map) if level_map else 0
+        level_map = as_grid(level_map)
         # Check bottom corners
         corners = [
             (x + 2, y + self.height - 1),
@@ -28,17 +33,21 @@ class Dynamite(PhysicsEntity):
             tile_x = int(corner_x / TILE_SIZE)
             tile_y = int(corner_y / TILE_SIZE)
 
-            if tile_y < 0 or tile_y >= level_h:
-                return True
-            if tile_x < 0 or tile_x >= len(level_map[tile_y]):
-                return True
-
-            tile = level_map[tile_y][tile_x]
-            if tile in SOLID_TILES:
+            # Fuera de límites cuenta como sólido
+            if level_map.is_solid(tile_y, tile_x):
                 return True
 
         return False
 
+    def floor_y(self, level_map):
+        """Y del primer piso sólido bajo las esquinas inferiores (mismas que
+        check_collision), buscado en el índice vertical por columna"""
+        spans = column_spans(as_grid(level_map))
+        tile_y = int((self.y + self.height - 1) / TILE_SIZE)
+        floor_row = min(spans.first_solid_down(tile_y, int((self.x + 2) / TILE_SIZE)),
+                        spans.first_solid_down(tile_y, int((self.x + self.width - 3) / TILE_SIZE)))
+        return floor_row * TILE_SIZE
+
     def update(self, dt, level_map):
         if not self.exploded:
             # Apply gravity if not on ground
@@ -46,8 +55,8 @@ class Dynamite(PhysicsEntity):
                 self.vel_y += GRAVITY * 0.3 * dt  # Cae más lento
                 new_y = self.y + self.vel_y * dt
 
-                # Check if would collide
-                if self.check_collision(self.x, new_y, level_map):
+                # Check if would collide (piso de sus columnas vía el índice vertical)
+                if new_y + self.height - 1 >= self.floor_y(level_map):
                     # Stop falling
                     self.vel_y = 0
                     self.on_ground = True
@@ -78,6 +87,31 @@ class Dynamite(PhysicsEntity):
             return raw.clip(vp_rect)
         return None
 
+    def blast_tiles(self):
+        """(row, col) de los tiles que toca el rect de explosión, calculados
+        directo desde el rect (no depende del tamaño del mapa)"""
+        rect = self.get_explosion_rect()
+        if rect is None or rect.width <= 0 or rect.height <= 0:
+            return []
+        return [(row, col)
+                for row in range(rect.top // TILE_SIZE, (rect.bottom - 1) // TILE_SIZE + 1)
+                for col in range(rect.left // TILE_SIZE, (rect.right - 1) // TILE_SIZE + 1)]
+
+    def resolve_blast(self, level_map):
+        """Destruye los tiles destructibles dentro de la explosión. Se aplica una
+        sola vez: retorna la lista de (row, col, tile_anterior) destruidos, o None
+        si ya estaba resuelta (o todavía no explotó)."""
+        if not self.exploded or self.destroyed_tiles is not None:
+            return None
+        level_map = as_grid(level_map)
+        self.destroyed_tiles = []
+        for row, col in self.blast_tiles():
+            tile = level_map.tile(row, col)
+            if tile in DESTRUCTIBLE_TILES:
+                level_map.set(row, col, ' ')
+                self.destroyed_tiles.append((row, col, tile))
+        return self.destroyed_tiles
+
     def draw(self, screen, camera_x, camera_y):
         screen_x = self.x - camera_x
         screen_y = self.y - camera_y
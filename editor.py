@@ -15,6 +15,10 @@ import palette as palette_module
 from palette import (get_depth_palette, get_edge_color, build_tinted_floors,
                      draw_tile_edges, DEFAULT_EDGE_COLOR, NEUTRAL_TINT,
                      generate_floor_texture, generate_edge_overlay)
+from tilegrid import TileGrid, as_grid
+from level_cache import normalize_level_rows
+from level_analysis import (level_analyzer, STATUS_OK, STATUS_NO_ENERGY,
+                            STATUS_NO_START, STATUS_NO_MINER, STATUS_UNREACHABLE)
 
 # TILE_TYPES importado desde constants.py
 
@@ -29,10 +33,16 @@ def load_screens():
     return []
 
 def save_screens(screens):
-    """Guardar pantallas a archivo JSON"""
+    """Guardar pantallas a archivo JSON (los TileGrid se guardan como lista de strings)"""
+    data = []
+    for screen in screens:
+        level_map = screen.get("map")
+        if isinstance(level_map, TileGrid):
+            screen = dict(screen, map=level_map.to_rows())
+        data.append(screen)
     try:
         with open(SCREENS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(screens, f, indent=2, ensure_ascii=False)
+            json.dump(data, f, indent=2, ensure_ascii=False)
         return True
     except Exception as e:
         print(f"Error guardando screens: {e}")
@@ -42,35 +52,14 @@ def normalize_map(level_map):
     """Normalizar mapa por banda de viewport (cada banda tiene su propio ancho)"""
     if not level_map:
         return ['#' * VIEWPORT_COLS] * VIEWPORT_ROWS
-
-    map_height = len(level_map)
-
-    # Normalizar altura total a múltiplo de VIEWPORT_ROWS
-    target_h = max(VIEWPORT_ROWS, ((map_height + VIEWPORT_ROWS - 1) // VIEWPORT_ROWS) * VIEWPORT_ROWS)
-    while len(level_map) < target_h:
-        level_map.append('#' * VIEWPORT_COLS)
-
-    # Normalizar por banda: cada grupo de VIEWPORT_ROWS filas tiene su propio ancho
-    result = []
-    for band_start in range(0, target_h, VIEWPORT_ROWS):
-        band_end = min(band_start + VIEWPORT_ROWS, len(level_map))
-        band_rows = level_map[band_start:band_end]
-        band_w = max(len(r) for r in band_rows) if band_rows else VIEWPORT_COLS
-        target_band_w = max(VIEWPORT_COLS, ((band_w + VIEWPORT_COLS - 1) // VIEWPORT_COLS) * VIEWPORT_COLS)
-        for row in band_rows:
-            if len(row) < target_band_w:
-                row = row + '#' * (target_band_w - len(row))
-            result.append(row[:target_band_w])
-        # Completar filas faltantes de la banda
-        while len(result) < band_start + VIEWPORT_ROWS:
-            result.append('#' * target_band_w)
-    return result[:target_h]
+    return normalize_level_rows(level_map)
 
 def get_map_dims(level_map):
     """Obtener dimensiones del mapa en tiles (ancho = máximo entre filas)"""
-    h = len(level_map) if level_map else VIEWPORT_ROWS
-    w = max(len(row) for row in level_map) if level_map else VIEWPORT_COLS
-    return w, h
+    if not level_map:
+        return VIEWPORT_COLS, VIEWPORT_ROWS
+    grid = as_grid(level_map)
+    return grid.max_width, grid.height
 
 class Editor:
     def __init__(self):
@@ -214,7 +203,7 @@ class Editor:
 
         # Normalizar todas las pantallas cargadas
         for screen in self.screens:
-            screen["map"] = normalize_map(screen["map"])
+            screen["map"] = TileGrid(normalize_map(screen["map"]))
 
         if not self.screens:
             self.new_level()
@@ -231,7 +220,7 @@ class Editor:
                 empty_map.append('#' + ' ' * (w - 2) + '#')
         self.screens.append({
             "name": f"Level {len(self.screens) + 1}",
-            "map": empty_map
+            "map": TileGrid(empty_map)
         })
         self.dirty = True
         self.current_level = len(self.screens) - 1
@@ -246,6 +235,16 @@ class Editor:
     def get_current_map(self):
         return self.screens[self.current_level]["map"]
 
+    def _replace_current_map(self, rows):
+        """Reemplaza el mapa actual tras un cambio de estructura (agregar/quitar viewports)"""
+        self.screens[self.current_level]["map"] = TileGrid(rows)
+
+    def _band_width_at(self, row):
+        """Ancho en tiles de la banda que contiene la fila"""
+        level_map = self.get_current_map()
+        band_start = (row // VIEWPORT_ROWS) * VIEWPORT_ROWS
+        return level_map.row_width(band_start) or VIEWPORT_COLS
+
     def get_current_palette(self):
         """Obtener paleta de profundidad del nivel actual"""
         return self.screens[self.current_level].get("depth_palette", [])
@@ -297,49 +296,45 @@ class Editor:
     def get_viewport_grid(self):
         """Lista de viewport-cols por cada banda de viewport-rows"""
         level_map = self.get_current_map()
-        h = len(level_map) if level_map else VIEWPORT_ROWS
+        h = level_map.height if level_map else VIEWPORT_ROWS
         num_bands = h // VIEWPORT_ROWS
         band_vp_cols = []
         for band in range(num_bands):
-            band_start = band * VIEWPORT_ROWS
-            w = len(level_map[band_start]) if band_start < len(level_map) else VIEWPORT_COLS
+            w = self._band_width_at(band * VIEWPORT_ROWS)
             band_vp_cols.append(w // VIEWPORT_COLS)
         return band_vp_cols
 
 
     def _clamp_cursor_col(self):
         """Clampear cursor_col al ancho de la banda actual"""
-        level_map = self.get_current_map()
-        band_start = (self.cursor_row // VIEWPORT_ROWS) * VIEWPORT_ROWS
-        band_w = len(level_map[band_start]) if band_start < len(level_map) else VIEWPORT_COLS
+        band_w = self._band_width_at(self.cursor_row)
         self.cursor_col = max(0, min(band_w - 1, self.cursor_col))
 
     def set_tile(self, row, col, char):
         """Colocar un tile en la posicion dada"""
         level_map = self.get_current_map()
-        if 0 <= row < len(level_map) and 0 <= col < len(level_map[row]):
-            row_str = level_map[row]
-            if row_str[col] != char:
-                level_map[row] = row_str[:col] + char + row_str[col + 1:]
-                self.dirty = True
+        if level_map.in_bounds(row, col) and level_map.tile(row, col) != char:
+            level_map.set(row, col, char)
+            self.dirty = True
 
     def add_viewport_cols(self):
         """Agregar un viewport (VIEWPORT_COLS columnas) a la derecha de la banda actual"""
-        level_map = self.get_current_map()
+        level_map = self.get_current_map().to_rows()
         band_start = (self.cursor_row // VIEWPORT_ROWS) * VIEWPORT_ROWS
         band_end = min(band_start + VIEWPORT_ROWS, len(level_map))
         extra = ' ' * VIEWPORT_COLS
         for i in range(band_start, band_end):
             level_map[i] = level_map[i] + extra
+        self._replace_current_map(level_map)
         self.dirty = True
         self.invalidate_tinted_cache()
 
     def remove_viewport_col_at(self, vx):
         """Quitar la columna de viewports en el indice vx (solo banda actual)"""
-        level_map = self.get_current_map()
+        level_map = self.get_current_map().to_rows()
         band_start = (self.cursor_row // VIEWPORT_ROWS) * VIEWPORT_ROWS
         band_end = min(band_start + VIEWPORT_ROWS, len(level_map))
-        band_w = len(level_map[band_start]) if band_start < len(level_map) else VIEWPORT_COLS
+        band_w = self._band_width_at(self.cursor_row)
         if band_w <= VIEWPORT_COLS:
             return False
 
@@ -350,6 +345,7 @@ class Editor:
 
         for i in range(band_start, band_end):
             level_map[i] = level_map[i][:start_c] + level_map[i][end_c:]
+        self._replace_current_map(level_map)
 
         new_band_w = band_w - VIEWPORT_COLS
         # Ajustar cursor y cámara si quedan fuera
@@ -368,18 +364,19 @@ class Editor:
 
     def add_viewport_rows(self):
         """Agregar un viewport (VIEWPORT_ROWS filas) abajo"""
-        level_map = self.get_current_map()
+        level_map = self.get_current_map().to_rows()
         # Usar ancho de la última banda existente como default
         last_band_start = max(0, len(level_map) - VIEWPORT_ROWS)
         w = len(level_map[last_band_start]) if level_map else VIEWPORT_COLS
         for _ in range(VIEWPORT_ROWS):
             level_map.append(' ' * w)
+        self._replace_current_map(level_map)
         self.dirty = True
         self.invalidate_tinted_cache()
 
     def remove_viewport_row_at(self, vy):
         """Quitar la fila de viewports en el indice vy"""
-        level_map = self.get_current_map()
+        level_map = self.get_current_map().to_rows()
         _, h = self.get_level_dims()
         if h <= VIEWPORT_ROWS:
             return False
@@ -387,6 +384,7 @@ class Editor:
         start_r = vy * VIEWPORT_ROWS
         end_r = start_r + VIEWPORT_ROWS
         del level_map[start_r:end_r]
+        self._replace_current_map(level_map)
 
         new_h = h - VIEWPORT_ROWS
         # Ajustar cursor y cámara si quedan fuera
@@ -406,20 +404,18 @@ class Editor:
     def _has_content_in_region(self, start_row, end_row, start_col, end_col):
         """Verifica si hay contenido no-pared en una region del mapa"""
         level_map = self.get_current_map()
-        for r in range(start_row, min(end_row, len(level_map))):
-            for c in range(start_col, min(end_col, len(level_map[r]))):
-                if level_map[r][c] not in ('#', ' '):
+        for r in range(start_row, min(end_row, level_map.height)):
+            for c in range(start_col, min(end_col, level_map.row_width(r))):
+                if level_map.tile(r, c) not in ('#', ' '):
                     return True
         return False
 
     def update_camera(self):
         """Cámara fija por bloques de viewport en ambos ejes (ancho por banda)"""
-        level_map = self.get_current_map()
         _, h = self.get_level_dims()
 
         # Ancho de la banda actual del cursor
-        band_start = (self.cursor_row // VIEWPORT_ROWS) * VIEWPORT_ROWS
-        band_w = len(level_map[band_start]) if band_start < len(level_map) else VIEWPORT_COLS
+        band_w = self._band_width_at(self.cursor_row)
 
         # Bloque horizontal
         block_x = VIEWPORT_COLS * TILE_SIZE
@@ -456,12 +452,12 @@ class Editor:
         end_col = min(w, int((cam_x + GAME_WIDTH) / TILE_SIZE) + 2)
 
         for row_index in range(start_row, end_row):
-            if row_index >= len(level_map):
+            if row_index >= level_map.height:
                 break
-            row = level_map[row_index]
+            row_w = level_map.row_width(row_index)
             local_row = row_index % VIEWPORT_ROWS
             for col_index in range(start_col, end_col):
-                if col_index >= len(row):
+                if col_index >= row_w:
                     # Espacio fuera de la banda: mostrar como pared
                     x = col_index * TILE_SIZE - cam_x
                     y = row_index * TILE_SIZE - cam_y
@@ -474,7 +470,7 @@ class Editor:
                     pygame.draw.rect(self.screen, (40, 40, 40),
                                      (int(x), int(y), TILE_SIZE, TILE_SIZE), 1)
                     continue
-                tile = row[col_index]
+                tile = level_map.tile(row_index, col_index)
                 x = col_index * TILE_SIZE - cam_x
                 y = row_index * TILE_SIZE - cam_y
 
@@ -635,8 +631,7 @@ class Editor:
 
         # Linea 2: Posicion del cursor + tile actual
         current_map = self.get_current_map()
-        row_data = current_map[self.cursor_row] if self.cursor_row < len(current_map) else ''
-        cursor_char = row_data[self.cursor_col] if self.cursor_col < len(row_data) else '#'
+        cursor_char = current_map.tile(self.cursor_row, self.cursor_col) or '#'
         cursor_name = next((n for c, n, *_ in TILE_TYPES if c == cursor_char), '?')
 
         # Viewport actual del cursor
@@ -659,6 +654,19 @@ class Editor:
         tile_text = self.font.render(f"[{char}] {name}", True, COLOR_YELLOW)
         self.screen.blit(tile_text, (8, hud_y + 32))
 
+        # Análisis del nivel (se recalcula solo si cambió algún tile)
+        analysis = level_analyzer(current_map).result()
+        if analysis.status in (STATUS_OK, STATUS_NO_ENERGY):
+            pct = int(analysis.energy * 100 / MAX_ENERGY)
+            label = "OK" if analysis.ok else "SIN ENERGIA"
+            analysis_str = f"M:{label} E{pct}% B{analysis.bombs}"
+        else:
+            analysis_str = {STATUS_NO_START: "FALTA S", STATUS_NO_MINER: "FALTA M"}.get(
+                analysis.status, "M INALCANZABLE")
+        analysis_text = self.font.render(analysis_str, True,
+                                         COLOR_GREEN if analysis.ok else COLOR_RED)
+        self.screen.blit(analysis_text, (8 + tile_text.get_width() + 16, hud_y + 32))
+
         # --- Zona de paleta (abajo) ---
         KEY_LABELS = "123456789" + "FGHJKLZ"
         tiles_per_row = 8
@@ -1552,9 +1560,7 @@ class Editor:
                             self.add_viewport_cols()
                         else:
                             # Clamp al ancho de la banda actual
-                            level_map = self.get_current_map()
-                            band_start = (self.cursor_row // VIEWPORT_ROWS) * VIEWPORT_ROWS
-                            band_w = len(level_map[band_start]) if band_start < len(level_map) else VIEWPORT_COLS
+                            band_w = self._band_width_at(self.cursor_row)
                             self.cursor_col = min(band_w - 1, self.cursor_col + 1)
                             if shift or keys[pygame.K_SPACE]:
                                 self.set_tile(self.cursor_row, self.cursor_col,
@@ -1617,11 +1623,17 @@ class Editor:
                     # Guardar (Ctrl+S)
                     elif event.key == pygame.K_s and ctrl:
                         for i, screen in enumerate(self.screens):
-                            flat = ''.join(screen['map'])
+                            flat = ''.join(screen['map'].to_rows())
                             if flat.count('S') != 1:
                                 print(f"ADVERTENCIA: Nivel {i+1} debe tener exactamente 1 tile S (Start)")
                             if flat.count('M') != 1:
                                 print(f"ADVERTENCIA: Nivel {i+1} debe tener exactamente 1 tile M (Minero)")
+                            analysis = level_analyzer(screen['map']).result()
+                            if analysis.status == STATUS_NO_ENERGY:
+                                print(f"ADVERTENCIA: Nivel {i+1} necesita ~{analysis.energy:.0f} de energía "
+                                      f"(máximo {MAX_ENERGY})")
+                            elif analysis.status == STATUS_UNREACHABLE:
+                                print(f"ADVERTENCIA: Nivel {i+1}: el minero no es alcanzable desde el inicio")
                         if save_screens(self.screens):
                             self.saved_indicator = 2.0
                             self.dirty = False
@@ -1710,9 +1722,7 @@ class Editor:
                             self.cursor_col = 0
 
                     elif event.key == pygame.K_x:
-                        level_map = self.get_current_map()
-                        band_start = (self.cursor_row // VIEWPORT_ROWS) * VIEWPORT_ROWS
-                        band_w = len(level_map[band_start]) if band_start < len(level_map) else VIEWPORT_COLS
+                        band_w = self._band_width_at(self.cursor_row)
                         current_block = self.cursor_col // VIEWPORT_COLS
                         max_block = (band_w // VIEWPORT_COLS) - 1
                         if current_block < max_block:
@@ -4,17 +4,22 @@ import pygame
 import random
 from constants import *
 from evgamelib.entity import AnimatedEntity
+from tilegrid import as_grid
+from column_spans import column_spans
+from sprite_atlas import PLAIN_MODE
 
 class Enemy(AnimatedEntity):
-    def __init__(self, x, y, enemy_type="bat"):
+    def __init__(self, x, y, enemy_type="bat", rng=None):
         super().__init__(x, y, 32, 32)
+        # Stream de aleatoriedad del nivel (random.Random); sin stream, el global
+        self.rng = rng or random
         self.start_x = x
         self.start_y = y
         self.enemy_type = enemy_type
         speed_table = {"bat": BAT_SPEED, "spider": SPIDER_SPEED, "bug": BUG_SPEED,
                        "snake_left": SNAKE_EMERGE_SPEED, "snake_right": SNAKE_EMERGE_SPEED}
         self.speed = speed_table.get(enemy_type, BAT_SPEED)
-        self.direction = random.choice([-1, 1])
+        self.direction = self.rng.choice([-1, 1])
         self.active = True
         if enemy_type == "bat":
             self.width = 22
@@ -53,13 +58,12 @@ class Enemy(AnimatedEntity):
         if enemy_type in ("snake_left", "snake_right"):
             self.snake_facing = -1 if enemy_type == "snake_left" else 1  # dirección de salida
             self.snake_state = "hidden"  # hidden, emerging, extended, retracting
-            self.snake_timer = random.uniform(0.5, SNAKE_HIDDEN_TIME)  # tiempo inicial aleatorio
+            self.snake_timer = self.rng.uniform(0.5, SNAKE_HIDDEN_TIME)  # tiempo inicial aleatorio
             self.snake_extend = 0.0  # 0.0 = escondida, TILE_SIZE = totalmente fuera
             self.wall_row = int(y / TILE_SIZE)
             self.wall_col = int(x / TILE_SIZE)
-            # Sprites asignados desde Game: snake_head, snake_neck
-            self.snake_head_sprite = None
-            self.snake_neck_sprite = None
+            # SnakeBank asignado desde Game (compuestos cuello+cabeza por extensión)
+            self.snake_bank = None
 
         # Bicho: se mueve en zona 3x3 tiles alrededor del spawn, clipeada al viewport
         if enemy_type == "bug":
@@ -70,7 +74,7 @@ class Enemy(AnimatedEntity):
             self.bug_zone_min_y = max((spawn_row - 1) * TILE_SIZE, self.vp_top)
             self.bug_zone_max_y = min((spawn_row + 2) * TILE_SIZE - self.height, self.vp_bottom - self.height)
             # Dirección inicial aleatoria (incluye diagonales)
-            angle = random.uniform(0, 2 * 3.14159)
+            angle = self.rng.uniform(0, 2 * 3.14159)
             import math
             self.bug_dx = math.cos(angle)
             self.bug_dy = math.sin(angle)
@@ -78,7 +82,7 @@ class Enemy(AnimatedEntity):
 
     def check_collision(self, x, y, level_map):
         """Check collision with tiles using all 4 corners (margen de 1px)"""
-        level_h = len(level_map) if level_map else 0
+        level_map = as_grid(level_map)
         corners = [
             (x + 1, y + 1),
             (x + self.width - 2, y + 1),
@@ -90,13 +94,8 @@ class Enemy(AnimatedEntity):
             tile_x = int(corner_x / TILE_SIZE)
             tile_y = int(corner_y / TILE_SIZE)
 
-            if tile_y < 0 or tile_y >= level_h:
-                return True
-            if tile_x < 0 or tile_x >= len(level_map[tile_y]):
-                return True
-
-            tile = level_map[tile_y][tile_x]
-            if tile in SOLID_TILES:
+            # Fuera de límites cuenta como sólido
+            if level_map.is_solid(tile_y, tile_x):
                 return True
 
         return False
@@ -105,18 +104,16 @@ class Enemy(AnimatedEntity):
         """Busca el techo más cercano arriba de la posición de spawn de la araña"""
         tile_x = int((self.start_x + self.width // 2) / TILE_SIZE)
         start_tile_y = int(self.start_y / TILE_SIZE)
-
-        for tile_y in range(start_tile_y - 1, -1, -1):
-            if 0 <= tile_y < len(level_map) and 0 <= tile_x < len(level_map[tile_y]):
-                tile = level_map[tile_y][tile_x]
-                if tile in SOLID_TILES:
-                    # El fondo del tile sólido
-                    return (tile_y + 1) * TILE_SIZE
-        return None
+        tile_y = column_spans(as_grid(level_map)).first_solid_up(start_tile_y - 1, tile_x)
+        if tile_y is None:
+            return None
+        # El fondo del tile sólido
+        return (tile_y + 1) * TILE_SIZE
 
     def update(self, dt, level_map):
         if not self.active:
             return
+        level_map = as_grid(level_map)
 
         # Handle explosion animation
         if self.exploding:
@@ -156,10 +153,10 @@ class Enemy(AnimatedEntity):
             self.bug_change_timer -= dt
             if self.bug_change_timer <= 0:
                 # Nueva dirección aleatoria (cualquier ángulo, incluye diagonales)
-                angle = random.uniform(0, 2 * math.pi)
+                angle = self.rng.uniform(0, 2 * math.pi)
                 self.bug_dx = math.cos(angle)
                 self.bug_dy = math.sin(angle)
-                self.bug_change_timer = random.uniform(0.3, 1.0)
+                self.bug_change_timer = self.rng.uniform(0.3, 1.0)
 
             new_x = self.x + self.bug_dx * self.speed * dt
             new_y = self.y + self.bug_dy * self.speed * dt
@@ -194,10 +191,10 @@ class Enemy(AnimatedEntity):
 
             if bounced:
                 # Rebotar: nueva dirección aleatoria
-                angle = random.uniform(0, 2 * math.pi)
+                angle = self.rng.uniform(0, 2 * math.pi)
                 self.bug_dx = math.cos(angle)
                 self.bug_dy = math.sin(angle)
-                self.bug_change_timer = random.uniform(0.3, 1.0)
+                self.bug_change_timer = self.rng.uniform(0.3, 1.0)
 
             # Animación de alas (cicla entre 4 frames)
             if self.images:
@@ -211,15 +208,19 @@ class Enemy(AnimatedEntity):
             # Arañas bajan desde el spawn hasta 2 tiles y vuelven al techo
             new_y = self.y + self.direction * self.speed * dt
 
-            # Colisión con tiles: rebotar contra pared/piso
-            if self.check_collision(self.x, new_y, level_map):
-                if self.direction > 0:  # bajando
-                    tile_y = int((new_y + self.height) / TILE_SIZE)
-                    self.y = tile_y * TILE_SIZE - self.height
-                else:  # subiendo
-                    tile_y = int(new_y / TILE_SIZE)
-                    self.y = (tile_y + 1) * TILE_SIZE
-                self.direction *= -1
+            # Rebotar contra piso/techo de su columna (índice vertical del mapa)
+            spans = column_spans(level_map)
+            tile_x = int((self.x + self.width // 2) / TILE_SIZE)
+            tile_y = int((self.y + self.height // 2) / TILE_SIZE)
+            floor_y = spans.first_solid_down(tile_y, tile_x) * TILE_SIZE - self.height
+            ceiling_row = spans.first_solid_up(tile_y, tile_x)
+            ceiling_y = None if ceiling_row is None else (ceiling_row + 1) * TILE_SIZE
+            if new_y > floor_y and self.direction > 0:
+                self.y = floor_y
+                self.direction = -1
+            elif ceiling_y is not None and new_y < ceiling_y and self.direction < 0:
+                self.y = ceiling_y
+                self.direction = 1
             else:
                 # Límite inferior: máximo 2 tiles abajo del spawn
                 if new_y > self.spider_max_y:
@@ -292,6 +293,16 @@ class Enemy(AnimatedEntity):
                 return pygame.Rect(wall_x + TILE_SIZE, body_y, ext, body_h)
         return pygame.Rect(self.x, self.y, self.width, self.height)
 
+    def get_bounds(self):
+        """Rect que contiene cualquier hitbox posible de la entidad en su posición
+        actual (para el índice espacial). La víbora cubre su pared y los tiles a
+        ambos lados, así no hay que reubicarla al salir o esconderse."""
+        if self.enemy_type in ("snake_left", "snake_right"):
+            return pygame.Rect((self.wall_col - 1) * TILE_SIZE, self.wall_row * TILE_SIZE,
+                               3 * TILE_SIZE, TILE_SIZE)
+        # +1: get_rect trunca x/y, las masks se ubican con la posición float
+        return pygame.Rect(int(self.x), int(self.y), self.width + 1, self.height + 1)
+
     def _draw_snake(self, screen, camera_x, camera_y, wall_tile=None,
                     tinted_floors=None, floor_texture=None):
         """Dibuja la víbora saliendo por detrás de la pared (estilo C64).
@@ -312,28 +323,11 @@ class Enemy(AnimatedEntity):
                 -80 < wall_sx < GAME_WIDTH + 80):
             return
 
-        facing_left = (self.snake_facing < 0)
-        # Centrar el cuerpo verticalmente dentro del tile
-        body_oy = (TILE_SIZE - SNAKE_BODY_H) // 2
-
-        # Dibujar cuello desde el borde de la pared hasta la cabeza
-        if ext > 0 and self.snake_neck_sprite:
-            neck_scaled = pygame.transform.scale(self.snake_neck_sprite, (ext, SNAKE_BODY_H))
-            if facing_left:
-                screen.blit(neck_scaled, (int(wall_sx - ext), wall_sy + body_oy))
-            else:
-                screen.blit(neck_scaled, (int(wall_sx + TILE_SIZE), wall_sy + body_oy))
-
-        # Cabeza en la punta, centrada verticalmente
-        if self.snake_head_sprite:
-            head_w = self.snake_head_sprite.get_width()
-            head_h = self.snake_head_sprite.get_height()
-            head_oy = (TILE_SIZE - head_h) // 2
-            if facing_left:
-                head_x = wall_sx - ext
-            else:
-                head_x = wall_sx + TILE_SIZE + ext - head_w
-            screen.blit(self.snake_head_sprite, (int(head_x), wall_sy + head_oy))
+        # Cuello desde el borde de la pared + cabeza en la punta (compuesto del banco)
+        if self.snake_bank:
+            body, dx, dy = self.snake_bank.frame(self.snake_facing, ext)
+            if body:
+                screen.blit(body, (wall_sx + dx, wall_sy + dy))
 
         # Redibujar el tile de suelo + textura ENCIMA para tapar la parte adentro
         # 1) Tile de suelo tintado según la fila del viewport
@@ -349,10 +343,12 @@ class Enemy(AnimatedEntity):
         # 2) Fragmento de floor_texture (patrón negro C64) encima del tile
         if floor_texture:
             tile_rect = pygame.Rect(wall_x, wall_y, TILE_SIZE, TILE_SIZE)
-            screen.blit(floor_texture, (wall_sx, wall_sy), tile_rect)
+            floor_texture.blit_area(screen, (wall_sx, wall_sy), tile_rect)
 
     def draw(self, screen, camera_x, camera_y, level_map=None, wall_tile=None,
-             tinted_floors=None, floor_texture=None):
+             tinted_floors=None, floor_texture=None, mode=PLAIN_MODE):
+        """mode: RenderMode con las variantes de los sprites y los colores de
+        las primitivas (en oscuridad la víbora queda oculta con su pared)"""
         # Víbora se dibuja con método propio
         if self.enemy_type in ("snake_left", "snake_right"):
             if self.exploding:
@@ -367,9 +363,9 @@ class Enemy(AnimatedEntity):
                         r = radius - i * 5
                         if r > 0:
                             color = (139, 69, 19) if i == 0 else (101, 67, 33)
-                            pygame.draw.circle(screen, color,
+                            pygame.draw.circle(screen, mode.color(color),
                                              (sx + 16, sy + 16), r)
-            else:
+            elif not mode.dark:
                 self._draw_snake(screen, camera_x, camera_y, wall_tile,
                                  tinted_floors, floor_texture)
             return
@@ -391,7 +387,7 @@ class Enemy(AnimatedEntity):
                             color = (139, 69, 19)  # Marrón medio
                         else:
                             color = (101, 67, 33)  # Marrón oscuro
-                        pygame.draw.circle(screen, color, (cx, cy), r)
+                        pygame.draw.circle(screen, mode.color(color), (cx, cy), r)
             else:
                 # Dibujar hilo de araña antes del sprite
                 if self.enemy_type == "spider" and level_map is not None:
@@ -400,12 +396,12 @@ class Enemy(AnimatedEntity):
                         thread_top = ceiling_y - camera_y
                         thread_bottom = screen_y + self.height // 2
                         center_x = int(screen_x + self.width // 2)
-                        pygame.draw.line(screen, COLOR_WHITE,
+                        pygame.draw.line(screen, mode.color(COLOR_WHITE),
                                        (center_x, int(thread_top)),
                                        (center_x, int(thread_bottom)), 1)
 
                 if self.image:
-                    screen.blit(self.image, (int(screen_x), int(screen_y)))
+                    screen.blit(mode.sprite(self.image), (int(screen_x), int(screen_y)))
                 else:
                     pygame.draw.circle(screen, COLOR_RED,
                                      (int(screen_x + self.width // 2), int(screen_y + self.height // 2)),
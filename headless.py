@@ -0,0 +1,147 @@
+# H.E.R.O. Remake - Modo headless (turbo)
+# Corre la simulación de Game sin dibujar ni esperar al reloj, con los drivers
+# dummy de SDL (sin display ni audio reales). El input sale de un script o de
+# un bot (callback), y al terminar se reportan frames/s y tiempos por fase.
+# Base para soak tests automáticos en máquinas de CI sin display.
+
+import time
+
+import pygame
+from constants import SIM_DT, STATE_SPLASH, STATE_ENTERING_NAME
+
+
+class NullPhaseTimer:
+    """Timer que no mide nada (el juego normal no paga el costo)"""
+
+    def begin(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+
+NULL_TIMER = NullPhaseTimer()
+
+
+class PhaseTimer:
+    """Acumula tiempos por fase: lap(nombre) suma el tiempo desde la marca anterior"""
+
+    def __init__(self):
+        self.totals = {}
+        self._last = None
+
+    def begin(self):
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.totals[name] = self.totals.get(name, 0.0) + (now - self._last)
+        self._last = now
+
+
+class HeldKeys:
+    """Estado de teclas sintético con la misma interfaz que pygame.key.get_pressed()"""
+
+    def __init__(self, held=()):
+        self._held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self._held
+
+
+class ScriptedInput:
+    """Input desde un archivo de texto. Cada línea es "FRAME tecla tecla ...":
+    desde ese frame se mantienen apretadas esas teclas (nombres de pygame,
+    ej. "left", "up", "space", "z"). Una línea solo con el frame suelta todo.
+    Las líneas que empiezan con # se ignoran."""
+
+    def __init__(self, path):
+        self._steps = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split('#', 1)[0].split()
+                if not parts:
+                    continue
+                keys = frozenset(pygame.key.key_code(name) for name in parts[1:])
+                self._steps.append((int(parts[0]), keys))
+        self._steps.sort(key=lambda step: step[0])
+
+    def __call__(self, game, frame):
+        held = frozenset()
+        for start, keys in self._steps:
+            if start > frame:
+                break
+            held = keys
+        return held
+
+
+def explorer_bot(game, frame):
+    """Bot por defecto: camina a un lado y al otro, vuela a ratos y dispara
+    en ráfagas. Alcanza para ejercitar física, enemigos, láseres y colisiones."""
+    held = {pygame.K_RIGHT if (frame // 120) % 2 == 0 else pygame.K_LEFT}
+    if frame % 90 < 25:
+        held.add(pygame.K_UP)
+    if frame % 12 == 0:
+        held.add(pygame.K_SPACE)
+    if frame % 600 == 300:
+        held.add(pygame.K_z)
+    return held
+
+
+def run_headless(game, frames, input_fn=None, level_num=0):
+    """Corre frames pasos de simulación lo más rápido posible.
+    input_fn(game, frame) retorna las teclas apretadas en ese frame; las que se
+    aprietan generan KEYDOWN (disparo, dinamita) como con un teclado real.
+    Si la partida termina se vuelve a empezar en level_num.
+    Retorna (frames corridos, segundos, PhaseTimer)."""
+    input_fn = input_fn or explorer_bot
+    timer = PhaseTimer()
+    game.phase_timer = timer
+    held_before = frozenset()
+
+    start = time.perf_counter()
+    frame = 0
+    while frame < frames:
+        if game.state in (STATE_SPLASH, STATE_ENTERING_NAME):
+            game.start_new_game(level_num)
+
+        timer.begin()
+        held = frozenset(input_fn(game, frame))
+        for key in held - held_before:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0,
+                                                 unicode='', scancode=0))
+        for key in held_before - held:
+            pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, mod=0,
+                                                 unicode='', scancode=0))
+        held_before = held
+        running = game.handle_events()
+        game.keys = HeldKeys(held)
+        game.joy_axis_x = 0
+        game.joy_axis_y = 0
+        timer.lap('input')
+        if not running:
+            break
+
+        game.step(SIM_DT)
+        timer.lap('other')
+        frame += 1
+    elapsed = time.perf_counter() - start
+
+    game.phase_timer = NULL_TIMER
+    return frame, elapsed, timer
+
+
+def format_report(frames, elapsed, timer):
+    """Texto del reporte: throughput y tiempo por fase"""
+    lines = []
+    fps = frames / elapsed if elapsed > 0 else 0.0
+    sim_seconds = frames * SIM_DT
+    lines.append(f"Frames simulados: {frames} ({sim_seconds:.1f}s de juego) en {elapsed:.2f}s")
+    lines.append(f"Throughput: {fps:.0f} frames/s ({fps * SIM_DT:.1f}x tiempo real)")
+    total = sum(timer.totals.values()) or 1.0
+    lines.append("Fase            total ms   us/frame      %")
+    for name, seconds in sorted(timer.totals.items(), key=lambda item: -item[1]):
+        per_frame = seconds / frames * 1e6 if frames else 0.0
+        lines.append(f"{name:<14} {seconds * 1000:>9.1f} {per_frame:>10.1f} {seconds / total * 100:>6.1f}")
+    return "\n".join(lines)
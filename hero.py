@@ -8,6 +8,7 @@ import math
 import array
 import random
 import argparse
+import time
 
 # Asegurar que el cwd sea el directorio del script (necesario en Mac cuando se ejecuta desde Finder)
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
@@ -18,6 +19,22 @@ from constants import *
 # Import game classes
 from laser import Laser
 from dynamite import Dynamite
+from tilegrid import TileGrid
+import level_cache
+from level_cache import normalize_level_rows
+from level_prep import LevelPreparer, prepare_level
+from spatial_index import SpatialIndex
+from snake_bank import SnakeBank
+from static_layers import StaticLayerCache
+from presenter import Presenter
+from text_atlas import AtlasFont
+from high_scores import CachedHighScores
+from sprite_atlas import SpriteAtlas, RenderMode, DARK_COLORS
+from hud import Hud, bomb_icon_x, ICONS_Y as HUD_ICONS_Y
+from sim_clock import FixedStepClock, snapshot_positions, interpolated
+from headless import NULL_TIMER, ScriptedInput, run_headless, format_report
+from replay import (InputSample, ReplayWriter, ReplayReader, ReplayDivergence,
+                    stream_seed, state_checksum, play_replay)
 from enemy import Enemy
 from miner import Miner
 from player import Player
@@ -25,11 +42,9 @@ try:
     from evgamelib.audio_effects import apply_sid_to_sound
 except ImportError:
     apply_sid_to_sound = None
-from palette import (get_depth_palette, get_edge_color, build_tinted_floors,
-                      draw_tile_edges, generate_edge_overlay,
-                      generate_floor_texture)
+from palette import get_depth_palette, get_edge_color, draw_tile_edges
 from evgamelib.scores import HighScoreManager
-from evgamelib.text import draw_text_with_outline as _draw_text_with_outline, FloatingTextManager
+from evgamelib.text import FloatingTextManager
 from evgamelib.sound_manager import SoundManager
 from evgamelib.input_manager import InputManager
 from evgamelib.collision import mask_overlap
@@ -40,11 +55,11 @@ from evgamelib.rendering import RenderPipeline
 # Utility Functions
 ##################################################################################################
 
-# High score manager (evgamelib)
-_score_manager = HighScoreManager(SCORES_FILE)
+# High score manager (evgamelib), con los records en memoria
+_score_manager = CachedHighScores(HighScoreManager(SCORES_FILE), SCORES_FILE)
 
 def load_scores():
-    """Load high scores from JSON file"""
+    """Load high scores (en memoria; relee el JSON solo si cambió el archivo)"""
     return _score_manager.load()
 
 def save_scores(scores):
@@ -55,6 +70,26 @@ def add_score(name, score):
     """Add a new score and keep only top 10"""
     return _score_manager.add(name, score)
 
+def display_refresh_rate():
+    """Tasa de refresco del display actual en Hz, o FPS si no se puede saber
+    (get_current_refresh_rate no existe en todas las versiones de pygame)"""
+    get_rate = getattr(pygame.display, 'get_current_refresh_rate', None)
+    if get_rate is None or not pygame.display.get_surface():
+        return FPS
+    try:
+        rate = get_rate()
+    except pygame.error:
+        return FPS
+    return rate if rate > 0 else FPS
+
+def load_image(path):
+    """Carga una imagen con alpha. Sin display (modo headless) no se convierte
+    al formato de pantalla: las masks y la simulación funcionan igual."""
+    image = pygame.image.load(path)
+    if pygame.display.get_surface() is None:
+        return image
+    return image.convert_alpha()
+
 ##################################################################################################
 # Level Generator
 ##################################################################################################
@@ -73,7 +108,7 @@ def add_score(name, score):
 
 def load_levels_from_file():
     """Cargar niveles desde screens.json (tamaño dinámico, múltiplos del viewport)"""
-    global LEVEL_PALETTES, LEVEL_EDGE_COLORS
+    global LEVEL_PALETTES, LEVEL_EDGE_COLORS, LEVEL_SCREENS
     if os.path.exists(SCREENS_FILE):
         try:
             with open(SCREENS_FILE, 'r', encoding='utf-8') as f:
@@ -81,36 +116,14 @@ def load_levels_from_file():
                 levels = []
                 LEVEL_PALETTES = []
                 LEVEL_EDGE_COLORS = []
+                LEVEL_SCREENS = []
                 for s in screens:
                     LEVEL_PALETTES.append(get_depth_palette(s))
                     LEVEL_EDGE_COLORS.append(get_edge_color(s))
-                    level_map = s["map"]
-                    # Determinar altura del mapa
-                    map_height = len(level_map)
-
-                    # Redondear hacia arriba al múltiplo del viewport más cercano
-                    target_h = max(VIEWPORT_ROWS, ((map_height + VIEWPORT_ROWS - 1) // VIEWPORT_ROWS) * VIEWPORT_ROWS)
-
-                    # Normalizar altura total a múltiplo de VIEWPORT_ROWS
-                    while len(level_map) < target_h:
-                        level_map.append('#' * VIEWPORT_COLS)
-
-                    # Normalizar por banda: cada grupo de VIEWPORT_ROWS filas
-                    # tiene su propio ancho (múltiplo de VIEWPORT_COLS)
-                    normalized = []
-                    for band_start in range(0, target_h, VIEWPORT_ROWS):
-                        band_end = min(band_start + VIEWPORT_ROWS, len(level_map))
-                        band_rows = level_map[band_start:band_end]
-                        band_w = max(len(r) for r in band_rows) if band_rows else VIEWPORT_COLS
-                        target_band_w = max(VIEWPORT_COLS, ((band_w + VIEWPORT_COLS - 1) // VIEWPORT_COLS) * VIEWPORT_COLS)
-                        for row in band_rows:
-                            if len(row) < target_band_w:
-                                row = row + '#' * (target_band_w - len(row))
-                            normalized.append(row[:target_band_w])
-                        # Completar filas faltantes de la banda
-                        while len(normalized) < band_start + VIEWPORT_ROWS:
-                            normalized.append('#' * target_band_w)
-                    levels.append(normalized[:target_h])
+                    LEVEL_SCREENS.append(s)
+                    # Cada banda de VIEWPORT_ROWS filas tiene su propio ancho
+                    # (múltiplo de VIEWPORT_COLS); el alto total es múltiplo de VIEWPORT_ROWS
+                    levels.append(normalize_level_rows(s["map"]))
                 return levels
         except Exception as e:
             print(f"Error cargando niveles: {e}")
@@ -118,6 +131,7 @@ def load_levels_from_file():
 
 LEVEL_PALETTES = []  # Paletas de profundidad por nivel
 LEVEL_EDGE_COLORS = []  # Color de borde por nivel
+LEVEL_SCREENS = []  # Entradas crudas de screens.json (clave del cache de niveles)
 LEVELS = load_levels_from_file()
 
 def get_level_palette(level_num):
@@ -139,11 +153,11 @@ def generate_level(level_num):
         print("ERROR: No se encontraron niveles en screens.json")
         # Nivel de emergencia
         empty = ['#' * DEFAULT_LEVEL_WIDTH] * DEFAULT_LEVEL_HEIGHT
-        return list(empty)
+        return TileGrid(empty)
     if level_num < 0 or level_num >= len(LEVELS):
         level_num = 0
-    # Devolver copia para no modificar el nivel original
-    return list(LEVELS[level_num])
+    # Grilla nueva: los cambios de tiles no modifican el nivel original
+    return TileGrid(LEVELS[level_num])
 
 ##################################################################################################
 # Game Class
@@ -152,6 +166,7 @@ class Game:
     def __init__(self):
         self.screen = None
         self.clock = None
+        self.render_fps = FPS  # Tope del render: la tasa de refresco del display
         self.input_manager = InputManager(dead_zone=DEAD_ZONE)
         self.xbox_controller = None  # alias legacy
         self.tiles = {}
@@ -165,6 +180,7 @@ class Game:
         self.hud_font = None
         self.hud_player_icon = None
         self.hud_bomb_icon = None
+        self.hud = None  # Hud retenido, se crea en el primer render_hud
 
         # Game state
         self.state = STATE_SPLASH
@@ -183,6 +199,13 @@ class Game:
         self.lasers = []
         self.dynamites = []
         self.miner = None
+        # Enemigos por viewport/celda para las pasadas de colisión
+        self.enemy_index = SpatialIndex(lambda enemy: enemy.get_bounds())
+
+        # Preparación del nivel siguiente en segundo plano
+        self._level_preparer = LevelPreparer()
+        # Snapshot intacto del nivel actual (reinicio rápido al perder una vida)
+        self._pristine_level = None
 
         # Cave background
         self.cave_bg = None
@@ -210,6 +233,8 @@ class Game:
 
         # Rendering pipeline (evgamelib)
         self._render_pipeline = RenderPipeline(GAME_WIDTH, GAME_VIEWPORT_HEIGHT, RENDER_SCALE, HUD_HEIGHT)
+        # Presentación al display solo de lo que cambió entre frames
+        self.presenter = Presenter()
         self.fullscreen = False
         self.display_surface = None
         self.render_scale = 1.0
@@ -273,10 +298,31 @@ class Game:
         # Lampara / modo oscuridad
         self.dark_mode = False
         self.lamps = []                   # Lista de posiciones {x, y} de lamparas
-        self._grayscale_cache = {}        # Cache de sprites en escala de gris
-
-    def init(self):
-        """Initialize pygame and resources"""
+        self.static_layers = None         # StaticLayerCache del nivel actual
+        # Variantes espejadas/grises de los sprites (se arman al cargar) y los
+        # modos de render: color y oscuridad usan la misma pasada de dibujo
+        self.sprite_atlas = SpriteAtlas()
+        self.color_mode = RenderMode(self.sprite_atlas)
+        self.dark_render_mode = RenderMode(self.sprite_atlas, dark=True, colors=DARK_COLORS)
+
+        # Tiempos por fase del update (solo se miden en modo headless)
+        self.phase_timer = NULL_TIMER
+
+        # Aleatoriedad reproducible: cada partida y cada nivel usan streams
+        # derivados de la semilla de sesión (la que se guarda en los replays)
+        self.session_seed = random.randrange(2 ** 32)
+        self.games_started = 0
+        self.rng_seed = self.session_seed
+        self.level_rng = random.Random(self.rng_seed)
+        self.recorder = None              # ReplayWriter mientras se graba
+        self.persist_scores = True        # False en replays (no tocar scores.json)
+
+    def init(self, headless=False):
+        """Initialize pygame and resources.
+        headless: drivers dummy de SDL, sin ventana (solo simulación)"""
+        if headless:
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
         pygame.init()
         pygame.mixer.init()
 
@@ -284,46 +330,58 @@ class Game:
         self.input_manager.init_controllers()
         self.xbox_controller = self.input_manager.controller  # alias legacy
 
-        # Inicializar rendering pipeline
-        self._render_pipeline.init_display(fullscreen=True)
-        self.fullscreen = self._render_pipeline.fullscreen
-        self.display_surface = self._render_pipeline.display_surface
-        self.screen = self._render_pipeline.screen
-        self.game_surface = self._render_pipeline.game_surface
-        self._scaled_game = self._render_pipeline._scaled_game
-        self.render_scale = self._render_pipeline.render_scale
-        self.render_w = self._render_pipeline.render_w
-        self.render_h = self._render_pipeline.render_h
-        self.render_x = self._render_pipeline.render_x
-        self.render_y = self._render_pipeline.render_y
         self.clock = pygame.time.Clock()
-        pygame.display.set_caption("H.E.R.O. - Atari 2600 Remake")
-        try:
-            icon = pygame.image.load("sprites/player_fly.png").convert_alpha()
-            icon = pygame.transform.flip(icon, True, False)  # Mirar a la derecha
-            pygame.display.set_icon(icon)
-        except:
-            pass
+        if headless:
+            # Sin display: superficies en memoria (no se dibujan pero existen)
+            self.fullscreen = False
+            self.display_surface = None
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.game_surface = pygame.Surface((GAME_WIDTH, GAME_VIEWPORT_HEIGHT))
+        else:
+            # Inicializar rendering pipeline
+            self._render_pipeline.init_display(fullscreen=True)
+            self.fullscreen = self._render_pipeline.fullscreen
+            self.display_surface = self._render_pipeline.display_surface
+            self.screen = self._render_pipeline.screen
+            self.game_surface = self._render_pipeline.game_surface
+            self.render_scale = self._render_pipeline.render_scale
+            self.render_w = self._render_pipeline.render_w
+            self.render_h = self._render_pipeline.render_h
+            self.render_x = self._render_pipeline.render_x
+            self.render_y = self._render_pipeline.render_y
+            self.render_fps = display_refresh_rate()
+            pygame.display.set_caption("H.E.R.O. - Atari 2600 Remake")
+            try:
+                icon = load_image("sprites/player_fly.png")
+                icon = pygame.transform.flip(icon, True, False)  # Mirar a la derecha
+                pygame.display.set_icon(icon)
+            except:
+                pass
+        # Zonas de screen preparadas para escalar sin superficies intermedias
+        self._screen_view = self.screen.subsurface((0, 0, SCREEN_WIDTH, VIEWPORT_HEIGHT))
+        self._hud_strip = self.screen.subsurface((0, VIEWPORT_HEIGHT, SCREEN_WIDTH, HUD_HEIGHT))
+        # True si la zona de juego del frame va directo de game_surface al display
+        self._game_view = False
 
         # Load fonts
         try:
-            self.font = pygame.font.Font("fonts/PressStart2P-vaV7.ttf", 16)
-            self.small_font = pygame.font.Font("fonts/PressStart2P-vaV7.ttf", 13)
+            self.font = AtlasFont(pygame.font.Font("fonts/PressStart2P-vaV7.ttf", 16))
+            self.small_font = AtlasFont(pygame.font.Font("fonts/PressStart2P-vaV7.ttf", 13))
         except:
-            self.font = pygame.font.Font(None, 24)
-            self.small_font = pygame.font.Font(None, 16)
+            self.font = AtlasFont(pygame.font.Font(None, 24))
+            self.small_font = AtlasFont(pygame.font.Font(None, 16))
 
         # HUD font (ColecoVision style, smaller)
         try:
-            self.hud_font = pygame.font.Font("fonts/PressStart2P-vaV7.ttf", 12)
+            self.hud_font = AtlasFont(pygame.font.Font("fonts/PressStart2P-vaV7.ttf", 12))
         except:
-            self.hud_font = pygame.font.Font(None, 16)
+            self.hud_font = AtlasFont(pygame.font.Font(None, 16))
 
         # Load tiles
         try:
-            self.tiles['wall'] = pygame.image.load("tiles/wall.png").convert_alpha()
-            self.tiles['floor'] = pygame.image.load("tiles/floor.png").convert_alpha()
-            self.tiles['blank'] = pygame.image.load("tiles/blank.png").convert_alpha()
+            self.tiles['wall'] = load_image("tiles/wall.png")
+            self.tiles['floor'] = load_image("tiles/floor.png")
+            self.tiles['blank'] = load_image("tiles/blank.png")
         except Exception as e:
             print(f"Error loading tiles: {e}")
             # Create fallback tiles
@@ -336,28 +394,28 @@ class Game:
 
         # Granite tile (G) - indestructible
         try:
-            self.tiles['granite'] = pygame.image.load("tiles/granite.png").convert_alpha()
+            self.tiles['granite'] = load_image("tiles/granite.png")
         except:
             self.tiles['granite'] = pygame.Surface((TILE_SIZE, TILE_SIZE))
             self.tiles['granite'].fill((60, 60, 65))
 
         # Breakable wall tile (W)
         try:
-            self.tiles['rock'] = pygame.image.load("tiles/breakable_wall.png").convert_alpha()
+            self.tiles['rock'] = load_image("tiles/breakable_wall.png")
         except:
             self.tiles['rock'] = pygame.Surface((TILE_SIZE, TILE_SIZE))
             self.tiles['rock'].fill((180, 170, 160))
 
         # Roca dañada (estado intermedio por impactos de láser)
         try:
-            self.tiles['rock_damaged'] = pygame.image.load("tiles/broken_wall.png").convert_alpha()
+            self.tiles['rock_damaged'] = load_image("tiles/broken_wall.png")
         except:
             self.tiles['rock_damaged'] = pygame.Surface((TILE_SIZE, TILE_SIZE))
             self.tiles['rock_damaged'].fill((140, 130, 120))
 
         # Toxic water tile (~) - agua tóxica verde animada (strip de frames)
         try:
-            strip = pygame.image.load("tiles/toxic_water_strip.png").convert_alpha()
+            strip = load_image("tiles/toxic_water_strip.png")
             self.toxic_water_frames = []
             num_frames = strip.get_width() // TILE_SIZE
             for i in range(num_frames):
@@ -373,26 +431,26 @@ class Game:
 
         # Lava tile (X) - indestructible, mata al contacto
         try:
-            self.tiles['lava'] = pygame.image.load("tiles/lava.png").convert_alpha()
+            self.tiles['lava'] = load_image("tiles/lava.png")
         except:
             self.tiles['lava'] = pygame.Surface((TILE_SIZE, TILE_SIZE))
             self.tiles['lava'].fill((200, 80, 30))
 
         # Lava rock tiles (W) - destructibles, tintados color lava
         try:
-            self.tiles['lava_rock'] = pygame.image.load("tiles/lava_breakable_wall.png").convert_alpha()
+            self.tiles['lava_rock'] = load_image("tiles/lava_breakable_wall.png")
         except:
             self.tiles['lava_rock'] = pygame.Surface((TILE_SIZE, TILE_SIZE))
             self.tiles['lava_rock'].fill((180, 100, 40))
         try:
-            self.tiles['lava_rock_damaged'] = pygame.image.load("tiles/lava_broken_wall.png").convert_alpha()
+            self.tiles['lava_rock_damaged'] = load_image("tiles/lava_broken_wall.png")
         except:
             self.tiles['lava_rock_damaged'] = pygame.Surface((TILE_SIZE, TILE_SIZE))
             self.tiles['lava_rock_damaged'].fill((140, 70, 30))
 
         # Lamp tile (L) - lampara dorada
         try:
-            self.tiles['lamp'] = pygame.image.load("tiles/lamp.png").convert_alpha()
+            self.tiles['lamp'] = load_image("tiles/lamp.png")
         except:
             # Fallback: circulo amarillo dorado
             self.tiles['lamp'] = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
@@ -411,24 +469,24 @@ class Game:
 
         # Load sprites
         try:
-            self.sprites['player'] = pygame.image.load("sprites/player.png").convert_alpha()
-            self.sprites['player_shooting'] = pygame.image.load("sprites/player_shooting.png").convert_alpha()
-            self.sprites['player_walk1'] = pygame.image.load("sprites/player_walk1.png").convert_alpha()
-            self.sprites['player_walk2'] = pygame.image.load("sprites/player_walk2.png").convert_alpha()
-            self.sprites['player_fly'] = pygame.image.load("sprites/player_fly.png").convert_alpha()
-            self.sprites['bat1'] = pygame.image.load("sprites/bat1.png").convert_alpha()
-            self.sprites['bat2'] = pygame.image.load("sprites/bat2.png").convert_alpha()
-            self.sprites['spider'] = pygame.image.load("sprites/spider.png").convert_alpha()
-            self.sprites['bug1'] = pygame.image.load("sprites/bug1.png").convert_alpha()
-            self.sprites['bug2'] = pygame.image.load("sprites/bug2.png").convert_alpha()
-            self.sprites['bug3'] = pygame.image.load("sprites/bug3.png").convert_alpha()
-            self.sprites['bug4'] = pygame.image.load("sprites/bug4.png").convert_alpha()
-            self.sprites['bomb1'] = pygame.image.load("sprites/bomb1.png").convert_alpha()
-            self.sprites['bomb2'] = pygame.image.load("sprites/bomb2.png").convert_alpha()
-            self.sprites['bomb3'] = pygame.image.load("sprites/bomb3.png").convert_alpha()
-            self.sprites['miner'] = pygame.image.load("sprites/miner.png").convert_alpha()
-            self.sprites['snake_head'] = pygame.image.load("sprites/snake_head.png").convert_alpha()
-            self.sprites['snake_neck'] = pygame.image.load("sprites/snake_neck.png").convert_alpha()
+            self.sprites['player'] = load_image("sprites/player.png")
+            self.sprites['player_shooting'] = load_image("sprites/player_shooting.png")
+            self.sprites['player_walk1'] = load_image("sprites/player_walk1.png")
+            self.sprites['player_walk2'] = load_image("sprites/player_walk2.png")
+            self.sprites['player_fly'] = load_image("sprites/player_fly.png")
+            self.sprites['bat1'] = load_image("sprites/bat1.png")
+            self.sprites['bat2'] = load_image("sprites/bat2.png")
+            self.sprites['spider'] = load_image("sprites/spider.png")
+            self.sprites['bug1'] = load_image("sprites/bug1.png")
+            self.sprites['bug2'] = load_image("sprites/bug2.png")
+            self.sprites['bug3'] = load_image("sprites/bug3.png")
+            self.sprites['bug4'] = load_image("sprites/bug4.png")
+            self.sprites['bomb1'] = load_image("sprites/bomb1.png")
+            self.sprites['bomb2'] = load_image("sprites/bomb2.png")
+            self.sprites['bomb3'] = load_image("sprites/bomb3.png")
+            self.sprites['miner'] = load_image("sprites/miner.png")
+            self.sprites['snake_head'] = load_image("sprites/snake_head.png")
+            self.sprites['snake_neck'] = load_image("sprites/snake_neck.png")
             # Generar sprite de esqueleto a partir del sprite del player
             self.sprites['skeleton'] = self._generate_skeleton_sprite(self.sprites['player'])
             # Preparar animación de hélice (separar palas del cuerpo)
@@ -436,6 +494,7 @@ class Game:
             print("Sprites loaded successfully")
         except Exception as e:
             print(f"Error loading sprites: {e}")
+        self._build_sprite_atlas()
 
         # Precomputar masks de sprites para colisiones pixel-perfect
         self.masks = {}
@@ -455,10 +514,8 @@ class Game:
             if bug_key in self.sprites:
                 self.masks[bug_key] = pygame.mask.from_surface(self.sprites[bug_key])
 
-        # Mask del láser (rect sólido pequeño, precomputado)
-        laser_surf = pygame.Surface((LASER_WIDTH, LASER_HEIGHT), pygame.SRCALPHA)
-        laser_surf.fill((255, 255, 255))
-        self.laser_mask = pygame.mask.from_surface(laser_surf)
+        # Víboras: cuello+cabeza y hitbox para cada extensión (0..TILE_SIZE) y orientación
+        self.snake_bank = SnakeBank(self.sprites.get('snake_head'), self.sprites.get('snake_neck'))
 
         # Precomputar hit rect de agua tóxica (bounding box de píxeles visibles)
         if self.toxic_water_frames:
@@ -501,6 +558,10 @@ class Game:
         # Splash: se renderiza a 512x480 (tamaño original) y se pega centrado en screen
         self._splash_w, self._splash_h = 512, 480
         self.splash_surface = pygame.Surface((self._splash_w, self._splash_h))
+        # Splash ya escalado para screen; se rehace si cambian los records o el modo
+        self._splash_cache = None
+        self._splash_version = None
+        self._splash_pos = (0, 0)
 
         # Load background image (al tamaño original del splash)
         # Nota: en Mac algunos PNGs con perfil ICC fallan con convert_alpha(), se intenta convert() como fallback
@@ -531,11 +592,15 @@ class Game:
         """Alternar entre ventana y pantalla completa"""
         self._render_pipeline.toggle_fullscreen()
         self._sync_render_pipeline()
+        self.presenter.invalidate()
+        self._splash_cache = None
 
     def _update_scaling(self):
         """Calcular escala y offset para mantener aspect ratio"""
         self._render_pipeline._update_scaling()
         self._sync_render_pipeline()
+        self.presenter.invalidate()
+        self._splash_cache = None
 
     def _sync_render_pipeline(self):
         """Sincronizar atributos locales con el render pipeline"""
@@ -547,6 +612,7 @@ class Game:
         self.render_h = rp.render_h
         self.render_x = rp.render_x
         self.render_y = rp.render_y
+        self.render_fps = display_refresh_rate()
 
     def _prepare_propeller_sprites(self):
         """Separa las palas de la hélice del cuerpo de cada sprite y genera frames de rotación.
@@ -561,9 +627,7 @@ class Game:
         }
 
         self.propeller_bodies = {}
-        self.propeller_bodies_flip = {}
         self.propeller_frames = {}
-        self.propeller_frames_flip = {}
 
         for sprite_key, (row_start, row_end) in blade_rows.items():
             if sprite_key not in self.sprites:
@@ -593,11 +657,9 @@ class Game:
             for bx, by, _ in blade_pixels:
                 body.set_at((bx, by), pygame.Color(0, 0, 0, 0))
             self.propeller_bodies[sprite_key] = body
-            self.propeller_bodies_flip[sprite_key] = pygame.transform.flip(body, True, False)
 
             # Generar frames de rotación variando el ancho visible
             frames = []
-            frames_flip = []
             for factor in PROPELLER_WIDTH_FACTORS:
                 frame = pygame.Surface((32, 32), pygame.SRCALPHA)
                 scaled_half = half_width * factor
@@ -605,14 +667,22 @@ class Game:
                     if abs(bx - center_x) <= scaled_half:
                         frame.set_at((bx, by), color)
                 frames.append(frame)
-                frames_flip.append(pygame.transform.flip(frame, True, False))
 
             self.propeller_frames[sprite_key] = frames
-            self.propeller_frames_flip[sprite_key] = frames_flip
 
         print(f"Propeller sprites prepared: {len(self.propeller_bodies)} body sprites, "
               f"{sum(len(f) for f in self.propeller_frames.values())} overlay frames")
 
+    def _build_sprite_atlas(self):
+        """Variantes {normal, espejado} x {color, gris} de los sprites que dibujan
+        las entidades, la lámpara y el cuerpo y las palas de la hélice"""
+        atlas = self.sprite_atlas
+        atlas.add_all(self.sprites.values())
+        atlas.add(self.tiles.get('lamp'))
+        atlas.add_all(getattr(self, 'propeller_bodies', {}).values())
+        for frames in getattr(self, 'propeller_frames', {}).values():
+            atlas.add_all(frames)
+
     def _generate_skeleton_sprite(self, player_sprite):
         """Genera sprite de esqueleto a partir del sprite del jugador.
         Toma la silueta y la recolorea con tonos hueso/blanco."""
@@ -642,92 +712,72 @@ class Game:
 
         return skeleton
 
-    def _generate_cave_background(self):
-        """Genera superficie de fondo con pintitas simulando textura de caverna"""
-        level_w = max_level_width(self.level_map) if self.level_map else DEFAULT_LEVEL_WIDTH
-        level_h = len(self.level_map) if self.level_map else DEFAULT_LEVEL_HEIGHT
-        width = level_w * TILE_SIZE
-        height = level_h * TILE_SIZE
-        self.cave_bg = pygame.Surface((width, height))
-        self.cave_bg.fill(COLOR_BLACK)
-
-        # Derivar colores de puntitos del color 1 del nivel (depth_palette entrada 0)
-        # Se usan variantes oscuras (~15-25% del color original)
-        if self.depth_palette and len(self.depth_palette) > 0:
-            wc = self.depth_palette[0].get("wall", [255, 255, 255])
-            base_r, base_g, base_b = wc[0], wc[1], wc[2]
-        else:
-            base_r, base_g, base_b = 180, 120, 60  # Fallback marron
-        dot_colors = [
-            (max(0, base_r * pct // 100), max(0, base_g * pct // 100), max(0, base_b * pct // 100))
-            for pct in CAVE_DOT_BRIGHTNESS
-        ]
-
-        num_dots = int(width * height * CAVE_DOT_DENSITY)
-
-        for _ in range(num_dots):
-            dx = random.randint(0, width - CAVE_DOT_SIZE)
-            dy = random.randint(0, height - CAVE_DOT_SIZE)
-            color = random.choice(dot_colors)
-            if CAVE_DOT_SIZE <= 1:
-                self.cave_bg.set_at((dx, dy), color)
-            else:
-                pygame.draw.rect(self.cave_bg, color,
-                                 (dx, dy, CAVE_DOT_SIZE, CAVE_DOT_SIZE))
-
-    def _generate_edge_overlay(self):
-        """Genera overlay pre-computado con musgo/raíces en bordes expuestos"""
-        self.edge_overlay = generate_edge_overlay(
-            self.level_map, self.edge_color, seed=self.level_num,
-            skip_tiles=getattr(self, 'snake_tiles', None))
-
-    def _generate_floor_texture(self):
-        """Genera overlay pre-computado con textura porosa en tiles de suelo"""
-        self.floor_texture = generate_floor_texture(
-            self.level_map, seed=self.level_num + 1000)
+    def _level_screen_data(self, level_num):
+        """Entrada de screens.json del nivel (o un nivel de emergencia sin screens.json)"""
+        if 0 <= level_num < len(LEVEL_SCREENS):
+            return LEVEL_SCREENS[level_num]
+        return {"map": generate_level(level_num).to_rows()}
+
+    def _prepare_level_args(self, level_num):
+        """Argumentos de level_prep.prepare_level para un nivel"""
+        return (self._level_screen_data(level_num), self.tiles['floor'],
+                get_level_palette(level_num), get_level_edge_color(level_num),
+                stream_seed(self.rng_seed, 'spawns', level_num))
+
+    def _get_prepared_level(self):
+        """Copia del snapshot intacto del nivel actual. La primera vez se adopta
+        el nivel preparado en segundo plano (ver rescue_miner), o se arma acá
+        mismo; los reinicios tras perder una vida solo copian el mapa."""
+        pristine = self._pristine_level
+        if pristine is None or pristine.level_num != self.level_num:
+            pristine = self._level_preparer.take(self.level_num)
+            if pristine is None:
+                pristine = prepare_level(self.level_num, *self._prepare_level_args(self.level_num))
+            self._pristine_level = pristine
+        return pristine.restore()
+
+    def start_new_game(self, level_num=0):
+        """Partida nueva desde level_num (0-based)"""
+        self.level_num = level_num
+        self.games_started += 1
+        self.rng_seed = stream_seed(self.session_seed, 'game', self.games_started)
+        self.score = 0
+        self.lives = INITIAL_LIVES
+        self.dynamite_count = 6
+        self.last_life_score = 0
+        self._pristine_level = None  # partida nueva: nuevas variaciones
+        self._level_preparer.cancel()  # lo preparado en la partida anterior no sirve
+        self.start_level()
 
     def start_level(self):
         """Start a new level"""
         self.state = STATE_PLAYING
         self.energy = MAX_ENERGY
+        # Stream de los enemigos del nivel (se repite igual al perder una vida)
+        self.level_rng = random.Random(stream_seed(self.rng_seed, 'enemies', self.level_num))
         self.dynamite_count = DYNAMITE_QUANTITY  # Restore bombs for new level
 
         # Stop helicopter sound when starting new level
         self.sound_manager.stop_loop('helicopter')
 
-        # Generate level
-        self.level_map = generate_level(self.level_num)
-
-        # Construir tiles de suelo tintados por fila del viewport (se repiten en cada viewport)
-        self.depth_palette = get_level_palette(self.level_num)
-        self.edge_color = get_level_edge_color(self.level_num)
-        self.tinted_floors = build_tinted_floors(self.tiles['floor'], self.depth_palette)
-
-        # Pre-scan: convertir tiles de víbora a suelo y guardar posiciones/dirección
+        # Adoptar el nivel preparado: mapa normalizado, overlays, suelos tintados y spawns
+        prepared = self._get_prepared_level()
+        compiled = prepared.compiled
+        self.level_map = prepared.level_map
         # snake_tiles: set de (row, col) para excluir moss
         # snake_dirs: dict de (row, col) -> '<' o '>' para crear enemigos
-        self.snake_tiles = set()
-        self._snake_dirs = {}
-        for row_index, row in enumerate(self.level_map):
-            for col_index, tile in enumerate(row):
-                if tile in ('<', '>'):
-                    self.snake_tiles.add((row_index, col_index))
-                    self._snake_dirs[(row_index, col_index)] = tile
-                    self.level_map[row_index] = (
-                        self.level_map[row_index][:col_index] + '.' +
-                        self.level_map[row_index][col_index + 1:]
-                    )
-
-        # Generar fondo de caverna con pintitas
-        self._generate_cave_background()
-
-        # Generar overlays pre-computados (se blitean por viewport)
-        # Los tiles de víbora tienen textura de suelo pero no moss
-        self._generate_edge_overlay()
-        self._generate_floor_texture()
+        self._snake_dirs = dict(compiled.snake_dirs)
+        self.snake_tiles = set(self._snake_dirs)
+        self.cave_bg = compiled.cave_bg
+        self.floor_texture = compiled.floor_texture
+        self.edge_overlay = compiled.edge_overlay
+        self.depth_palette = prepared.depth_palette
+        self.edge_color = prepared.edge_color
+        self.tinted_floors = prepared.tinted_floors
 
         # Clear entities
         self.enemies = []
+        self.enemy_index.clear()
         self.lasers = []
         self.dynamites = []
         self.miner = None
@@ -736,11 +786,15 @@ class Game:
 
         # Reset lampara/oscuridad
         self.dark_mode = False
-        self.lamps = []
+        self.lamps = [dict(lamp) for lamp in prepared.lamps]
 
         # Reset scroll de agua tóxica
         self.toxic_water_scroll = 0.0
 
+        # Compuestos estáticos por viewport (se parchean solos al cambiar tiles)
+        self.static_layers = StaticLayerCache(self.level_map, self._static_tile_image, self.cave_bg,
+                                              (self.floor_texture, self.edge_overlay))
+
         # Create player
         self.player = Player()
         self.player.init(self.level_map)
@@ -755,79 +809,38 @@ class Game:
         # Asignar datos de animación de hélice
         if hasattr(self, 'propeller_bodies'):
             self.player._prop_bodies = self.propeller_bodies
-            self.player._prop_bodies_flip = self.propeller_bodies_flip
             self.player._prop_frames = self.propeller_frames
-            self.player._prop_frames_flip = self.propeller_frames_flip
         if 'walk1' in self.sounds and 'walk2' in self.sounds:
             self.player.walk_sounds = [self.sounds['walk1'], self.sounds['walk2']]
         # Referencia a masks para colisión pixel-perfect con tiles
         self.player._masks_ref = self.masks
 
-        # Parse level and create entities
-        for row_index, row in enumerate(self.level_map):
-            for col_index, tile in enumerate(row):
-                x = col_index * TILE_SIZE
-                y = row_index * TILE_SIZE
-
-                if tile == "V":
-                    enemy = Enemy(x, y, "bat")
-                    # Velocidad base con escalado por nivel y variación aleatoria ±5%
-                    speed_variation = random.uniform(1 - ENEMY_SPEED_VARIATION, 1 + ENEMY_SPEED_VARIATION)
-                    enemy.speed = BAT_SPEED * (1 + BAT_SPEED_SCALE * self.level_num) * speed_variation
-                    if 'bat1' in self.sprites:
-                        enemy.images = [self.sprites['bat1'], self.sprites['bat2']]
-                        enemy.image = enemy.images[0]
-                    self.enemies.append(enemy)
-                elif tile == "A":
-                    enemy = Enemy(x, y, "spider")
-                    # Variación aleatoria ±5% en velocidad de araña
-                    speed_variation = random.uniform(1 - ENEMY_SPEED_VARIATION, 1 + ENEMY_SPEED_VARIATION)
-                    enemy.speed = SPIDER_SPEED * speed_variation
-                    if 'spider' in self.sprites:
-                        enemy.image = self.sprites['spider']
-                    self.enemies.append(enemy)
-                elif tile == "B":
-                    enemy = Enemy(x, y, "bug")
-                    # Variación aleatoria ±5% en velocidad de bicho
-                    speed_variation = random.uniform(1 - ENEMY_SPEED_VARIATION, 1 + ENEMY_SPEED_VARIATION)
-                    enemy.speed = BUG_SPEED * speed_variation
-                    if 'bug1' in self.sprites:
-                        enemy.images = [self.sprites['bug1'], self.sprites['bug2'],
-                                        self.sprites['bug3'], self.sprites['bug4']]
-                        enemy.image = enemy.images[0]
-                    self.enemies.append(enemy)
-                # Víbora: tile ya convertido a '.' en pre-scan, detectar por posición
-                elif (row_index, col_index) in self._snake_dirs:
-                    orig_tile = self._snake_dirs[(row_index, col_index)]
-                    etype = "snake_left" if orig_tile == "<" else "snake_right"
-                    enemy = Enemy(x, y, etype)
-                    speed_variation = random.uniform(1 - ENEMY_SPEED_VARIATION, 1 + ENEMY_SPEED_VARIATION)
-                    enemy.speed = SNAKE_EMERGE_SPEED * speed_variation
-                    # Asignar sprites de víbora
-                    if orig_tile == "<":
-                        # Mira a la izquierda: cabeza tal cual
-                        if 'snake_head' in self.sprites:
-                            enemy.snake_head_sprite = self.sprites['snake_head']
-                        if 'snake_neck' in self.sprites:
-                            enemy.snake_neck_sprite = self.sprites['snake_neck']
-                    else:
-                        # Mira a la derecha: flipear cabeza
-                        if 'snake_head' in self.sprites:
-                            enemy.snake_head_sprite = pygame.transform.flip(self.sprites['snake_head'], True, False)
-                        if 'snake_neck' in self.sprites:
-                            enemy.snake_neck_sprite = self.sprites['snake_neck']
-                    self.enemies.append(enemy)
-                elif tile == "M":
-                    self.miner = Miner(x, y)
-                    if 'miner' in self.sprites:
-                        self.miner.image = self.sprites['miner']
-                elif tile == "L":
-                    # Guardar posicion de lampara y limpiar del mapa (no es solido)
-                    self.lamps.append({'x': x, 'y': y})
-                    self.level_map[row_index] = (
-                        self.level_map[row_index][:col_index] + ' ' +
-                        self.level_map[row_index][col_index + 1:]
-                    )
+        # Crear entidades desde la lista de spawns (en orden de mapa)
+        for etype, x, y, speed in prepared.spawns:
+            if etype == "miner":
+                self.miner = Miner(x, y)
+                if 'miner' in self.sprites:
+                    self.miner.image = self.sprites['miner']
+                continue
+            enemy = Enemy(x, y, etype, rng=self.level_rng)
+            enemy.speed = speed
+            if etype == "bat":
+                if 'bat1' in self.sprites:
+                    enemy.images = [self.sprites['bat1'], self.sprites['bat2']]
+                    enemy.image = enemy.images[0]
+            elif etype == "spider":
+                if 'spider' in self.sprites:
+                    enemy.image = self.sprites['spider']
+            elif etype == "bug":
+                if 'bug1' in self.sprites:
+                    enemy.images = [self.sprites['bug1'], self.sprites['bug2'],
+                                    self.sprites['bug3'], self.sprites['bug4']]
+                    enemy.image = enemy.images[0]
+            else:
+                # Víboras: compuestos precalculados para ambas orientaciones
+                enemy.snake_bank = self.snake_bank
+            self.enemies.append(enemy)
+            self.enemy_index.insert(enemy)
 
         # Reset camera al viewport del jugador (snap instantáneo, usando centro del sprite)
         player_cx = int(self.player.x + self.player.width / 2)
@@ -835,8 +848,8 @@ class Game:
         viewport_col = player_cx // GAME_WIDTH
         viewport_row = player_cy // GAME_VIEWPORT_HEIGHT
         player_tile_y = int(self.player.y / TILE_SIZE)
-        current_band_w = band_width(self.level_map, player_tile_y)
-        level_h = len(self.level_map) if self.level_map else DEFAULT_LEVEL_HEIGHT
+        current_band_w = self.level_map.band_width(player_tile_y)
+        level_h = self.level_map.height if self.level_map else DEFAULT_LEVEL_HEIGHT
         max_cam_x = max(0, current_band_w * TILE_SIZE - GAME_WIDTH)
         max_cam_y = max(0, level_h * TILE_SIZE - GAME_VIEWPORT_HEIGHT)
         self.camera_x = max(0, min(viewport_col * GAME_WIDTH, max_cam_x))
@@ -854,6 +867,8 @@ class Game:
             else:
                 laser_x = self.player.x + 3 - LASER_WIDTH
             laser = Laser(laser_x, self.player.y + 16, direction)
+            # Rayo hasta el primer sólido: después cada frame es una comparación
+            laser.cast(self.level_map)
             self.lasers.append(laser)
             self.shoot_cooldown = LASER_COOLDOWN
 
@@ -881,18 +896,29 @@ class Game:
 
     def update_camera(self):
         """Update camera - snap instantáneo a viewport (estilo juego original)"""
-        level_h = len(self.level_map) if self.level_map else DEFAULT_LEVEL_HEIGHT
+        level_h = self.level_map.height if self.level_map else DEFAULT_LEVEL_HEIGHT
         self._camera.update(
             self.player.x, self.player.y,
             self.player.width, self.player.height,
             level_h,
-            band_width_fn=lambda tile_row: band_width(self.level_map, tile_row)
+            band_width_fn=self.level_map.band_width
         )
         self.camera_x = self._camera.x
         self.camera_y = self._camera.y
 
+        # Generar los chunks de overlay del viewport apenas la cámara entra en él
+        for overlay in (self.cave_bg, self.floor_texture, self.edge_overlay):
+            if overlay:
+                overlay.touch(self.camera_x, self.camera_y)
+
     def mask_collide(self, x1, y1, mask1, x2, y2, mask2):
         """Colision pixel-perfect entre dos masks. Retorna punto de overlap o None."""
+        # Descarte barato por rect antes del overlap (1px de margen por el redondeo)
+        w1, h1 = mask1.get_size()
+        w2, h2 = mask2.get_size()
+        if (x2 >= x1 + w1 + 1 or x1 >= x2 + w2 + 1 or
+                y2 >= y1 + h1 + 1 or y1 >= y2 + h2 + 1):
+            return None
         return mask_overlap(x1, y1, mask1, x2, y2, mask2)
 
     def check_collisions(self):
@@ -903,8 +929,9 @@ class Game:
         player_rect = self.player.get_rect()
         player_mask = self.player.get_mask(self.masks)
 
-        # Player vs enemies (pixel-perfect con masks, fallback a rect para snake)
-        for enemy in self.enemies:
+        # Player vs enemies (pixel-perfect con masks, fallback a rect para snake).
+        # Solo los enemigos que comparten celda con el jugador
+        for enemy in self.enemy_index.query(player_rect):
             if not enemy.active or enemy.exploding:
                 continue
             enemy_mask = enemy.get_mask(self.masks)
@@ -918,13 +945,16 @@ class Game:
                 # Snake y otros sin mask: verificar overlap del rect del enemigo
                 # contra la mask del player (respeta transparencia del player)
                 enemy_rect = enemy.get_rect()
+                if not enemy_rect.colliderect(player_rect.inflate(2, 2)):
+                    continue
                 if enemy_rect.width > 0 and enemy_rect.height > 0 and player_mask:
                     # Offset del player relativo al rect del enemigo
                     ox = int(self.player.x - enemy_rect.x)
                     oy = int(self.player.y - enemy_rect.y)
                     # Verificar si algún pixel visible del player cae dentro del rect
+                    # (mask del rect visible de la víbora, precalculada en el banco)
                     if player_mask.overlap_area(
-                            pygame.mask.Mask((enemy_rect.width, enemy_rect.height), fill=True),
+                            self.snake_bank.hitbox_mask(enemy_rect.width),
                             (-ox, -oy)) > 0:
                         self.player_hit()
                         return
@@ -944,20 +974,27 @@ class Game:
                 self.rescue_miner()
                 return
 
-        # Lasers vs enemies (pixel-perfect con mask del enemigo, fallback rect para snake)
+        # Lasers vs enemies (pixel-perfect con mask del enemigo, fallback rect para snake).
+        # Se usa el tramo recorrido en el frame (sweep_rect), incluido el último
+        # tramo de un láser que acaba de chocar contra un tile
         for laser in self.lasers[:]:
-            if not laser.active:
+            laser_rect = laser.sweep_rect
+            if laser_rect is None:
                 continue
-            laser_rect = laser.get_rect()
-            for enemy in self.enemies:
+            sweep_mask = None
+            for enemy in self.enemy_index.query(laser_rect):
                 if not enemy.active or enemy.exploding:
                     continue
+                if not laser_rect.colliderect(enemy.get_bounds()):
+                    continue
                 enemy_mask = enemy.get_mask(self.masks)
                 hit = False
                 if enemy_mask:
-                    # Colisión pixel-perfect
+                    # Colisión pixel-perfect contra el tramo barrido
+                    if sweep_mask is None:
+                        sweep_mask = laser.sweep_mask()
                     if self.mask_collide(enemy.x, enemy.y, enemy_mask,
-                                         laser.x, laser.y, self.laser_mask):
+                                         laser_rect.x, laser_rect.y, sweep_mask):
                         hit = True
                 else:
                     # Fallback a rect (snake y otros sin mask)
@@ -968,6 +1005,7 @@ class Game:
 
                 enemy.exploding = True
                 laser.active = False
+                laser.sweep_rect = None
                 pts = TILE_SCORES[ENEMY_TILE_CHARS[enemy.enemy_type]]
                 self.score += pts
                 self.add_floating_score(enemy.x + 16, enemy.y, pts)
@@ -984,7 +1022,7 @@ class Game:
                 explosion_rect = dynamite.get_explosion_rect()
                 if explosion_rect:
                     # Destroy enemies (antes de check player para que siempre se procesen)
-                    for enemy in self.enemies:
+                    for enemy in self.enemy_index.query(explosion_rect):
                         if enemy.active and not enemy.exploding and explosion_rect.colliderect(enemy.get_rect()):
                             enemy.exploding = True
                             self.score += EXPLOSION_KILL_SCORE
@@ -994,57 +1032,48 @@ class Game:
                             if 'splatter' in self.sounds:
                                 self.sounds['splatter'].play()
 
-                    # Destroy blocks and walls
-                    tiles_changed = False
-                    for row_index in range(len(self.level_map)):
-                        for col_index in range(len(self.level_map[row_index])):
-                            tile = self.level_map[row_index][col_index]
-                            if tile in ('#', 'R', 'W'):  # Destruye tierra, rocas y roca lava (G, X indestructibles)
-                                tile_x = col_index * TILE_SIZE
-                                tile_y = row_index * TILE_SIZE
-                                tile_rect = pygame.Rect(tile_x, tile_y, TILE_SIZE, TILE_SIZE)
-
-                                if explosion_rect.colliderect(tile_rect):
-                                    row = list(self.level_map[row_index])
-                                    row[col_index] = ' '
-                                    self.level_map[row_index] = "".join(row)
-                                    # Limpiar health de roca si tenía daño por láser
-                                    self.rock_health.pop((row_index, col_index), None)
-                                    pts = TILE_SCORES.get(tile, 0)
-                                    self.score += pts
-                                    self.add_floating_score(tile_x + 16, tile_y, pts)
-                                    tiles_changed = True
-
-                    # Matar víboras cuya pared fue destruida
-                    for enemy in self.enemies:
-                        if (enemy.active and not enemy.exploding and
-                                enemy.enemy_type in ("snake_left", "snake_right")):
-                            r, c = enemy.wall_row, enemy.wall_col
-                            if (0 <= r < len(self.level_map) and
-                                    0 <= c < len(self.level_map[r]) and
-                                    self.level_map[r][c] == ' '):
-                                enemy.exploding = True
-                                pts = TILE_SCORES.get(ENEMY_TILE_CHARS[enemy.enemy_type], 0)
-                                self.score += pts
-                                self.add_floating_score(
-                                    enemy.wall_col * TILE_SIZE + 16,
-                                    enemy.wall_row * TILE_SIZE, pts)
-                                if 'splatter' in self.sounds:
-                                    self.sounds['splatter'].play()
-                                tiles_changed = True
-
-                    # El overlay de musgo NO se regenera; el moss original
-                    # queda intacto y los nuevos bordes expuestos quedan sin moss
-
-                    # Play sound once
-                    if 'explosion' in self.sounds and dynamite.explosion_time > 0.4:
-                        self.sounds['explosion'].play()
+                    # Destruir bloques y paredes, puntos y víboras: una sola vez al detonar
+                    destroyed = dynamite.resolve_blast(self.level_map)
+                    if destroyed is not None:
+                        self._apply_blast(explosion_rect, destroyed)
 
                     # Check if player is in blast radius (al final para no saltear enemigos/bloques)
                     if player_rect.colliderect(explosion_rect):
                         self.player_hit()
                         return
 
+    def _apply_blast(self, explosion_rect, destroyed):
+        """Puntaje y efectos de los tiles destruidos por una dinamita"""
+        for row_index, col_index, tile in destroyed:
+            # Limpiar health de roca si tenía daño por láser
+            self.rock_health.pop((row_index, col_index), None)
+            tile_x = col_index * TILE_SIZE
+            tile_y = row_index * TILE_SIZE
+            pts = TILE_SCORES.get(tile, 0)
+            self.score += pts
+            self.add_floating_score(tile_x + 16, tile_y, pts)
+
+        # Matar víboras cuya pared fue destruida
+        for enemy in self.enemy_index.query(explosion_rect):
+            if (enemy.active and not enemy.exploding and
+                    enemy.enemy_type in ("snake_left", "snake_right")):
+                r, c = enemy.wall_row, enemy.wall_col
+                if self.level_map.tile(r, c) == ' ':
+                    enemy.exploding = True
+                    pts = TILE_SCORES.get(ENEMY_TILE_CHARS[enemy.enemy_type], 0)
+                    self.score += pts
+                    self.add_floating_score(
+                        enemy.wall_col * TILE_SIZE + 16,
+                        enemy.wall_row * TILE_SIZE, pts)
+                    if 'splatter' in self.sounds:
+                        self.sounds['splatter'].play()
+
+        # El overlay de musgo NO se regenera; el moss original
+        # queda intacto y los nuevos bordes expuestos quedan sin moss
+
+        if 'explosion' in self.sounds:
+            self.sounds['explosion'].play()
+
     def player_hit(self):
         """Player takes damage - inicia animación de muerte"""
         self.lives -= 1
@@ -1086,6 +1115,11 @@ class Game:
         # Stop helicopter sound
         self.sound_manager.stop_loop('helicopter')
 
+        # Preparar el nivel siguiente en un thread mientras corre la cuenta final
+        if self.level_num + 1 < len(LEVELS):
+            self._level_preparer.start(self.level_num + 1,
+                                       *self._prepare_level_args(self.level_num + 1))
+
         # Inicializar animacion de level complete
         self.state = STATE_LEVEL_COMPLETE
         self.score_beep_timer = 0
@@ -1157,6 +1191,7 @@ class Game:
         # Update player
         self.player.update(dt, self.keys, self.joy_axis_x, self.joy_axis_y,
                           self.level_map, self)
+        self.phase_timer.lap('player')
 
         # Contacto con lava detectado por check_collision pixel-perfect
         if self.player._touched_lava:
@@ -1180,6 +1215,10 @@ class Game:
             enemy.update(dt, self.level_map)
             if not enemy.active:
                 self.enemies.remove(enemy)
+                self.enemy_index.remove(enemy)
+            else:
+                self.enemy_index.move(enemy)
+        self.phase_timer.lap('enemies')
 
         # Update lasers
         for laser in self.lasers[:]:
@@ -1187,21 +1226,21 @@ class Game:
             # Procesar impacto en roca antes de eliminar el láser
             if laser.hit_rock_pos:
                 row, col = laser.hit_rock_pos
-                tile_char = self.level_map[row][col] if (0 <= row < len(self.level_map) and 0 <= col < len(self.level_map[row])) else ' '
+                tile_char = self.level_map.tile(row, col)
                 if tile_char in ('R', 'W'):
                     key = (row, col)
                     if key not in self.rock_health:
                         self.rock_health[key] = ROCK_LASER_HITS
                     self.rock_health[key] -= 1
                     if self.rock_health[key] == ROCK_DAMAGE_MIDPOINT:
+                        # Sprite agrietado en el compuesto del viewport
+                        self.static_layers.invalidate_tile(row, col)
                         # Sonido de agrietamiento al llegar al estado intermedio
                         if 'rock_crack' in self.sounds:
                             self.sounds['rock_crack'].play()
                     if self.rock_health[key] <= 0:
                         # Destruir la roca
-                        row_list = list(self.level_map[row])
-                        row_list[col] = ' '
-                        self.level_map[row] = "".join(row_list)
+                        self.level_map.set(row, col, ' ')
                         del self.rock_health[key]
                         tile_x = col * TILE_SIZE
                         tile_y = row * TILE_SIZE
@@ -1211,14 +1250,18 @@ class Game:
                         if 'rock_break' in self.sounds:
                             self.sounds['rock_break'].play()
                 laser.hit_rock_pos = None
-            if not laser.active:
+            # Un láser que chocó este frame queda hasta check_collisions (su último
+            # tramo todavía puede alcanzar a un enemigo)
+            if not laser.active and laser.sweep_rect is None:
                 self.lasers.remove(laser)
+        self.phase_timer.lap('lasers')
 
         # Update dynamites
         for dynamite in self.dynamites[:]:
             dynamite.update(dt, self.level_map)
             if not dynamite.active:
                 self.dynamites.remove(dynamite)
+        self.phase_timer.lap('dynamites')
 
         # Update floating scores
         self.floating_scores_mgr.update(dt, rise_speed=30)
@@ -1234,12 +1277,10 @@ class Game:
         p_tile_right = int((self.player.x + self.player.width) / TILE_SIZE)
         p_tile_top = max(0, int(self.player.y / TILE_SIZE))
         p_tile_bottom = min(int((self.player.y + self.player.height) / TILE_SIZE),
-                            len(self.level_map) - 1 if self.level_map else 0)
+                            self.level_map.height - 1 if self.level_map else 0)
         for tile_row in range(p_tile_top, p_tile_bottom + 1):
             for tile_col in range(p_tile_left, p_tile_right + 1):
-                if (0 <= tile_row < len(self.level_map) and
-                        0 <= tile_col < len(self.level_map[tile_row]) and
-                        self.level_map[tile_row][tile_col] == '~'):
+                if self.level_map.tile(tile_row, tile_col) == '~':
                     # Usar hit rect del agua (bounding box de píxeles visibles del tile)
                     water_rect = self.toxic_water_hit_rect.move(
                         tile_col * TILE_SIZE, tile_row * TILE_SIZE)
@@ -1248,7 +1289,9 @@ class Game:
                         return
 
         # Check collisions
+        self.phase_timer.lap('misc')
         self.check_collisions()
+        self.phase_timer.lap('collisions')
 
         # Colision jugador-lampara (toggle oscuridad, deteccion por flanco)
         # Usa bounding box de pixeles visibles del sprite, no el tile completo
@@ -1327,17 +1370,9 @@ class Game:
 
             self.bomb_explode_timer -= dt
             if self.bomb_explode_timer <= 0 and self.dynamite_count > 0:
-                # Calcular posicion del icono de bomba en HUD
-                panel_w = 70
-                ce = SCREEN_WIDTH - panel_w - 10
-                icon_gap = 2
-                hud_y = VIEWPORT_HEIGHT
-                icons_y = hud_y + 28
-                bomb_count = self.dynamite_count
-                bomb_spacing = 10  # Mismo espaciado que en render_hud
-                # Posicion de la bomba mas a la izquierda (la que va a explotar)
-                bx = ce - bomb_count * bomb_spacing
-                by = icons_y
+                # Posicion de la bomba mas a la izquierda del HUD (la que va a explotar)
+                bx = bomb_icon_x(0, self.dynamite_count)
+                by = VIEWPORT_HEIGHT + HUD_ICONS_Y
 
                 # Crear efecto de explosion en esa posicion
                 self.bomb_explosion_effects.append({
@@ -1368,122 +1403,104 @@ class Game:
             if self.level_complete_timer <= 0:
                 self.next_level()
 
-    def _to_grayscale(self, surface):
-        """Convierte una surface a escala de gris (con cache)"""
-        key = id(surface)
-        if key not in self._grayscale_cache:
-            self._grayscale_cache[key] = pygame.transform.grayscale(surface)
-        return self._grayscale_cache[key]
-
-    def render_lamps(self):
+    def render_lamps(self, mode=None):
         """Dibuja las lamparas en sus posiciones (en game_surface)"""
         cam_x = int(self.camera_x)
         cam_y = int(self.camera_y)
+        lamp_img = (mode or self.color_mode).sprite(self.tiles['lamp'])
         for lamp in self.lamps:
             sx = lamp['x'] - cam_x
             sy = lamp['y'] - cam_y
             if -TILE_SIZE < sy < GAME_VIEWPORT_HEIGHT and -TILE_SIZE < sx < GAME_WIDTH:
-                self.game_surface.blit(self.tiles['lamp'], (sx, sy))
-
-    def _render_dark_mode_overlay(self):
-        """Modo oscuridad estilo C64: fondo negro, sprites en gris, lasers/dinamitas en color"""
-        if not self.dark_mode or self.explosion_flash:
-            return
+                self.game_surface.blit(lamp_img, (sx, sy))
 
-        cam_x = int(self.camera_x)
-        cam_y = int(self.camera_y)
+    def _render_mode(self):
+        """Modo de render del frame: oscuridad estilo C64 (sin nivel, sprites en
+        gris; lasers y dinamitas en color) salvo durante el flash de explosión"""
+        if self.dark_mode and not self.explosion_flash:
+            return self.dark_render_mode
+        return self.color_mode
 
-        # Cubrir viewport con negro (oculta tiles/fondo) - en game_surface
-        pygame.draw.rect(self.game_surface, COLOR_BLACK, (0, 0, GAME_WIDTH, GAME_VIEWPORT_HEIGHT))
+    def _render_world(self, mode):
+        """Nivel y lámparas en game_surface (en oscuridad el nivel no se ve)"""
+        self.game_surface.fill(COLOR_BLACK)
+        if not mode.dark:
+            self.render_level()
+        self.render_lamps(mode)
 
-        # Lamparas en gris
-        gray_lamp = self._to_grayscale(self.tiles['lamp'])
-        for lamp in self.lamps:
-            sx = lamp['x'] - cam_x
-            sy = lamp['y'] - cam_y
-            if -TILE_SIZE < sy < GAME_VIEWPORT_HEIGHT and -TILE_SIZE < sx < GAME_WIDTH:
-                self.game_surface.blit(gray_lamp, (sx, sy))
+    def _render_entities(self, mode, with_player=True):
+        """Entidades en game_surface con las variantes de sprites de mode.
+        with_player=False omite al jugador y sus lasers (animación de muerte)"""
+        if self.miner:
+            self.miner.draw(self.game_surface, self.camera_x, self.camera_y, mode)
 
-        # Minero en gris
-        if self.miner and not self.miner.rescued:
-            sx = self.miner.x - cam_x
-            sy = self.miner.y - cam_y
-            if -50 < sy < GAME_VIEWPORT_HEIGHT + 50 and -50 < sx < GAME_WIDTH + 50:
-                if self.miner.image:
-                    gray_img = self._to_grayscale(self.miner.image)
-                    self.game_surface.blit(gray_img, (int(sx), int(sy)))
-
-        # Enemigos en gris
         for enemy in self.enemies:
-            if not enemy.active:
-                continue
-            sx = enemy.x - cam_x
-            sy = enemy.y - cam_y
-            if -50 < sy < GAME_VIEWPORT_HEIGHT + 50 and -50 < sx < GAME_WIDTH + 50:
-                if enemy.exploding:
-                    # Explosion en gris
-                    progress = enemy.explosion_timer / enemy.explosion_duration
-                    radius = int(8 + progress * 10)
-                    for i in range(2):
-                        r = radius - i * 5
-                        if r > 0:
-                            gray_val = 100 if i == 0 else 70
-                            pygame.draw.circle(self.game_surface, (gray_val, gray_val, gray_val),
-                                             (int(sx + 16), int(sy + 16)), r)
-                else:
-                    # Hilo de araña en gris
-                    if enemy.enemy_type == "spider":
-                        ceiling_y = enemy._find_ceiling_y(self.level_map)
-                        if ceiling_y is not None:
-                            thread_top = ceiling_y - cam_y
-                            thread_bottom = sy + enemy.height // 2
-                            center_x = int(sx + enemy.width // 2)
-                            pygame.draw.line(self.game_surface, COLOR_GRAY,
-                                           (center_x, int(thread_top)),
-                                           (center_x, int(thread_bottom)), 1)
-                    if enemy.image:
-                        gray_img = self._to_grayscale(enemy.image)
-                        self.game_surface.blit(gray_img, (int(sx), int(sy)))
-
-        # Jugador en gris
-        if self.player:
-            sx = self.player.x - cam_x
-            sy = self.player.y - cam_y
-            if -50 < sy < GAME_VIEWPORT_HEIGHT + 50 and -50 < sx < GAME_WIDTH + 50:
-                # Seleccionar sprite (misma logica que player.draw)
-                base_img = self.player.image
-                if self.player.shooting_timer > 0 and self.player.image_shooting:
-                    base_img = self.player.image_shooting
-                elif not self.player.is_grounded and self.player.image_fly:
-                    base_img = self.player.image_fly
-                elif self.player.is_walking and self.player.walk_frames:
-                    base_img = self.player.walk_frames[self.player.walk_frame_index]
-                if base_img:
-                    gray_img = self._to_grayscale(base_img)
-                    if self.player.facing_right:
-                        gray_img = pygame.transform.flip(gray_img, True, False)
-                    self.game_surface.blit(gray_img, (int(sx), int(sy)))
-
-        # Lasers y dinamitas en color (visibles)
-        for laser in self.lasers:
-            laser.draw(self.game_surface, cam_x, cam_y)
+            enemy.draw(self.game_surface, self.camera_x, self.camera_y, self.level_map,
+                       wall_tile=self.tiles.get('wall'), tinted_floors=self.tinted_floors,
+                       floor_texture=self.floor_texture, mode=mode)
+
+        if with_player:
+            for laser in self.lasers:
+                laser.draw(self.game_surface, self.camera_x, self.camera_y)
+
+            if self.player:
+                self.player.draw(self.game_surface, self.camera_x, self.camera_y, mode)
+
         for dynamite in self.dynamites:
-            dynamite.draw(self.game_surface, cam_x, cam_y)
+            dynamite.draw(self.game_surface, self.camera_x, self.camera_y)
+
+    def _static_tile_image(self, row, col):
+        """Sprite de un tile que no se anima, o None (aire y agua tóxica)"""
+        grid = self.level_map
+        if col >= grid.row_width(row):
+            # Espacio fuera de la banda: renderizar como pared sólida
+            return self.tiles['wall']
+        tile = grid.tile(row, col)
+        if tile == '#':
+            return self.tiles['wall']
+        if tile == '.':
+            return self.tinted_floors[row % VIEWPORT_ROWS]
+        if tile == 'G':
+            return self.tiles['granite']
+        if tile == 'X':
+            return self.tiles['lava']
+        if tile in ('R', 'W'):
+            # Sprite dañado si la roca fue impactada lo suficiente
+            name = 'rock' if tile == 'R' else 'lava_rock'
+            health = self.rock_health.get((row, col))
+            if health is not None and health <= ROCK_DAMAGE_MIDPOINT:
+                name += '_damaged'
+            return self.tiles[name]
+        return None
+
+    def _animated_tile_image(self, tile):
+        """Frame actual de un tile animado (agua tóxica con onda)"""
+        frame_idx = int(self.toxic_water_scroll) % len(self.toxic_water_frames)
+        return self.toxic_water_frames[frame_idx]
 
     def render_level(self):
-        """Render visible part of level (en game_surface, sin escalar)"""
-        level_w = max_level_width(self.level_map) if self.level_map else DEFAULT_LEVEL_WIDTH
-        level_h = len(self.level_map) if self.level_map else DEFAULT_LEVEL_HEIGHT
-        # Usar offset entero consistente para fondo y tiles
+        """Render visible part of level (en game_surface, sin escalar).
+        Normalmente es el compuesto estático del viewport + los tiles animados;
+        el flash de explosión (fondo blanco) se dibuja tile por tile."""
         cam_x = int(self.camera_x)
         cam_y = int(self.camera_y)
+        if self.explosion_flash or self.static_layers is None:
+            self._render_level_direct(cam_x, cam_y)
+            return
+        self.static_layers.blit(self.game_surface, cam_x, cam_y, self._animated_tile_image)
+
+    def _render_level_direct(self, cam_x, cam_y):
+        """Dibuja fondo, tiles y overlays sin compuesto (flash de explosión)"""
+        grid = self.level_map
+        level_w = grid.max_width if grid else DEFAULT_LEVEL_WIDTH
+        level_h = grid.height if grid else DEFAULT_LEVEL_HEIGHT
 
         # Dibujar fondo de caverna (o flash blanco si hay explosion)
         if self.explosion_flash:
             self.game_surface.fill(COLOR_WHITE, (0, 0, GAME_WIDTH, GAME_VIEWPORT_HEIGHT))
         elif self.cave_bg:
             src_rect = pygame.Rect(cam_x, cam_y, GAME_WIDTH, GAME_VIEWPORT_HEIGHT)
-            self.game_surface.blit(self.cave_bg, (0, 0), src_rect)
+            self.cave_bg.blit_area(self.game_surface, (0, 0), src_rect)
 
         # Calculate visible tiles (ambos ejes)
         start_col = max(0, cam_x // TILE_SIZE - 1)
@@ -1492,81 +1509,50 @@ class Game:
         end_row = min(level_h, (cam_y + GAME_VIEWPORT_HEIGHT) // TILE_SIZE + 2)
 
         for row_index in range(start_row, end_row):
-            if row_index >= len(self.level_map):
-                break
-
-            row = self.level_map[row_index]
             for col_index in range(start_col, end_col):
-                if col_index >= len(row):
-                    # Espacio fuera de la banda: renderizar como pared sólida
-                    x = col_index * TILE_SIZE - cam_x
-                    y = row_index * TILE_SIZE - cam_y
-                    self.game_surface.blit(self.tiles['wall'], (x, y))
-                    continue
-                tile = row[col_index]
                 x = col_index * TILE_SIZE - cam_x
                 y = row_index * TILE_SIZE - cam_y
-
-                if tile == '#':
-                    self.game_surface.blit(self.tiles['wall'], (x, y))
-                elif tile == '.':
-                    local_row = row_index % VIEWPORT_ROWS
-                    self.game_surface.blit(self.tinted_floors[local_row], (x, y))
-                elif tile == 'G':
-                    self.game_surface.blit(self.tiles['granite'], (x, y))
-                elif tile == 'R':
-                    # Mostrar sprite dañado si la roca fue impactada lo suficiente
-                    key = (row_index, col_index)
-                    if key in self.rock_health and self.rock_health[key] <= ROCK_DAMAGE_MIDPOINT:
-                        self.game_surface.blit(self.tiles['rock_damaged'], (x, y))
-                    else:
-                        self.game_surface.blit(self.tiles['rock'], (x, y))
-                elif tile == 'X':
-                    self.game_surface.blit(self.tiles['lava'], (x, y))
-                elif tile == 'W':
-                    # Roca lava: sprite dañado si fue impactada lo suficiente
-                    key = (row_index, col_index)
-                    if key in self.rock_health and self.rock_health[key] <= ROCK_DAMAGE_MIDPOINT:
-                        self.game_surface.blit(self.tiles['lava_rock_damaged'], (x, y))
-                    else:
-                        self.game_surface.blit(self.tiles['lava_rock'], (x, y))
-                elif tile == '~':
-                    # Agua tóxica con onda animada por frames
-                    frame_idx = int(self.toxic_water_scroll) % len(self.toxic_water_frames)
-                    self.game_surface.blit(self.toxic_water_frames[frame_idx], (x, y))
+                image = self._static_tile_image(row_index, col_index)
+                if image:
+                    self.game_surface.blit(image, (x, y))
+                elif grid.tile(row_index, col_index) == '~':
+                    self.game_surface.blit(self._animated_tile_image('~'), (x, y))
                 # Espacios vacios: no dibujar nada, el cave_bg ya se ve
 
+        # Overlays por chunks: con la cámara alineada al viewport es un solo chunk
+        src_rect = pygame.Rect(cam_x, cam_y, GAME_WIDTH, GAME_VIEWPORT_HEIGHT)
+
         # Overlay de textura porosa del suelo
         if self.floor_texture:
-            src_rect = pygame.Rect(cam_x, cam_y, GAME_WIDTH, GAME_VIEWPORT_HEIGHT)
-            self.game_surface.blit(self.floor_texture, (0, 0), src_rect)
+            self.floor_texture.blit_area(self.game_surface, (0, 0), src_rect)
 
         # Overlay de musgo/raíces
         if self.edge_overlay:
-            src_rect = pygame.Rect(cam_x, cam_y, GAME_WIDTH, GAME_VIEWPORT_HEIGHT)
-            self.game_surface.blit(self.edge_overlay, (0, 0), src_rect)
+            self.edge_overlay.blit_area(self.game_surface, (0, 0), src_rect)
 
     def _render_game_to_screen(self):
-        """Escala game_surface (512x256) a la zona de juego del screen (768x384)"""
-        self._render_pipeline.scale_game_to_screen()
+        """La zona de juego del frame es game_surface (512x256). Con display,
+        el Presenter la escala una sola vez directo al display; en headless se
+        escala a la zona de juego del screen (768x384), que es lo que se lee"""
+        if self.display_surface is None:
+            pygame.transform.scale(self.game_surface, (SCREEN_WIDTH, VIEWPORT_HEIGHT), self._screen_view)
+            return
+        self._game_view = True
+
+    def _flatten_game_view(self):
+        """Lleva game_surface al screen antes de dibujar encima de la zona de
+        juego (overlays); ese frame se presenta como un solo plano"""
+        if self._game_view:
+            pygame.transform.scale(self.game_surface, (SCREEN_WIDTH, VIEWPORT_HEIGHT), self._screen_view)
+            self._game_view = False
 
     def render_dying(self):
         """Renderiza la animación de muerte: nivel + esqueleto en lugar del player"""
-        self.game_surface.fill(COLOR_BLACK)
-        self.render_level()
-        self.render_lamps()
+        mode = self._render_mode()
+        self._render_world(mode)
 
         # Dibujar entidades (sin el player)
-        if self.miner and not self.miner.rescued:
-            self.miner.draw(self.game_surface, self.camera_x, self.camera_y)
-
-        for enemy in self.enemies:
-            enemy.draw(self.game_surface, self.camera_x, self.camera_y, self.level_map,
-                       wall_tile=self.tiles.get('wall'), tinted_floors=self.tinted_floors,
-                       floor_texture=self.floor_texture)
-
-        for dynamite in self.dynamites:
-            dynamite.draw(self.game_surface, self.camera_x, self.camera_y)
+        self._render_entities(mode, with_player=False)
 
         # Dibujar esqueleto o flash en la posición del player
         screen_x = self.death_x - self.camera_x
@@ -1591,92 +1577,20 @@ class Game:
             # Mostrar esqueleto
             skeleton = self.sprites.get('skeleton')
             if skeleton:
-                img = skeleton
-                if self.death_facing_right:
-                    img = pygame.transform.flip(skeleton, True, False)
+                img = mode.sprite(skeleton, self.death_facing_right)
                 self.game_surface.blit(img, (int(screen_x), int(screen_y)))
 
-        # Oscuridad estilo C64
-        self._render_dark_mode_overlay()
-
         self.render_floating_scores()
         self._render_game_to_screen()
         self.render_hud()
 
     def render_hud(self):
-        """Render HUD - ColecoVision style"""
-        hud_y = VIEWPORT_HEIGHT
-        hud_h = HUD_HEIGHT
-
-        # Colores paleta ColecoVision TMS9918A
-        cv_yellow = (212, 193, 84)
-        cv_red = (212, 82, 77)
-        cv_gray = (192, 192, 192)
-        cv_highlight = (224, 224, 224)
-        cv_shadow = (140, 140, 140)
-
-        # Fondo negro para toda el area del HUD
-        pygame.draw.rect(self.screen, COLOR_BLACK, (0, hud_y, SCREEN_WIDTH, hud_h))
-
-        # --- Paneles grises laterales con bisel 3D ---
-        panel_w = 70
-
-        # Panel izquierdo
-        pygame.draw.rect(self.screen, cv_gray, (0, hud_y, panel_w, hud_h))
-        pygame.draw.rect(self.screen, cv_highlight, (0, hud_y, panel_w, 2))
-        pygame.draw.rect(self.screen, cv_highlight, (0, hud_y, 2, hud_h))
-        pygame.draw.rect(self.screen, cv_shadow, (0, hud_y + hud_h - 2, panel_w, 2))
-        pygame.draw.rect(self.screen, cv_shadow, (panel_w - 2, hud_y, 2, hud_h))
-
-        # Panel derecho
-        rx = SCREEN_WIDTH - panel_w
-        pygame.draw.rect(self.screen, cv_gray, (rx, hud_y, panel_w, hud_h))
-        pygame.draw.rect(self.screen, cv_highlight, (rx, hud_y, panel_w, 2))
-        pygame.draw.rect(self.screen, cv_highlight, (rx, hud_y, 2, hud_h))
-        pygame.draw.rect(self.screen, cv_shadow, (rx, hud_y + hud_h - 2, panel_w, 2))
-        pygame.draw.rect(self.screen, cv_shadow, (SCREEN_WIDTH - 2, hud_y, 2, hud_h))
-
-        # --- Area central ---
-        cx = panel_w + 10
-        ce = SCREEN_WIDTH - panel_w - 10
-
-        # Fila 1: POWER label + barra de energia
-        power_label = self.hud_font.render("POWER", True, cv_yellow)
-        self.screen.blit(power_label, (cx, hud_y + 8))
-
-        bar_x = cx + power_label.get_width() + 8
-        bar_y = hud_y + 8
-        bar_w = ce - bar_x
-        bar_h = 12
-
-        # Barra: fondo rojo (energia gastada), relleno amarillo (energia restante)
-        pygame.draw.rect(self.screen, cv_red, (bar_x, bar_y, bar_w, bar_h))
-        energy_pct = max(0, min(1, self.energy / MAX_ENERGY))
-        fill_w = int(energy_pct * bar_w)
-        if fill_w > 0:
-            pygame.draw.rect(self.screen, cv_yellow, (bar_x, bar_y, fill_w, bar_h))
-
-        # Fila 2: Vidas (iconos player) izquierda, Bombas (iconos bomb) derecha
-        icons_y = hud_y + 28
-        icon_gap = 2
-
-        # Iconos de vidas
-        for i in range(min(self.lives, 10)):
-            ix = cx + i * (16 + icon_gap)
-            if self.hud_player_icon:
-                self.screen.blit(self.hud_player_icon, (ix, icons_y))
-            else:
-                pygame.draw.rect(self.screen, COLOR_BLUE, (ix + 2, icons_y, 12, 16))
-
-        # Iconos de bombas (alineados a la derecha, juntas)
-        bomb_count = max(0, min(self.dynamite_count, 10))
-        bomb_spacing = 10  # Espaciado reducido para que se vean juntas
-        for i in range(bomb_count):
-            bx = ce - (bomb_count - i) * bomb_spacing
-            if self.hud_bomb_icon:
-                self.screen.blit(self.hud_bomb_icon, (bx, icons_y))
-            else:
-                pygame.draw.rect(self.screen, cv_red, (bx + 3, icons_y, 10, 16))
+        """Render HUD - ColecoVision style. La capa estática y los campos viven
+        en el Hud (se repintan solo al cambiar); los efectos van encima cada frame"""
+        if self.hud is None:
+            self.hud = Hud(self.hud_font, self.hud_player_icon, self.hud_bomb_icon)
+        self.hud.draw(self.screen, (0, VIEWPORT_HEIGHT), self.energy, self.lives,
+                      self.dynamite_count, self.level_num, self.score)
 
         # Efectos de explosion de bombas (animacion level complete)
         for effect in self.bomb_explosion_effects:
@@ -1691,21 +1605,22 @@ class Game:
             pygame.draw.circle(explosion_surf, (255, 255, 0, alpha), (radius, radius), inner_r)
             self.screen.blit(explosion_surf, (effect['x'] - radius, effect['y'] - radius))
 
-        # Fila 3: LEVEL + numero (izquierda), Score (derecha)
-        bottom_y = hud_y + 54
-        level_text = self.hud_font.render(f"LEVEL: {self.level_num + 1}", True, cv_yellow)
-        self.screen.blit(level_text, (cx, bottom_y))
-
-        score_text = self.hud_font.render(f"{self.score}", True, cv_yellow)
-        self.screen.blit(score_text, (ce - score_text.get_width(), bottom_y))
-
     def draw_text_with_outline(self, font, text, color, outline_color, center, outline=1, surface=None):
         target = surface or self.screen
-        _draw_text_with_outline(target, font, text, color, outline_color, center, outline)
+        font.draw_outlined(target, text, color, outline_color, center, outline)
 
 
     def render_splash(self):
-        """Render splash screen - dibuja a 512x480 (original) y pega centrado sin estirar"""
+        """Render splash screen - dibuja a 512x480 (original) y pega centrado sin
+        estirar. Se compone y escala una vez; se rehace si cambian los records"""
+        scores = load_scores()[:3]
+        if self._splash_cache is None or self._splash_version != _score_manager.version:
+            self._splash_cache = self._compose_splash(scores)
+            self._splash_version = _score_manager.version
+        self.screen.blit(self._splash_cache, self._splash_pos)
+
+    def _compose_splash(self, scores):
+        """Splash completo (fondo, textos y records) escalado al tamaño en screen"""
         s = self.splash_surface
         cx = self._splash_w // 2
 
@@ -1739,7 +1654,6 @@ class Game:
         self.draw_text_with_outline(self.small_font, "Controller: Stick/X/B", COLOR_WHITE, COLOR_BLACK, (cx, 355), surface=s)
         self.draw_text_with_outline(self.small_font, "HIGH SCORES", COLOR_WHITE, COLOR_BLACK, (cx, 390), surface=s)
 
-        scores = load_scores()[:3]
         for i, score in enumerate(scores):
             self.draw_text_with_outline(self.small_font, f"{i+1}. {score['name']}: {score['score']}", COLOR_WHITE, COLOR_BLACK, (cx, 420 + i*20), surface=s)
 
@@ -1747,8 +1661,8 @@ class Game:
         scale = min(SCREEN_WIDTH / self._splash_w, SCREEN_HEIGHT / self._splash_h)
         sw = int(self._splash_w * scale)
         sh = int(self._splash_h * scale)
-        scaled = pygame.transform.scale(s, (sw, sh))
-        self.screen.blit(scaled, ((SCREEN_WIDTH - sw) // 2, (SCREEN_HEIGHT - sh) // 2))
+        self._splash_pos = ((SCREEN_WIDTH - sw) // 2, (SCREEN_HEIGHT - sh) // 2)
+        return pygame.transform.scale(s, (sw, sh))
 
     def render_entering_name(self):
         """Render name entry screen (victoria o game over)"""
@@ -1758,75 +1672,29 @@ class Game:
             # "VICTORY!" con cada letra de un color distinto, ciclando la paleta
             self.victory_palette_offset = (self.victory_palette_offset + 1) % 256
             victory_text = "VICTORY!"
-            # Renderizar cada letra por separado con color distinto
-            letter_surfaces = []
-            total_w = 0
+            # Cada letra con un color distinto (recoloreo por paleta del atlas)
             spacing = 256 // len(victory_text)  # Distribuir colores uniformemente
-            for i, ch in enumerate(victory_text):
-                color_idx = (self.victory_palette_offset + i * spacing) % 256
-                color = self._victory_palette[color_idx]
-                surf = self.font.render(ch, True, color)
-                letter_surfaces.append(surf)
-                total_w += surf.get_width()
-            # Centrar y dibujar
-            x = (SCREEN_WIDTH - total_w) // 2
-            y = 100
-            for surf in letter_surfaces:
-                h = surf.get_height()
-                self.screen.blit(surf, (x, y - h // 2))
-                x += surf.get_width()
+            colors = [self._victory_palette[(self.victory_palette_offset + i * spacing) % 256]
+                      for i in range(len(victory_text))]
+            self.font.draw_recolored(self.screen, victory_text, colors, center=(SCREEN_WIDTH // 2, 100))
         else:
-            game_over = self.font.render("GAME OVER", True, COLOR_RED)
-            go_rect = game_over.get_rect(center=(SCREEN_WIDTH//2, 100))
-            self.screen.blit(game_over, go_rect)
+            self.font.draw(self.screen, "GAME OVER", COLOR_RED, center=(SCREEN_WIDTH // 2, 100))
 
-        score_text = self.small_font.render(f"Final Score: {self.score}", True, COLOR_WHITE)
-        score_rect = score_text.get_rect(center=(SCREEN_WIDTH//2, 150))
-        self.screen.blit(score_text, score_rect)
+        self.small_font.draw(self.screen, f"Final Score: {self.score}", COLOR_WHITE, center=(SCREEN_WIDTH // 2, 150))
 
         # Solo permitir entrada de nombre si el score es mayor a 0
         if self.score > 0 or self.is_victory:
-            prompt = self.small_font.render("Enter Your Name:", True, COLOR_WHITE)
-            prompt_rect = prompt.get_rect(center=(SCREEN_WIDTH//2, 200))
-            self.screen.blit(prompt, prompt_rect)
-
-            name = self.font.render(self.player_name + "_", True, COLOR_GREEN)
-            name_rect = name.get_rect(center=(SCREEN_WIDTH//2, 240))
-            self.screen.blit(name, name_rect)
-
-            instr = self.small_font.render("Press ENTER when done", True, COLOR_GRAY)
-            instr_rect = instr.get_rect(center=(SCREEN_WIDTH//2, 300))
-            self.screen.blit(instr, instr_rect)
+            self.small_font.draw(self.screen, "Enter Your Name:", COLOR_WHITE, center=(SCREEN_WIDTH // 2, 200))
+            self.font.draw(self.screen, self.player_name + "_", COLOR_GREEN, center=(SCREEN_WIDTH // 2, 240))
+            self.small_font.draw(self.screen, "Press ENTER when done", COLOR_GRAY, center=(SCREEN_WIDTH // 2, 300))
         else:
-            instr = self.small_font.render("Press ENTER to continue", True, COLOR_GRAY)
-            instr_rect = instr.get_rect(center=(SCREEN_WIDTH//2, 250))
-            self.screen.blit(instr, instr_rect)
+            self.small_font.draw(self.screen, "Press ENTER to continue", COLOR_GRAY, center=(SCREEN_WIDTH // 2, 250))
 
     def render_level_complete(self):
         """Render level complete - fases 0 y 1 muestran juego + HUD, fase 2 agrega overlay"""
-        self.game_surface.fill(COLOR_BLACK)
-        self.render_level()
-        self.render_lamps()
-
-        if self.miner:
-            self.miner.draw(self.game_surface, self.camera_x, self.camera_y)
-
-        for enemy in self.enemies:
-            enemy.draw(self.game_surface, self.camera_x, self.camera_y, self.level_map,
-                       wall_tile=self.tiles.get('wall'), tinted_floors=self.tinted_floors,
-                       floor_texture=self.floor_texture)
-
-        for laser in self.lasers:
-            laser.draw(self.game_surface, self.camera_x, self.camera_y)
-
-        if self.player:
-            self.player.draw(self.game_surface, self.camera_x, self.camera_y)
-
-        for dynamite in self.dynamites:
-            dynamite.draw(self.game_surface, self.camera_x, self.camera_y)
-
-        # Oscuridad con spotlight
-        self._render_dark_mode_overlay()
+        mode = self._render_mode()
+        self._render_world(mode)
+        self._render_entities(mode)
 
         self.render_floating_scores()
         self._render_game_to_screen()
@@ -1834,6 +1702,7 @@ class Game:
 
         # Solo en fase 2: overlay oscuro + texto "LEVEL COMPLETE!"
         if self.level_complete_phase == 2:
+            self._flatten_game_view()
             overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
             overlay.set_alpha(128)
             overlay.fill(COLOR_BLACK)
@@ -1844,184 +1713,222 @@ class Game:
             self.screen.blit(complete, complete_rect)
 
     def loop(self):
-        """Main game loop"""
+        """Main game loop: eventos y render a la tasa del display, simulación a
+        paso fijo SIM_DT (varios pasos por frame o ninguno, según el tiempo)"""
         running = True
+        sim_clock = FixedStepClock(SIM_DT, MAX_SIM_STEPS)
 
         while running:
-            dt = self.clock.tick(FPS) / 1000.0
-
-            # Get input (via InputManager)
-            self.input_manager.poll()
-            self.keys = self.input_manager.keys
-            self.joy_axis_x = self.input_manager.joy_axis_x
-            self.joy_axis_y = self.input_manager.joy_axis_y
-
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-
-                elif event.type == pygame.KEYDOWN:
-                    # Fullscreen toggle (F11)
-                    if event.key == pygame.K_F11:
-                        self.toggle_fullscreen()
-                        continue
-
-                    # Quit confirmation dialog
-                    if self.show_quit_confirm:
-                        if event.key in (pygame.K_y, pygame.K_ESCAPE):
-                            running = False
-                        else:
-                            self.show_quit_confirm = False
-                        continue
-
-                    if self.state == STATE_SPLASH:
-                        if event.key == pygame.K_SPACE:
-                            self.level_num = 0
-                            self.score = 0
-                            self.lives = INITIAL_LIVES
-                            self.dynamite_count = 6
-                            self.last_life_score = 0
-                            self.start_level()
-                        elif event.key == pygame.K_ESCAPE:
-                            self.show_quit_confirm = True
-
-                    elif self.state == STATE_PLAYING:
-                        if event.key == pygame.K_SPACE:
-                            self.shoot_laser()
-                        elif event.key == pygame.K_z:
-                            self.drop_dynamite()
-                        elif event.key == pygame.K_ESCAPE:
-                            # Stop helicopter sound
-                            self.sound_manager.stop_loop('helicopter')
-                            # Return to splash screen
-                            self.state = STATE_SPLASH
+            # Sin vsync, dibujar más rápido que el monitor solo suma escalado y
+            # presentación de frames que no se llegan a ver
+            frame_dt = self.clock.tick(self.render_fps) / 1000.0
+
+            running = self.handle_events()
+
+            steps = sim_clock.advance(frame_dt)
+            for _ in range(steps):
+                self.step(SIM_DT)
+            if self.recorder:
+                self.recorder.end_frame(steps, state_checksum(self))
+
+            self.update_music()
+            self.render_frame(sim_clock.alpha)
+
+        pygame.quit()
+
+    def poll_input(self):
+        """Lee el input del frame (InputManager + cola de eventos). Si se está
+        grabando, retorna el input normalizado tal como queda en el replay."""
+        self.input_manager.poll()
+        sample = InputSample(self.input_manager.keys, self.input_manager.joy_axis_x,
+                             self.input_manager.joy_axis_y, pygame.event.get())
+        if self.recorder:
+            sample = self.recorder.capture(sample)
+        return sample
+
+    def handle_events(self, sample=None):
+        """Aplica el input del frame y procesa eventos. Retorna False si hay que salir.
+        sample: InputSample ya leído (replay); None = leerlo con poll_input"""
+        running = True
+
+        if sample is None:
+            sample = self.poll_input()
+        self.keys = sample.keys
+        self.joy_axis_x = sample.joy_x
+        self.joy_axis_y = sample.joy_y
+
+        # Handle events
+        for event in sample.events:
+            if event.type == pygame.QUIT:
+                running = False
+
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # El sistema pidió repintar la ventana: el próximo frame va completo
+                self.presenter.invalidate()
+
+            elif event.type == pygame.KEYDOWN:
+                # Fullscreen toggle (F11)
+                if event.key == pygame.K_F11:
+                    self.toggle_fullscreen()
+                    continue
 
-                    elif self.state == STATE_ENTERING_NAME:
-                        # Sin score, solo ENTER para volver al splash
-                        if self.score <= 0 and not self.is_victory:
-                            if event.key == pygame.K_RETURN:
-                                self.state = STATE_SPLASH
-                        elif event.key == pygame.K_RETURN:
-                            if len(self.player_name) > 0:
+                # Quit confirmation dialog
+                if self.show_quit_confirm:
+                    if event.key in (pygame.K_y, pygame.K_ESCAPE):
+                        running = False
+                    else:
+                        self.show_quit_confirm = False
+                    continue
+
+                if self.state == STATE_SPLASH:
+                    if event.key == pygame.K_SPACE:
+                        self.start_new_game()
+                    elif event.key == pygame.K_ESCAPE:
+                        self.show_quit_confirm = True
+
+                elif self.state == STATE_PLAYING:
+                    if event.key == pygame.K_SPACE:
+                        self.shoot_laser()
+                    elif event.key == pygame.K_z:
+                        self.drop_dynamite()
+                    elif event.key == pygame.K_ESCAPE:
+                        # Stop helicopter sound
+                        self.sound_manager.stop_loop('helicopter')
+                        # Return to splash screen
+                        self._level_preparer.cancel()
+                        self.state = STATE_SPLASH
+
+                elif self.state == STATE_ENTERING_NAME:
+                    # Sin score, solo ENTER para volver al splash
+                    if self.score <= 0 and not self.is_victory:
+                        if event.key == pygame.K_RETURN:
+                            self.state = STATE_SPLASH
+                    elif event.key == pygame.K_RETURN:
+                        if len(self.player_name) > 0:
+                            if self.persist_scores:
                                 add_score(self.player_name, self.score)
-                                self.player_name = ""
-                                self.state = STATE_SPLASH
-                        elif event.key == pygame.K_BACKSPACE:
-                            self.player_name = self.player_name[:-1]
-                        elif event.unicode.isalnum() and len(self.player_name) < 10:
-                            self.player_name += event.unicode.upper()
-
-                elif event.type == pygame.JOYBUTTONDOWN:
-                    if self.state == STATE_SPLASH:
-                        if event.button == 0:  # A
-                            self.level_num = 0
-                            self.score = 0
-                            self.lives = INITIAL_LIVES
-                            self.dynamite_count = 6
-                            self.last_life_score = 0
-                            self.start_level()
-
-                    elif self.state == STATE_PLAYING:
-                        if event.button == 2:  # X
-                            self.shoot_laser()
-                        elif event.button == 1:  # B
-                            self.drop_dynamite()
-
-            # Update
-            if self.state == STATE_PLAYING:
-                self.update_playing(dt)
-            elif self.state == STATE_DYING:
-                self.update_dying(dt)
-            elif self.state == STATE_LEVEL_COMPLETE:
-                self.update_level_complete(dt)
-
-            # Splash theme music management
-            if 'splash_theme' in self.sounds:
+                            self.player_name = ""
+                            self.state = STATE_SPLASH
+                    elif event.key == pygame.K_BACKSPACE:
+                        self.player_name = self.player_name[:-1]
+                    elif event.unicode.isalnum() and len(self.player_name) < 10:
+                        self.player_name += event.unicode.upper()
+
+            elif event.type == pygame.JOYBUTTONDOWN:
                 if self.state == STATE_SPLASH:
-                    self.sound_manager.start_loop('splash_theme')
-                else:
-                    self.sound_manager.stop_loop('splash_theme')
-
-            # Death song music management (game over screen)
-            if 'death_song' in self.sounds:
-                if self.state == STATE_ENTERING_NAME and not self.is_victory:
-                    if not self.sound_manager.is_looping('death_song'):
-                        self.sounds['death_song'].play()
-                        self.sound_manager._loops['death_song'] = True
-                else:
-                    if self.sound_manager.is_looping('death_song'):
-                        self.sounds['death_song'].stop()
-                        self.sound_manager._loops['death_song'] = False
+                    if event.button == 0:  # A
+                        self.start_new_game()
 
-            # Win song management (detener al salir de victoria)
-            if 'win_song' in self.sounds:
-                if not (self.state == STATE_ENTERING_NAME and self.is_victory):
-                    self.sounds['win_song'].stop()
+                elif self.state == STATE_PLAYING:
+                    if event.button == 2:  # X
+                        self.shoot_laser()
+                    elif event.button == 1:  # B
+                        self.drop_dynamite()
 
-            # Render
-            self.screen.fill(COLOR_BLACK)
+        return running
 
+    def _sim_entities(self):
+        """Entidades cuya posición se interpola al dibujar"""
+        entities = []
+        if self.player:
+            entities.append(self.player)
+        if self.miner:
+            entities.append(self.miner)
+        entities.extend(self.enemies)
+        entities.extend(self.lasers)
+        entities.extend(self.dynamites)
+        return entities
+
+    def step(self, dt):
+        """Un paso fijo de simulación (no dibuja nada)"""
+        snapshot_positions(self._sim_entities())
+        if self.state == STATE_PLAYING:
+            self.update_playing(dt)
+        elif self.state == STATE_DYING:
+            self.update_dying(dt)
+        elif self.state == STATE_LEVEL_COMPLETE:
+            self.update_level_complete(dt)
+
+    def update_music(self):
+        """Música según el estado actual"""
+        # Splash theme music management
+        if 'splash_theme' in self.sounds:
             if self.state == STATE_SPLASH:
-                self.render_splash()
-
-            elif self.state == STATE_PLAYING:
-                self.game_surface.fill(COLOR_BLACK)
-                self.render_level()
-                self.render_lamps()
-
-                # Draw entities en game_surface
-                if self.miner:
-                    self.miner.draw(self.game_surface, self.camera_x, self.camera_y)
+                self.sound_manager.start_loop('splash_theme')
+            else:
+                self.sound_manager.stop_loop('splash_theme')
+
+        # Death song music management (game over screen)
+        if 'death_song' in self.sounds:
+            if self.state == STATE_ENTERING_NAME and not self.is_victory:
+                if not self.sound_manager.is_looping('death_song'):
+                    self.sounds['death_song'].play()
+                    self.sound_manager._loops['death_song'] = True
+            else:
+                if self.sound_manager.is_looping('death_song'):
+                    self.sounds['death_song'].stop()
+                    self.sound_manager._loops['death_song'] = False
 
-                for enemy in self.enemies:
-                    enemy.draw(self.game_surface, self.camera_x, self.camera_y, self.level_map,
-                               wall_tile=self.tiles.get('wall'), tinted_floors=self.tinted_floors,
-                               floor_texture=self.floor_texture)
+        # Win song management (detener al salir de victoria)
+        if 'win_song' in self.sounds:
+            if not (self.state == STATE_ENTERING_NAME and self.is_victory):
+                self.sounds['win_song'].stop()
 
-                for laser in self.lasers:
-                    laser.draw(self.game_surface, self.camera_x, self.camera_y)
+    def render_frame(self, alpha=1.0):
+        """Dibuja el estado actual; alpha interpola entidades entre pasos"""
+        self.screen.fill(COLOR_BLACK)
+        self._game_view = False
 
-                if self.player:
-                    self.player.draw(self.game_surface, self.camera_x, self.camera_y)
+        if self.state == STATE_SPLASH:
+            self.render_splash()
 
-                for dynamite in self.dynamites:
-                    dynamite.draw(self.game_surface, self.camera_x, self.camera_y)
+        elif self.state == STATE_PLAYING:
+            # Misma pasada en color u oscuridad: cambia la tabla de variantes
+            mode = self._render_mode()
+            self._render_world(mode)
 
-                # Oscuridad estilo C64
-                self._render_dark_mode_overlay()
+            # Draw entities en game_surface (interpoladas entre los dos últimos pasos)
+            with interpolated(self._sim_entities(), alpha):
+                self._render_entities(mode)
 
-                self.render_floating_scores()
-                self._render_game_to_screen()
-                self.render_hud()
+            self.render_floating_scores()
+            self._render_game_to_screen()
+            self.render_hud()
 
-            elif self.state == STATE_DYING:
+        elif self.state == STATE_DYING:
+            with interpolated(self._sim_entities(), alpha):
                 self.render_dying()
 
-            elif self.state == STATE_LEVEL_COMPLETE:
+        elif self.state == STATE_LEVEL_COMPLETE:
+            with interpolated(self._sim_entities(), alpha):
                 self.render_level_complete()
 
-            elif self.state == STATE_ENTERING_NAME:
-                self.render_entering_name()
+        elif self.state == STATE_ENTERING_NAME:
+            self.render_entering_name()
 
-            # Quit confirmation overlay
-            if self.show_quit_confirm:
-                overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-                overlay.set_alpha(220)
-                overlay.fill(COLOR_BLACK)
-                self.screen.blit(overlay, (0, 0))
+        # Quit confirmation overlay
+        if self.show_quit_confirm:
+            self._flatten_game_view()
+            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            overlay.set_alpha(220)
+            overlay.fill(COLOR_BLACK)
+            self.screen.blit(overlay, (0, 0))
 
-                quit_text = self.font.render("Do you want to quit (Y/N)?", True, COLOR_WHITE)
-                quit_rect = quit_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
-                self.screen.blit(quit_text, quit_rect)
+            quit_text = self.font.render("Do you want to quit (Y/N)?", True, COLOR_WHITE)
+            quit_rect = quit_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
+            self.screen.blit(quit_text, quit_rect)
 
-            # Escalar game surface al display manteniendo aspect ratio
-            self.display_surface.fill(COLOR_BLACK)
-            scaled = pygame.transform.scale(self.screen, (self.render_w, self.render_h))
-            self.display_surface.blit(scaled, (self.render_x, self.render_y))
-            pygame.display.flip()
+        # Escalar al display manteniendo aspect ratio, una pasada por plano y solo
+        # los rects que cambiaron (en headless no hay display y el frame queda en
+        # self.screen)
+        if self._game_view:
+            planes = ((self.game_surface, (0, 0, SCREEN_WIDTH, VIEWPORT_HEIGHT)),
+                      (self._hud_strip, (0, VIEWPORT_HEIGHT, SCREEN_WIDTH, HUD_HEIGHT)))
+        else:
+            planes = ((self.screen, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)),)
+        self.presenter.present(self.display_surface,
+                               (self.render_x, self.render_y, self.render_w, self.render_h), planes)
 
-        pygame.quit()
 
 ##################################################################################################
 # Main
@@ -2030,24 +1937,67 @@ def main():
     parser = argparse.ArgumentParser(description="H.E.R.O. Remake")
     parser.add_argument("--level", type=int, default=None,
                         help="Nivel inicial (1-N) para testing")
+    parser.add_argument("--build-cache", action="store_true",
+                        help="Pre-generar el cache de todos los niveles y salir")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos para --build-cache (default: uno por CPU)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Simular sin display ni audio, sin esperar al reloj, y reportar tiempos")
+    parser.add_argument("--frames", type=int, default=3600,
+                        help="Frames a simular en --headless (default: 3600 = 1 minuto)")
+    parser.add_argument("--script", default=None,
+                        help="Archivo de input para --headless (\"FRAME tecla ...\" por línea; default: bot)")
+    parser.add_argument("--record", default=None,
+                        help="Grabar la sesión (input + semillas + checksums) en este archivo")
+    parser.add_argument("--replay", default=None,
+                        help="Reproducir un archivo grabado con --record, verificando cada frame")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Velocidad del replay (1 = tiempo real, 0 = sin límite)")
     args = parser.parse_args()
 
+    if args.build_cache:
+        level_cache.build_cache(LEVEL_SCREENS, workers=args.workers)
+        return
+
     game = Game()
-    game.init()
+    game.init(headless=args.headless)
+
+    if args.replay:
+        reader = ReplayReader(args.replay)
+        start = time.perf_counter()
+        try:
+            frames = play_replay(game, reader, speed=0 if args.headless else args.replay_speed,
+                                 render=not args.headless)
+            elapsed = time.perf_counter() - start
+            print(f"Replay OK: {frames} frames en {elapsed:.2f}s")
+        except ReplayDivergence as e:
+            print(e)
+        finally:
+            pygame.quit()
+        return
 
     # Si se especificó --level, arrancar directo en ese nivel
+    level_idx = 0
     if args.level is not None:
         level_idx = args.level - 1  # El usuario pasa 1-based
         if level_idx < 0 or level_idx >= len(LEVELS):
             print(f"Nivel inválido. Disponibles: 1-{len(LEVELS)}")
             pygame.quit()
             return
-        game.level_num = level_idx
-        game.score = 0
-        game.lives = INITIAL_LIVES
-        game.dynamite_count = 6
-        game.last_life_score = 0
-        game.start_level()
+        game.start_new_game(level_idx)
+
+    if args.headless:
+        input_fn = ScriptedInput(args.script) if args.script else None
+        try:
+            frames, elapsed, timer = run_headless(game, args.frames, input_fn, level_idx)
+            print(format_report(frames, elapsed, timer))
+        finally:
+            pygame.quit()
+        return
+
+    if args.record:
+        game.recorder = ReplayWriter(args.record, game.session_seed,
+                                     level_idx if args.level is not None else -1)
 
     try:
         game.loop()
@@ -2056,6 +2006,8 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        if game.recorder:
+            game.recorder.close()
         pygame.quit()
 
 if __name__ == "__main__":
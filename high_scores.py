@@ -0,0 +1,57 @@
+# H.E.R.O. Remake - Tabla de records en memoria
+# HighScoreManager (evgamelib) lee y parsea scores.json en cada load(). El
+# splash pide los records en cada frame, así que CachedHighScores los guarda en
+# memoria: las escrituras (save/add) pasan al manager y actualizan la copia, y
+# el archivo solo se vuelve a leer si cambia su mtime o tamaño (ej. editado a
+# mano), mirado como mucho una vez cada poll_interval segundos. version se
+# incrementa cada vez que la tabla cambia, para cachear lo que se dibuja con ella.
+
+import os
+import time
+
+from constants import SCORES_POLL_INTERVAL
+
+
+class CachedHighScores:
+    """HighScoreManager con los records en memoria y escritura directa al archivo"""
+
+    def __init__(self, manager, path, poll_interval=SCORES_POLL_INTERVAL):
+        self._manager = manager
+        self._path = path
+        self.poll_interval = poll_interval
+        self._scores = None
+        self._stamp = None
+        self._next_poll = 0.0
+        self.version = 0
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _store(self, scores):
+        self._scores = list(scores)
+        self._stamp = self._file_stamp()
+        self._next_poll = time.monotonic() + self.poll_interval
+        self.version += 1
+
+    def load(self):
+        """Records actuales (una copia); relee el archivo solo si cambió"""
+        if self._scores is None:
+            self._store(self._manager.load())
+        elif time.monotonic() >= self._next_poll:
+            self._next_poll = time.monotonic() + self.poll_interval
+            if self._file_stamp() != self._stamp:
+                self._store(self._manager.load())
+        return list(self._scores)
+
+    def save(self, scores):
+        self._manager.save(scores)
+        self._store(scores)
+
+    def add(self, name, score):
+        scores = self._manager.add(name, score)
+        self._store(scores)
+        return scores
@@ -0,0 +1,141 @@
+# H.E.R.O. Remake - HUD en modo retenido
+# El HUD (estilo ColecoVision) vive en su propia superficie de 768x80. Lo que no
+# cambia nunca (fondo, paneles con bisel, etiqueta POWER) se dibuja una vez al
+# crearlo; cada campo dinámico (barra de energía, vidas, bombas, nivel, score)
+# se repinta en esa superficie solo cuando cambia su valor. Cada frame el HUD
+# es un blit. La barra de energía se cachea por ancho en píxeles del relleno.
+
+from collections import OrderedDict
+
+import pygame
+from constants import SCREEN_WIDTH, HUD_HEIGHT, COLOR_BLACK, COLOR_BLUE, MAX_ENERGY, HUD_BAR_CACHE_SIZE
+
+# Colores paleta ColecoVision TMS9918A
+CV_YELLOW = (212, 193, 84)
+CV_RED = (212, 82, 77)
+CV_GRAY = (192, 192, 192)
+CV_HIGHLIGHT = (224, 224, 224)
+CV_SHADOW = (140, 140, 140)
+
+# Geometría (coords dentro del HUD)
+PANEL_W = 70
+CENTER_X = PANEL_W + 10                     # inicio del área central
+CENTER_END = SCREEN_WIDTH - PANEL_W - 10    # fin del área central
+BAR_Y = 8
+BAR_H = 12
+ICONS_Y = 28
+ICON_SIZE = 16
+ICON_GAP = 2
+BOMB_SPACING = 10   # Espaciado reducido para que las bombas se vean juntas
+MAX_ICONS = 10
+TEXT_Y = 54
+
+
+def bomb_icon_x(index, count):
+    """x (coords del HUD) del icono de bomba index cuando hay count bombas"""
+    return CENTER_END - (count - index) * BOMB_SPACING
+
+
+class Hud:
+    """HUD con capa estática prerenderizada y campos que se repintan al cambiar"""
+
+    def __init__(self, font, player_icon=None, bomb_icon=None):
+        self.font = font
+        self.player_icon = player_icon
+        self.bomb_icon = bomb_icon
+        self.surface = pygame.Surface((SCREEN_WIDTH, HUD_HEIGHT))
+        if pygame.display.get_surface():
+            self.surface = self.surface.convert()
+
+        power_label = font.render("POWER", True, CV_YELLOW)
+        self.bar_rect = pygame.Rect(CENTER_X + power_label.get_width() + 8, BAR_Y, 0, BAR_H)
+        self.bar_rect.w = CENTER_END - self.bar_rect.x
+        self._draw_chrome(power_label)
+
+        self._values = {}           # campo -> último valor dibujado
+        self._text_rects = {}       # campo de texto -> rect que ocupa
+        self._bars = OrderedDict()  # ancho del relleno -> superficie de la barra
+
+    def _draw_chrome(self, power_label):
+        surface = self.surface
+        surface.fill(COLOR_BLACK)
+        # Paneles grises laterales con bisel 3D
+        for x in (0, SCREEN_WIDTH - PANEL_W):
+            pygame.draw.rect(surface, CV_GRAY, (x, 0, PANEL_W, HUD_HEIGHT))
+            pygame.draw.rect(surface, CV_HIGHLIGHT, (x, 0, PANEL_W, 2))
+            pygame.draw.rect(surface, CV_HIGHLIGHT, (x, 0, 2, HUD_HEIGHT))
+            pygame.draw.rect(surface, CV_SHADOW, (x, HUD_HEIGHT - 2, PANEL_W, 2))
+            pygame.draw.rect(surface, CV_SHADOW, (x + PANEL_W - 2, 0, 2, HUD_HEIGHT))
+        surface.blit(power_label, (CENTER_X, BAR_Y))
+
+    def invalidate(self):
+        """Fuerza a repintar todos los campos en el próximo draw()"""
+        self._values.clear()
+
+    def _changed(self, field, value):
+        if self._values.get(field, self) == value:
+            return False
+        self._values[field] = value
+        return True
+
+    def _bar(self, fill_w):
+        """Barra con fondo rojo (energía gastada) y relleno amarillo (restante)"""
+        bar = self._bars.get(fill_w)
+        if bar is None:
+            bar = pygame.Surface(self.bar_rect.size)
+            bar.fill(CV_RED)
+            if fill_w > 0:
+                bar.fill(CV_YELLOW, (0, 0, fill_w, BAR_H))
+            self._bars[fill_w] = bar
+            while len(self._bars) > HUD_BAR_CACHE_SIZE:
+                self._bars.popitem(last=False)
+        else:
+            self._bars.move_to_end(fill_w)
+        return bar
+
+    def _draw_icons(self, icon, count, x, step, fallback):
+        """Fila de count iconos desde x; sin sprite, un rect (color, offset x, ancho)"""
+        color, offset, width = fallback
+        for i in range(count):
+            ix = x + i * step
+            if icon:
+                self.surface.blit(icon, (ix, ICONS_Y))
+            else:
+                pygame.draw.rect(self.surface, color, (ix + offset, ICONS_Y, width, ICON_SIZE))
+
+    def _draw_text(self, field, text, x=None, right=None):
+        old = self._text_rects.get(field)
+        if old:
+            self.surface.fill(COLOR_BLACK, old)
+        rendered = self.font.render(text, True, CV_YELLOW)
+        rect = rendered.get_rect(topleft=(x, TEXT_Y)) if right is None else rendered.get_rect(topright=(right, TEXT_Y))
+        self.surface.blit(rendered, rect)
+        self._text_rects[field] = rect
+
+    def update(self, energy, lives, bombs, level_num, score):
+        """Repinta en la superficie del HUD solo los campos que cambiaron"""
+        fill_w = int(max(0, min(1, energy / MAX_ENERGY)) * self.bar_rect.w)
+        if self._changed('energy', fill_w):
+            self.surface.blit(self._bar(fill_w), self.bar_rect)
+
+        lives = max(0, min(lives, MAX_ICONS))
+        if self._changed('lives', lives):
+            step = ICON_SIZE + ICON_GAP
+            self.surface.fill(COLOR_BLACK, (CENTER_X, ICONS_Y, MAX_ICONS * step, ICON_SIZE))
+            self._draw_icons(self.player_icon, lives, CENTER_X, step, (COLOR_BLUE, 2, 12))
+
+        bombs = max(0, min(bombs, MAX_ICONS))
+        if self._changed('bombs', bombs):
+            left = bomb_icon_x(0, MAX_ICONS)
+            self.surface.fill(COLOR_BLACK, (left, ICONS_Y, CENTER_END + ICON_SIZE - BOMB_SPACING - left, ICON_SIZE))
+            self._draw_icons(self.bomb_icon, bombs, bomb_icon_x(0, bombs), BOMB_SPACING, (CV_RED, 3, 10))
+
+        if self._changed('level', level_num):
+            self._draw_text('level', f"LEVEL: {level_num + 1}", x=CENTER_X)
+        if self._changed('score', score):
+            self._draw_text('score', f"{score}", right=CENTER_END)
+
+    def draw(self, target, pos, energy, lives, bombs, level_num, score):
+        """Actualiza los campos y dibuja el HUD en target"""
+        self.update(energy, lives, bombs, level_num, score)
+        target.blit(self.surface, pos)
@@ -1,8 +1,27 @@
 # H.E.R.O. Remake - Laser Class
 
+from collections import OrderedDict
+
 import pygame
 from constants import *
 from evgamelib.entity import PhysicsEntity
+from tilegrid import as_grid
+
+# Masks llenas por tamaño del tramo barrido (el alto es fijo y el ancho casi
+# siempre el mismo a paso fijo): se reusan en lugar de crear una por frame
+_sweep_masks = OrderedDict()
+
+
+def filled_mask(size):
+    """Mask llena de size, cacheada (LRU)"""
+    mask = _sweep_masks.get(size)
+    if mask is None:
+        mask = _sweep_masks[size] = pygame.mask.Mask(size, fill=True)
+        while len(_sweep_masks) > LASER_MASK_CACHE_SIZE:
+            _sweep_masks.popitem(last=False)
+    else:
+        _sweep_masks.move_to_end(size)
+    return mask
 
 class Laser(PhysicsEntity):
     def __init__(self, x, y, direction):
@@ -12,10 +31,86 @@ class Laser(PhysicsEntity):
         self.hit_rock_pos = None  # (row, col) si impactó una roca
         # Límites del viewport donde se disparó (no puede salir)
         self.vp_left, self.vp_top, self.vp_right, self.vp_bottom = get_viewport_bounds(x, y)
+        # Rayo precalculado (cast): x donde el láser toca el primer tile sólido
+        self.stop_x = None
+        self._stop_tile = None   # (row, col, tile) del tile que lo detiene, o None
+        self._cast_map = None    # mapa con el que se calculó el rayo
+        # Rect recorrido en el último update (para colisión barrida con enemigos)
+        self.sweep_rect = None
+
+    def _beam_rows(self):
+        """Filas de tiles que cubre el alto del rayo (mismas que las esquinas)"""
+        top = int(self.y / TILE_SIZE)
+        bottom = int((self.y + self.height) / TILE_SIZE)
+        return range(top, bottom + 1)
+
+    def cast(self, level_map):
+        """Recorre el rayo tile por tile (DDA sobre la fila del láser) hasta el
+        primer tile sólido o el borde del viewport. Después cada update es solo
+        una comparación de distancia contra stop_x."""
+        raw_map = level_map
+        level_map = as_grid(level_map)
+        rows = self._beam_rows()
+        self.stop_x = None
+        self._stop_tile = None
+        self._cast_map = raw_map
+
+        # Desde el tile de la esquina trasera (si el láser ya arranca tocando un
+        # sólido es impacto inmediato) hasta donde llega la esquina delantera
+        # antes de salir del viewport
+        if self.direction > 0:
+            col = int(self.x / TILE_SIZE)
+            end_col = int((self.vp_right + self.width) / TILE_SIZE)
+        else:
+            col = int((self.x + self.width) / TILE_SIZE)
+            end_col = int((self.vp_left - self.width) / TILE_SIZE)
+        while (col <= end_col) if self.direction > 0 else (col >= end_col):
+            for row in rows:
+                if level_map.in_bounds(row, col) and level_map.is_solid(row, col):
+                    self._stop_tile = (row, col, level_map.tile(row, col))
+                    # Borde del tile que toca la esquina delantera del láser
+                    self.stop_x = col * TILE_SIZE if self.direction > 0 else (col + 1) * TILE_SIZE
+                    return
+            col += self.direction
+
+    def _cast_is_stale(self, raw_map, level_map):
+        if self._cast_map is not raw_map:
+            return True
+        if self._stop_tile is None:
+            return False
+        row, col, tile = self._stop_tile
+        return level_map.tile(row, col) != tile
 
     def update(self, dt, level_map):
+        if not self.active:
+            self.sweep_rect = None
+            return
+        raw_map = level_map
+        level_map = as_grid(level_map)
+        # El rayo se recalcula solo si cambió el tile que lo detiene (roca rota)
+        if self._cast_is_stale(raw_map, level_map):
+            self.cast(raw_map)
+
+        old_x = self.x
         self.x += self.direction * LASER_SPEED * dt
 
+        # Impacto contra el primer sólido del rayo (sin importar cuánto avanzó)
+        if self.stop_x is not None:
+            if self.direction > 0:
+                hit = self.x + self.width >= self.stop_x
+                end_x = min(self.x, self.stop_x - self.width)
+            else:
+                hit = self.x < self.stop_x
+                end_x = max(self.x, self.stop_x)
+            if hit:
+                self._set_sweep(old_x, end_x)
+                row, col, tile = self._stop_tile
+                if tile in ('R', 'W'):
+                    self.hit_rock_pos = (row, col)
+                self.active = False
+                return
+        self._set_sweep(old_x, self.x)
+
         # Check viewport bounds (no puede pasar al siguiente viewport)
         if self.x + self.width < self.vp_left or self.x > self.vp_right:
             self.active = False
@@ -23,36 +118,26 @@ class Laser(PhysicsEntity):
 
         # Check bounds (ancho por fila del mapa jagged)
         laser_tile_row = int(self.y / TILE_SIZE)
-        current_row_w = row_width(level_map, laser_tile_row)
+        current_row_w = level_map.row_width(laser_tile_row)
         if current_row_w == 0 or self.x < 0 or self.x > current_row_w * TILE_SIZE:
             self.active = False
             return
 
-        # Check collision with tiles - check all corners of the laser rect
-        corners = [
-            (self.x, self.y),                           # Top-left
-            (self.x + self.width, self.y),              # Top-right
-            (self.x, self.y + self.height),             # Bottom-left
-            (self.x + self.width, self.y + self.height) # Bottom-right
-        ]
-
-        for corner_x, corner_y in corners:
-            tile_x = int(corner_x / TILE_SIZE)
-            tile_y = int(corner_y / TILE_SIZE)
-
-            if 0 <= tile_y < len(level_map) and 0 <= tile_x < len(level_map[tile_y]):
-                tile = level_map[tile_y][tile_x]
-                # Colisiona con paredes, pisos y bloques destructibles
-                if tile in SOLID_TILES:
-                    if tile in ('R', 'W'):
-                        self.hit_rock_pos = (tile_y, tile_x)
-                    self.active = False
-                    return
+    def _set_sweep(self, x0, x1):
+        left = min(x0, x1)
+        self.sweep_rect = pygame.Rect(int(left), int(self.y),
+                                      int(abs(x1 - x0)) + self.width + 1, self.height)
+
+    def sweep_mask(self):
+        """Mask llena del tamaño de sweep_rect (compartida, no modificar)"""
+        return filled_mask(self.sweep_rect.size)
 
     def get_rect(self):
         return pygame.Rect(self.x, self.y, self.width, self.height)
 
     def draw(self, screen, camera_x, camera_y):
+        if not self.active:
+            return  # Láser que ya impactó (queda un frame para la colisión barrida)
         screen_x = self.x - camera_x
         screen_y = self.y - camera_y
         if -50 < screen_y < GAME_VIEWPORT_HEIGHT + 50 and -50 < screen_x < GAME_WIDTH + 50:
@@ -0,0 +1,274 @@
+# H.E.R.O. Remake - Análisis de alcanzabilidad y presupuesto de energía
+# Dado un mapa, decide si el minero (M) se puede alcanzar desde el inicio (S)
+# con MAX_ENERGY de energía y DYNAMITE_QUANTITY bombas.
+#
+# El aire transitable se divide en regiones conexas (4-vecinos). Las regiones se
+# conectan a través de los tiles destructibles (#, R, W) que las separan: romper
+# uno cuesta una bomba (o disparos de láser si es roca y se llega de costado).
+# La bomba queda a los pies del jugador, así que solo rompe de costado o abajo.
+# Si S y M no quedan conectados en ese grafo de regiones, el nivel es imposible
+# sin buscar nada más. Si lo están, una búsqueda de costo mínimo a nivel de tile
+# (estado = tile + bombas usadas) estima la energía con las tasas ENERGY_DRAIN_*:
+# subir vuela, moverse apoyado camina, moverse en el aire vuela, caer es idle.
+# Es una estimación (no simula la física), pensada para detectar niveles
+# imposibles o muy justos mientras se editan.
+#
+# LevelAnalyzer escucha los cambios del TileGrid: un cambio de tile reetiqueta
+# solo las regiones que tocan ese tile, y el resultado se recalcula la próxima
+# vez que se pide.
+
+import heapq
+
+from constants import (
+    TILE_SIZE, SOLID_TILES, DESTRUCTIBLE_TILES, MAX_ENERGY, DYNAMITE_QUANTITY,
+    DYNAMITE_FUSE_TIME, ENERGY_DRAIN_IDLE, ENERGY_DRAIN_WALKING, ENERGY_DRAIN_FLYING,
+    PLAYER_SPEED_X, PROPULSOR_MAX_ASCENT_FULL, MAX_FALL_SPEED,
+    LASER_COOLDOWN, ROCK_LASER_HITS,
+)
+
+# Clases de celda
+AIR = 0        # transitable
+ROCK = 1       # destructible con láser (de costado) o bomba
+DIRT = 2       # destructible solo con bomba
+BLOCKED = 3    # sólido indestructible, agua tóxica, víboras o fuera del mapa
+
+# Tiles no sólidos que igual bloquean el paso (agua tóxica mata; las víboras
+# quedan como suelo en el juego)
+_HAZARD_TILES = {'~', '<', '>'}
+
+# Energía por tile movido, según el estado del jugador al moverse
+UP_COST = TILE_SIZE / PROPULSOR_MAX_ASCENT_FULL * ENERGY_DRAIN_FLYING
+DOWN_COST = TILE_SIZE / MAX_FALL_SPEED * ENERGY_DRAIN_IDLE
+WALK_COST = TILE_SIZE / PLAYER_SPEED_X * ENERGY_DRAIN_WALKING
+HOVER_COST = TILE_SIZE / PLAYER_SPEED_X * ENERGY_DRAIN_FLYING
+# Tiempo de espera para romper un tile
+LASER_BREAK_TIME = ROCK_LASER_HITS * LASER_COOLDOWN
+BOMB_BREAK_TIME = DYNAMITE_FUSE_TIME
+
+# Resultados
+STATUS_OK = 'ok'
+STATUS_NO_START = 'sin_inicio'        # falta S (o hay más de una)
+STATUS_NO_MINER = 'sin_minero'        # falta M (o hay más de uno)
+STATUS_UNREACHABLE = 'inalcanzable'   # ni rompiendo paredes (o faltan bombas)
+STATUS_NO_ENERGY = 'sin_energia'      # alcanzable pero con más de MAX_ENERGY
+
+
+def _cell_class(char):
+    if char is None or char in _HAZARD_TILES:
+        return BLOCKED
+    if char in DESTRUCTIBLE_TILES:
+        return DIRT if char == '#' else ROCK
+    if char in SOLID_TILES:
+        return BLOCKED
+    return AIR
+
+
+class LevelAnalysis:
+    """Resultado del análisis: status, energía y bombas del mejor camino"""
+
+    def __init__(self, status, energy=None, bombs=None, regions=0):
+        self.status = status
+        self.energy = energy      # energía estimada del mejor camino (None si no hay)
+        self.bombs = bombs        # bombas que usa ese camino
+        self.regions = regions    # regiones de aire del mapa
+
+    @property
+    def ok(self):
+        return self.status == STATUS_OK
+
+
+class LevelAnalyzer:
+    """Regiones de aire incrementales + búsqueda de energía de un TileGrid"""
+
+    def __init__(self, grid):
+        self._grid = grid
+        self.width = grid.max_width
+        self.height = grid.height
+        n = self.width * self.height
+        self._cells = [BLOCKED] * n
+        for row in range(self.height):
+            base = row * self.width
+            for col in range(grid.row_width(row)):
+                self._cells[base + col] = _cell_class(grid.tile(row, col))
+        self._starts = set(idx for idx in self._find('S'))
+        self._miners = set(idx for idx in self._find('M'))
+
+        self._labels = [-1] * n       # tile -> id de región (-1 = no es aire)
+        self._regions = {}            # id de región -> set de tiles
+        self._next_label = 0
+        self._flood(set(i for i in range(n) if self._cells[i] == AIR))
+
+        self._result = None
+        grid.add_listener(self._on_tile_changed)
+
+    def _find(self, char):
+        for row, col, _ in self._grid.find(char):
+            yield row * self.width + col
+
+    # --- Regiones ---
+
+    def _neighbors(self, idx):
+        """Vecinos (tile, dirección) dentro del mapa; dirección: 'u', 'd' o 'h'"""
+        width = self.width
+        col = idx % width
+        if idx >= width:
+            yield idx - width, 'u'
+        if idx + width < len(self._cells):
+            yield idx + width, 'd'
+        if col > 0:
+            yield idx - 1, 'h'
+        if col + 1 < width:
+            yield idx + 1, 'h'
+
+    def _flood(self, tiles):
+        """Etiqueta las regiones conexas dentro de tiles (todos de aire)"""
+        labels = self._labels
+        pending = set(tiles)
+        while pending:
+            seed = pending.pop()
+            label = self._next_label
+            self._next_label += 1
+            region = {seed}
+            labels[seed] = label
+            stack = [seed]
+            while stack:
+                idx = stack.pop()
+                for n, _ in self._neighbors(idx):
+                    if n in pending:
+                        pending.discard(n)
+                        labels[n] = label
+                        region.add(n)
+                        stack.append(n)
+            self._regions[label] = region
+
+    def _on_tile_changed(self, row, col, old, new):
+        idx = row * self.width + col
+        for chars, tiles in (('S', self._starts), ('M', self._miners)):
+            if old in chars:
+                tiles.discard(idx)
+            if new in chars:
+                tiles.add(idx)
+        self._result = None
+        cls = _cell_class(new)
+        if cls == self._cells[idx]:
+            return
+        self._cells[idx] = cls
+
+        # Reetiquetar solo las regiones que tocan el tile (se unen o se parten)
+        affected = {self._labels[n] for n, _ in self._neighbors(idx)}
+        affected.add(self._labels[idx])
+        affected.discard(-1)
+        tiles = set()
+        for label in affected:
+            tiles |= self._regions.pop(label)
+        for t in tiles:
+            self._labels[t] = -1
+        if cls == AIR:
+            tiles.add(idx)
+        else:
+            tiles.discard(idx)
+        self._flood(tiles)
+
+    @property
+    def region_count(self):
+        return len(self._regions)
+
+    def _regions_connected(self, start, goal):
+        """BFS sobre el grafo de regiones: las regiones se unen por tiles
+        destructibles (rompibles en cadena). No mira energía ni bombas."""
+        cells = self._cells
+        goal_label = self._labels[goal]
+        seen_regions = {self._labels[start]}
+        seen_walls = set()
+        queue = [self._labels[start]]
+        while queue:
+            label = queue.pop()
+            if label == goal_label:
+                return True
+            walls = [n for t in self._regions[label] for n, _ in self._neighbors(t)
+                     if cells[n] in (ROCK, DIRT) and n not in seen_walls]
+            while walls:
+                wall = walls.pop()
+                if wall in seen_walls:
+                    continue
+                seen_walls.add(wall)
+                for n, _ in self._neighbors(wall):
+                    if cells[n] in (ROCK, DIRT):
+                        walls.append(n)
+                    elif cells[n] == AIR and self._labels[n] not in seen_regions:
+                        seen_regions.add(self._labels[n])
+                        queue.append(self._labels[n])
+        return False
+
+    # --- Energía ---
+
+    def _supported(self, idx):
+        """True si hay algo sólido debajo (el jugador camina en lugar de volar)"""
+        below = idx + self.width
+        return below >= len(self._cells) or self._cells[below] != AIR
+
+    def _cheapest_path(self, start, goal):
+        """(energía, bombas) del camino más barato de start a goal usando como
+        máximo DYNAMITE_QUANTITY bombas, o None si no hay"""
+        cells = self._cells
+        best = {(start, 0): 0.0}
+        heap = [(0.0, 0, start)]
+        while heap:
+            energy, bombs, idx = heapq.heappop(heap)
+            if idx == goal:
+                return energy, bombs
+            if best.get((idx, bombs), energy) < energy:
+                continue
+            wait_drain = ENERGY_DRAIN_IDLE if self._supported(idx) else ENERGY_DRAIN_FLYING
+            for n, direction in self._neighbors(idx):
+                cls = cells[n]
+                if cls == BLOCKED:
+                    continue
+                if direction == 'u':
+                    move = UP_COST
+                elif direction == 'd':
+                    move = DOWN_COST
+                else:
+                    move = WALK_COST if self._supported(n) else HOVER_COST
+                options = []
+                if cls == AIR:
+                    options.append((energy + move, bombs))
+                else:
+                    if cls == ROCK and direction == 'h':
+                        options.append((energy + move + LASER_BREAK_TIME * wait_drain, bombs))
+                    # La dinamita se suelta a los pies: no alcanza un techo
+                    if direction != 'u' and bombs < DYNAMITE_QUANTITY:
+                        options.append((energy + move + BOMB_BREAK_TIME * wait_drain, bombs + 1))
+                for cost, used in options:
+                    if cost < best.get((n, used), float('inf')):
+                        best[(n, used)] = cost
+                        heapq.heappush(heap, (cost, used, n))
+        return None
+
+    def result(self):
+        """LevelAnalysis del mapa actual (cacheado hasta el próximo cambio)"""
+        if self._result is None:
+            self._result = self._analyze()
+        return self._result
+
+    def _analyze(self):
+        regions = self.region_count
+        if len(self._starts) != 1:
+            return LevelAnalysis(STATUS_NO_START, regions=regions)
+        if len(self._miners) != 1:
+            return LevelAnalysis(STATUS_NO_MINER, regions=regions)
+        start = next(iter(self._starts))
+        goal = next(iter(self._miners))
+        if not self._regions_connected(start, goal):
+            return LevelAnalysis(STATUS_UNREACHABLE, regions=regions)
+        path = self._cheapest_path(start, goal)
+        if path is None:
+            return LevelAnalysis(STATUS_UNREACHABLE, regions=regions)
+        energy, bombs = path
+        status = STATUS_OK if energy <= MAX_ENERGY else STATUS_NO_ENERGY
+        return LevelAnalysis(status, energy, bombs, regions)
+
+
+def level_analyzer(grid):
+    """LevelAnalyzer del grid (se construye la primera vez y queda cacheado)"""
+    return grid.derived('level_analysis', LevelAnalyzer)
@@ -0,0 +1,253 @@
+# H.E.R.O. Remake - Cache persistente de niveles compilados
+# Un nivel "compilado" es el mapa normalizado por banda (con las víboras ya
+# convertidas a suelo) más los tres overlays: fondo de caverna, textura del
+# suelo y musgo. Los overlays se generan por chunks del tamaño del viewport
+# (ver overlay_chunks.py) y cada chunk se guarda en disco como buffer crudo la
+# primera vez que se genera.
+#
+# La clave es un hash del contenido: entrada de screens.json + texture_params.json
+# + seed (+ el backend de texturas, NumPy o Python, que dibujan distinto). Si cambia cualquiera de los tres, la clave cambia y se regenera.
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+from constants import *
+from tilegrid import TileGrid
+from overlay_chunks import ChunkedOverlay
+from palette import (get_depth_palette, get_edge_color, generate_cave_background,
+                     generate_edge_overlay, generate_floor_texture, TEXTURE_BACKEND)
+
+# Incrementar si cambia el formato del cache o los algoritmos de generación
+CACHE_FORMAT_VERSION = 3
+
+# Offsets de seed por capa (el seed base es el número de nivel)
+EDGE_SEED_OFFSET = 0
+FLOOR_SEED_OFFSET = 1000
+CAVE_SEED_OFFSET = 2000
+
+# Capas y formato crudo de sus chunks (el fondo de caverna es opaco)
+_LAYER_FORMATS = {'cave_bg': 'RGB', 'floor_texture': 'RGBA', 'edge_overlay': 'RGBA'}
+
+# pygame >= 2.1.3 renombró tostring -> tobytes
+_to_bytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+
+
+def normalize_level_rows(level_map):
+    """Normaliza el mapa por banda de viewport: alto múltiplo de VIEWPORT_ROWS y
+    cada banda con su propio ancho múltiplo de VIEWPORT_COLS (relleno con '#').
+    No modifica la lista recibida."""
+    rows = list(level_map)
+    map_height = len(rows)
+
+    # Redondear hacia arriba al múltiplo del viewport más cercano
+    target_h = max(VIEWPORT_ROWS, ((map_height + VIEWPORT_ROWS - 1) // VIEWPORT_ROWS) * VIEWPORT_ROWS)
+    while len(rows) < target_h:
+        rows.append('#' * VIEWPORT_COLS)
+
+    normalized = []
+    for band_start in range(0, target_h, VIEWPORT_ROWS):
+        band_end = min(band_start + VIEWPORT_ROWS, len(rows))
+        band_rows = rows[band_start:band_end]
+        band_w = max(len(r) for r in band_rows) if band_rows else VIEWPORT_COLS
+        target_band_w = max(VIEWPORT_COLS, ((band_w + VIEWPORT_COLS - 1) // VIEWPORT_COLS) * VIEWPORT_COLS)
+        for row in band_rows:
+            if len(row) < target_band_w:
+                row = row + '#' * (target_band_w - len(row))
+            normalized.append(row[:target_band_w])
+        # Completar filas faltantes de la banda
+        while len(normalized) < band_start + VIEWPORT_ROWS:
+            normalized.append('#' * target_band_w)
+    return normalized[:target_h]
+
+
+class CompiledLevel:
+    """Mapa normalizado + overlays por chunks listos para usar en start_level.
+
+    Los chunks se generan contra una copia del mapa original: lo que el jugador
+    destruye después no cambia la textura de un chunk regenerado."""
+
+    def __init__(self, key, screen_data, seed, rows, snake_dirs):
+        self.key = key
+        self.seed = seed
+        self.rows = rows                # lista de strings (víboras ya convertidas a '.')
+        self.snake_dirs = snake_dirs    # dict (row, col) -> '<' o '>'
+        self._grid = TileGrid(rows)
+        self._depth_palette = get_depth_palette(screen_data)
+        self._edge_color = get_edge_color(screen_data)
+        self._store_failed = False
+
+        width = self._grid.max_width * TILE_SIZE
+        height = self._grid.height * TILE_SIZE
+        self.cave_bg = ChunkedOverlay(width, height, self._chunk_loader('cave_bg'), alpha=False)
+        self.floor_texture = ChunkedOverlay(width, height, self._chunk_loader('floor_texture'))
+        self.edge_overlay = ChunkedOverlay(width, height, self._chunk_loader('edge_overlay'))
+
+    def _chunk_loader(self, layer):
+        return lambda chunk_col, chunk_row: self.chunk_surface(layer, chunk_col, chunk_row)
+
+    def generate_chunk(self, layer, chunk_col, chunk_row):
+        """Genera un chunk de una capa (determinístico: seed por tile/chunk)"""
+        region = pygame.Rect(chunk_col * OVERLAY_CHUNK_W, chunk_row * OVERLAY_CHUNK_H,
+                             OVERLAY_CHUNK_W, OVERLAY_CHUNK_H)
+        if layer == 'cave_bg':
+            return generate_cave_background(self._grid, self._depth_palette,
+                                            seed=self.seed + CAVE_SEED_OFFSET, region=region)
+        if layer == 'floor_texture':
+            return generate_floor_texture(self._grid, seed=self.seed + FLOOR_SEED_OFFSET,
+                                          region=region)
+        # Los tiles de víbora tienen textura de suelo pero no moss
+        return generate_edge_overlay(self._grid, self._edge_color,
+                                     seed=self.seed + EDGE_SEED_OFFSET,
+                                     skip_tiles=set(self.snake_dirs), region=region)
+
+    def chunk_surface(self, layer, chunk_col, chunk_row):
+        """Chunk desde el disco, o generado y guardado si no estaba"""
+        surface = load_chunk(self.key, layer, chunk_col, chunk_row)
+        if surface is None:
+            surface = self.generate_chunk(layer, chunk_col, chunk_row)
+            if not self._store_failed:
+                try:
+                    store_chunk(self.key, layer, chunk_col, chunk_row, surface)
+                except OSError as e:
+                    self._store_failed = True
+                    print(f"No se pudo guardar el cache de nivel: {e}")
+        return surface
+
+    def build_all_chunks(self):
+        """Genera y guarda todos los chunks que falten. Retorna cuántos generó."""
+        built = 0
+        for layer in _LAYER_FORMATS:
+            overlay = getattr(self, layer)
+            for chunk_row in range(overlay.chunk_rows):
+                for chunk_col in range(overlay.chunk_cols):
+                    if os.path.exists(_chunk_path(self.key, layer, chunk_col, chunk_row)):
+                        continue
+                    store_chunk(self.key, layer, chunk_col, chunk_row,
+                                self.generate_chunk(layer, chunk_col, chunk_row))
+                    built += 1
+        return built
+
+
+def cache_key(screen_data, seed):
+    """Hash del contenido que determina el resultado de compile_level"""
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_FORMAT_VERSION} chunk={OVERLAY_CHUNK_W}x{OVERLAY_CHUNK_H} "
+             f"backend={TEXTURE_BACKEND}".encode())
+    h.update(json.dumps(screen_data, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    if os.path.exists(TEXTURE_PARAMS_FILE):
+        with open(TEXTURE_PARAMS_FILE, 'rb') as f:
+            h.update(f.read())
+    h.update(f"seed={seed}".encode())
+    return h.hexdigest()[:32]
+
+
+def compile_level(screen_data, seed):
+    """Normaliza el mapa y convierte víboras a suelo. Los overlays se generan
+    después, chunk por chunk, a medida que la cámara los necesita."""
+    grid = TileGrid(normalize_level_rows(screen_data.get("map", [])))
+
+    # Pre-scan: convertir tiles de víbora a suelo y guardar posiciones/dirección
+    snake_dirs = {}
+    for row, col, tile in list(grid.find('<>')):
+        snake_dirs[(row, col)] = tile
+        grid.set(row, col, '.')
+
+    return CompiledLevel(cache_key(screen_data, seed), screen_data, seed,
+                         grid.to_rows(), snake_dirs)
+
+
+def _entry_dir(key):
+    return os.path.join(LEVEL_CACHE_DIR, key)
+
+
+def _write_atomic(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _chunk_path(key, layer, chunk_col, chunk_row):
+    return os.path.join(_entry_dir(key), f"{layer}_{chunk_col}_{chunk_row}.raw")
+
+
+def store(compiled):
+    """Guarda el mapa compilado (level.json). Los chunks se guardan aparte."""
+    entry = _entry_dir(compiled.key)
+    os.makedirs(entry, exist_ok=True)
+    meta = {
+        'rows': compiled.rows,
+        'snakes': [[r, c, d] for (r, c), d in sorted(compiled.snake_dirs.items())],
+    }
+    _write_atomic(os.path.join(entry, 'level.json'),
+                  json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+
+def store_chunk(key, layer, chunk_col, chunk_row, surface):
+    """Guarda un chunk de overlay como buffer crudo"""
+    os.makedirs(_entry_dir(key), exist_ok=True)
+    _write_atomic(_chunk_path(key, layer, chunk_col, chunk_row),
+                  _to_bytes(surface, _LAYER_FORMATS[layer]))
+
+
+def load(key, screen_data, seed):
+    """Carga un nivel compilado del cache, o None si no existe o está corrupto"""
+    meta_path = os.path.join(_entry_dir(key), 'level.json')
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        snake_dirs = {(r, c): d for r, c, d in meta['snakes']}
+        return CompiledLevel(key, screen_data, seed, meta['rows'], snake_dirs)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Cache de nivel inválido ({key}): {e}")
+        return None
+
+
+def load_chunk(key, layer, chunk_col, chunk_row):
+    """Carga un chunk del cache, o None si no existe o está corrupto"""
+    path = _chunk_path(key, layer, chunk_col, chunk_row)
+    fmt = _LAYER_FORMATS[layer]
+    try:
+        with open(path, 'rb') as f:
+            data = bytearray(f.read())
+    except OSError:
+        return None
+    if len(data) != OVERLAY_CHUNK_W * OVERLAY_CHUNK_H * len(fmt):
+        return None
+    # frombuffer no copia: la superficie usa el bytearray directamente
+    return pygame.image.frombuffer(data, (OVERLAY_CHUNK_W, OVERLAY_CHUNK_H), fmt)
+
+
+def get_compiled_level(screen_data, seed):
+    """Retorna el nivel compilado desde el cache, compilándolo y guardándolo si falta"""
+    key = cache_key(screen_data, seed)
+    compiled = load(key, screen_data, seed)
+    if compiled is None:
+        compiled = compile_level(screen_data, seed)
+        try:
+            store(compiled)
+        except OSError as e:
+            print(f"No se pudo guardar el cache de nivel: {e}")
+    return compiled
+
+
+def _build_entry(args):
+    """Worker del pool: compila un nivel y genera todos sus chunks faltantes"""
+    screen_data, seed = args
+    compiled = get_compiled_level(screen_data, seed)
+    return compiled.key, compiled.build_all_chunks()
+
+
+def build_cache(screens, workers=None):
+    """Llena el cache para todos los niveles en paralelo (un proceso por nivel).
+    El seed de cada nivel es su índice, igual que en el juego."""
+    jobs = [(screen_data, level_num) for level_num, screen_data in enumerate(screens)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for level_num, (key, built) in enumerate(pool.map(_build_entry, jobs)):
+            status = f"{built} chunks generados" if built else "ya estaba en cache"
+            print(f"Nivel {level_num + 1}: {status} ({key})")
@@ -0,0 +1,211 @@
+# H.E.R.O. Remake - Masks de colisión del nivel completo
+# Una pygame.mask.Mask con todos los píxeles sólidos del nivel y otra con los
+# de lava (X/W). Cada consulta de colisión del jugador es un solo overlap en
+# lugar de un overlap por tile. Las masks se parchean solas cuando el mapa
+# cambia (paredes rotas por dinamita o láser), vía listener del TileGrid.
+#
+# También resuelve movimiento con barrido (sweep_x / sweep_y): la distancia
+# libre exacta a lo largo de un eje, comparando los extremos por fila/columna
+# de la mask del sprite contra el bitmap de solidez del TileGrid, sin búsqueda
+# binaria. El mismo barrido dice si el tile que detiene el movimiento es lava.
+
+import math
+
+import pygame
+from constants import TILE_SIZE
+
+# Margen alrededor del nivel, lleno: fuera de límites cuenta como sólido
+MASK_PAD = TILE_SIZE
+
+LAVA_TILES = ('X', 'W')
+_LAVA_CODES = frozenset(ord(c) for c in LAVA_TILES)
+
+
+class LevelMasks:
+    """Masks sólido/lava de un TileGrid, con MASK_PAD píxeles de margen"""
+
+    def __init__(self, grid):
+        self._tile_mask = pygame.mask.Mask((TILE_SIZE, TILE_SIZE), fill=True)
+        width = grid.max_width * TILE_SIZE + 2 * MASK_PAD
+        height = grid.height * TILE_SIZE + 2 * MASK_PAD
+        self.solid = pygame.mask.Mask((width, height), fill=True)
+        self.lava = pygame.mask.Mask((width, height))
+
+        # Vaciar los tiles no sólidos (el relleno fuera de cada fila queda sólido)
+        for row in range(grid.height):
+            for col in range(grid.max_width):
+                if not grid.is_solid(row, col):
+                    self.solid.erase(self._tile_mask, self._offset(row, col))
+        for row, col, _ in grid.find(''.join(LAVA_TILES)):
+            self.lava.draw(self._tile_mask, self._offset(row, col))
+
+        grid.add_listener(self._on_tile_changed)
+        self._grid = grid
+
+    @staticmethod
+    def _offset(row, col):
+        return (col * TILE_SIZE + MASK_PAD, row * TILE_SIZE + MASK_PAD)
+
+    def _on_tile_changed(self, row, col, old, new):
+        offset = self._offset(row, col)
+        if self._grid.is_solid(row, col):
+            self.solid.draw(self._tile_mask, offset)
+        else:
+            self.solid.erase(self._tile_mask, offset)
+        if new in LAVA_TILES:
+            self.lava.draw(self._tile_mask, offset)
+        elif old in LAVA_TILES:
+            self.lava.erase(self._tile_mask, offset)
+
+    def hits_solid(self, mask, px, py):
+        """True si mask ubicada en (px, py) (píxeles enteros del nivel) toca algo sólido"""
+        ox = px + MASK_PAD
+        oy = py + MASK_PAD
+        w, h = mask.get_size()
+        sw, sh = self.solid.get_size()
+        if ox < 0 or oy < 0 or ox + w > sw or oy + h > sh:
+            return True  # más allá del margen: fuera de límites
+        return self.solid.overlap(mask, (ox, oy)) is not None
+
+    def sweep_x(self, extents, x, y, dx):
+        """Barrido horizontal del sprite con extents en (x, y). Retorna
+        (desplazamiento, lava): el desplazamiento tiene el signo de dx y
+        |r| <= |dx|, y se detiene justo al tocar un sólido; lava es True si lo
+        que lo detiene es un tile de lava."""
+        return self._sweep(extents, y, x, dx, False)
+
+    def sweep_y(self, extents, x, y, dy):
+        """Barrido vertical, igual que sweep_x sobre las columnas"""
+        return self._sweep(extents, x, y, dy, True)
+
+    def _sweep(self, extents, cross, along, delta, vertical):
+        """Recorre, por cada banda de tiles que cruza el sprite, los tiles en la
+        dirección del movimiento leyendo directo el bitmap de solidez del grid.
+        Banda y tile son (fila, columna) en horizontal y (columna, fila) en vertical."""
+        if delta == 0:
+            return 0.0, False
+        solid, stride = self._grid.solid_bytes()
+        cells = self._grid.cell_bytes()[0]
+        height = self._grid.height
+        band_count, tile_count = (stride, height) if vertical else (height, stride)
+        limit = abs(delta)
+        free = limit
+        lava = False
+        base, bands = extents.bands(vertical, cross)
+        for band, lo, hi in bands:
+            band += base
+            if delta > 0:
+                tile = math.floor((along + hi) / TILE_SIZE)
+                dist = tile * TILE_SIZE - (along + hi)
+                step = 1
+            else:
+                tile = math.ceil((along + lo) / TILE_SIZE) - 1
+                dist = (along + lo) - (tile + 1) * TILE_SIZE
+                step = -1
+            band_inside = 0 <= band < band_count
+            # Solo interesan los tiles a la distancia del contacto actual o antes
+            while dist < limit and dist <= free:
+                if not (band_inside and 0 <= tile < tile_count):
+                    hit, hit_lava = True, False  # fuera de límites: sólido
+                else:
+                    idx = tile * stride + band if vertical else band * stride + tile
+                    hit = solid[idx]
+                    hit_lava = hit and cells[idx] in _LAVA_CODES
+                if hit:
+                    dist = max(0.0, dist)
+                    lava = hit_lava or (lava and dist == free)
+                    free = dist
+                    break
+                tile += step
+                dist += TILE_SIZE
+            if free == 0 and lava:
+                break
+        moved = free if delta > 0 else -free
+        return moved, lava and free < limit
+
+    def hits_lava(self, mask, px, py):
+        """True si mask ubicada en (px, py) toca lava o roca lava"""
+        return self.lava.overlap(mask, (px + MASK_PAD, py + MASK_PAD)) is not None
+
+
+class MaskExtents:
+    """Extremos de una mask por fila y por columna (para barridos).
+    rows[i] = (izquierda, derecha) de la fila i, o None si está vacía.
+    cols[j] = (arriba, abajo) de la columna j, o None si está vacía.
+    row_edges / col_edges: las mismas listas separadas en (inicios, fines + 1),
+    con infinitos en las vacías, para min/max sobre rangos en una sola llamada.
+    bands(): esos extremos agrupados por banda de tiles para una posición."""
+
+    def __init__(self, mask):
+        w, h = mask.get_size()
+        self.rows = [None] * h
+        self.cols = [None] * w
+        for y in range(h):
+            for x in range(w):
+                if mask.get_at((x, y)):
+                    row = self.rows[y]
+                    self.rows[y] = (x, x) if row is None else (row[0], x)
+                    col = self.cols[x]
+                    self.cols[x] = (y, y) if col is None else (col[0], y)
+        self.row_edges = _split_spans(self.rows)
+        self.col_edges = _split_spans(self.cols)
+        self._bands = {}
+
+    def bands(self, vertical, pos):
+        """(banda base, [(banda relativa, inicio, fin + 1)]) de las columnas
+        (vertical) o de las filas del sprite ubicado en pos. Qué bandas toca cada
+        fila depende solo de floor(pos) dentro del tile y de si pos es
+        fraccionaria, así que se calcula una vez por combinación."""
+        whole = math.floor(pos)
+        base, offset = divmod(whole, TILE_SIZE)
+        key = (vertical, offset, pos != whole)
+        bands = self._bands.get(key)
+        if bands is None:
+            edges = self.col_edges if vertical else self.row_edges
+            local = offset + (0.5 if pos != whole else 0)
+            bands = [(band, lo, hi) for band, (lo, hi) in _edges_by_band(edges, local).items()]
+            self._bands[key] = bands
+        return base, bands
+
+
+def _split_spans(spans):
+    starts = [math.inf if span is None else span[0] for span in spans]
+    ends = [-math.inf if span is None else span[1] + 1 for span in spans]
+    return starts, ends
+
+
+_extents_cache = {}  # id(mask) -> (mask, MaskExtents)
+
+
+def mask_extents(mask):
+    """MaskExtents cacheados por mask (los sprites no cambian)"""
+    cached = _extents_cache.get(id(mask))
+    if cached is None or cached[0] is not mask:
+        cached = (mask, MaskExtents(mask))
+        _extents_cache[id(mask)] = cached
+    return cached[1]
+
+
+def _edges_by_band(edges, pos):
+    """Agrupa los extremos de cada fila (o columna) por banda de tiles que toca.
+    La fila i ocupa [pos + i, pos + i + 1): toca la banda b si ese intervalo
+    corta [b * TILE_SIZE, (b + 1) * TILE_SIZE).
+    Retorna {banda: (mínimo inicio, máximo fin + 1)}."""
+    starts, ends = edges
+    n = len(starts)
+    bands = {}
+    for band in range(math.floor(pos / TILE_SIZE), math.floor((pos + n) / TILE_SIZE) + 1):
+        first = max(0, math.floor(band * TILE_SIZE - pos - 1) + 1)
+        last = min(n, math.ceil((band + 1) * TILE_SIZE - pos))
+        if first >= last:
+            continue
+        lo = min(starts[first:last])
+        if lo == math.inf:
+            continue  # ninguna fila con píxeles en esta banda
+        bands[band] = (lo, max(ends[first:last]))
+    return bands
+
+
+def level_masks(grid):
+    """LevelMasks del grid (se construye la primera vez y queda cacheada)"""
+    return grid.derived('level_masks', LevelMasks)
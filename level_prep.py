@@ -0,0 +1,149 @@
+# H.E.R.O. Remake - Preparación de niveles
+# Todo lo que start_level necesita y no depende de la partida en curso: mapa
+# normalizado (con las lámparas ya sacadas), tiles de suelo tintados, lista de
+# spawns de entidades y los chunks de overlay del viewport inicial.
+#
+# LevelPreparer arma el nivel siguiente en un thread mientras corre la cuenta
+# de fin de nivel; start_level solo adopta el resultado (o espera si no está).
+# El PreparedLevel queda como snapshot intacto del nivel: al perder una vida se
+# reinicia desde una copia en lugar de volver a armarlo.
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import *
+from tilegrid import TileGrid
+import level_cache
+from palette import build_tinted_floors
+
+# Tile del mapa -> tipo de entidad (las víboras se detectan por snake_dirs)
+SPAWN_TILES = {'V': 'bat', 'A': 'spider', 'B': 'bug', 'M': 'miner'}
+
+
+class PreparedLevel:
+    """Nivel listo para adoptar en start_level (sin sprites ni estado de partida)"""
+
+    def __init__(self, level_num, compiled, level_map, spawns, lamps,
+                 depth_palette, edge_color, tinted_floors):
+        self.level_num = level_num
+        self.compiled = compiled
+        self.level_map = level_map          # TileGrid con lámparas ya limpiadas
+        self.spawns = spawns                # lista de (tipo, x, y, velocidad) en orden de mapa
+        self.lamps = lamps                  # lista de {x, y}
+        self.depth_palette = depth_palette
+        self.edge_color = edge_color
+        self.tinted_floors = tinted_floors
+
+    def restore(self):
+        """Copia para jugar el nivel: solo se duplica el mapa (que se modifica al
+        romper paredes). Overlays, spawns y suelos tintados se comparten."""
+        return PreparedLevel(self.level_num, self.compiled, self.level_map.copy(),
+                             self.spawns, self.lamps, self.depth_palette,
+                             self.edge_color, self.tinted_floors)
+
+
+def _spawn_speed(etype, level_num, rng):
+    """Velocidad base del tipo de enemigo con variación aleatoria ±5%"""
+    variation = rng.uniform(1 - ENEMY_SPEED_VARIATION, 1 + ENEMY_SPEED_VARIATION)
+    if etype == 'bat':
+        # Velocidad base con escalado por nivel
+        return BAT_SPEED * (1 + BAT_SPEED_SCALE * level_num) * variation
+    if etype == 'spider':
+        return SPIDER_SPEED * variation
+    if etype == 'bug':
+        return BUG_SPEED * variation
+    return SNAKE_EMERGE_SPEED * variation
+
+
+def build_spawns(level_map, snake_dirs, level_num, rng=random):
+    """Lista de spawns (tipo, x, y, velocidad) recorriendo el mapa fila por fila.
+    rng: fuente de la variación de velocidad (random.Random para reproducir)"""
+    spawns = []
+    for row_index, col_index, tile in level_map.find('VABM.'):
+        x = col_index * TILE_SIZE
+        y = row_index * TILE_SIZE
+        if tile == '.':
+            # Víbora: tile ya convertido a '.' en el pre-scan, detectar por posición
+            orig_tile = snake_dirs.get((row_index, col_index))
+            if orig_tile is None:
+                continue
+            etype = "snake_left" if orig_tile == "<" else "snake_right"
+        else:
+            etype = SPAWN_TILES[tile]
+        speed = 0 if etype == 'miner' else _spawn_speed(etype, level_num, rng)
+        spawns.append((etype, x, y, speed))
+    return spawns
+
+
+def prepare_level(level_num, screen_data, floor_tile, depth_palette, edge_color, seed=None):
+    """Arma un PreparedLevel. No toca el display: se puede llamar desde un thread.
+    seed: semilla de la variación de velocidad de los spawns (None = global)"""
+    compiled = level_cache.get_compiled_level(screen_data, level_num)
+    level_map = TileGrid(compiled.rows)
+
+    # Lámparas: guardar posición y limpiar del mapa (no son sólidas)
+    lamps = []
+    for row_index, col_index, _ in list(level_map.find('L')):
+        lamps.append({'x': col_index * TILE_SIZE, 'y': row_index * TILE_SIZE})
+        level_map.set(row_index, col_index, ' ')
+
+    rng = random if seed is None else random.Random(seed)
+    spawns = build_spawns(level_map, compiled.snake_dirs, level_num, rng)
+    tinted_floors = build_tinted_floors(floor_tile, depth_palette)
+
+    # Dejar generados los chunks del viewport donde arranca el jugador
+    for row_index, col_index, _ in level_map.find('S'):
+        cx = col_index * TILE_SIZE + TILE_SIZE // 2
+        cy = row_index * TILE_SIZE + TILE_SIZE // 2
+        for overlay in (compiled.cave_bg, compiled.floor_texture, compiled.edge_overlay):
+            overlay.prefetch(cx, cy)
+        break
+
+    return PreparedLevel(level_num, compiled, level_map, spawns, lamps,
+                         depth_palette, edge_color, tinted_floors)
+
+
+class LevelPreparer:
+    """Prepara un nivel a la vez en un thread de fondo"""
+
+    def __init__(self):
+        self._executor = None
+        self._future = None
+        self._level_num = None
+        self._seed = None
+
+    def start(self, level_num, screen_data, floor_tile, depth_palette, edge_color, seed=None):
+        """Empieza a preparar level_num (los argumentos son los de prepare_level).
+        Si ya se está preparando ese nivel con el mismo seed, no hace nada."""
+        if self._future is not None and (self._level_num, self._seed) == (level_num, seed):
+            return
+        self.cancel()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-prep")
+        self._level_num = level_num
+        self._seed = seed
+        self._future = self._executor.submit(prepare_level, level_num, screen_data, floor_tile,
+                                             depth_palette, edge_color, seed)
+
+    def take(self, level_num):
+        """Retorna el nivel preparado (esperando si todavía no terminó), o None
+        si no se estaba preparando ese nivel o la preparación falló."""
+        future = self._future
+        if future is None or self._level_num != level_num:
+            return None
+        self._future = None
+        self._level_num = None
+        self._seed = None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error preparando nivel {level_num + 1}: {e}")
+            return None
+
+    def cancel(self):
+        """Descarta la preparación en curso (el resultado se ignora)"""
+        if self._future is not None:
+            self._future.cancel()
+        self._future = None
+        self._level_num = None
+        self._seed = None
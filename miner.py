@@ -4,6 +4,7 @@ import pygame
 import math
 from constants import *
 from evgamelib.entity import Entity
+from sprite_atlas import PLAIN_MODE
 
 class Miner(Entity):
     def __init__(self, x, y):
@@ -17,13 +18,13 @@ class Miner(Entity):
         """Retorna la mask del sprite del minero"""
         return masks.get('miner')
 
-    def draw(self, screen, camera_x, camera_y):
+    def draw(self, screen, camera_x, camera_y, mode=PLAIN_MODE):
         screen_x = self.x - camera_x
         screen_y = self.y - camera_y
         if -50 < screen_y < GAME_VIEWPORT_HEIGHT + 50 and -50 < screen_x < GAME_WIDTH + 50:
             if self.image:
                 # Draw sprite
-                screen.blit(self.image, (int(screen_x), int(screen_y)))
+                screen.blit(mode.sprite(self.image), (int(screen_x), int(screen_y)))
             else:
                 # Fallback: Draw miner
                 pygame.draw.circle(screen, COLOR_GREEN, (int(screen_x + 16), int(screen_y + 10)), 8)
@@ -0,0 +1,109 @@
+# H.E.R.O. Remake - Overlays por chunks
+# Los overlays del nivel (fondo de caverna, textura del suelo, musgo) ya no se
+# generan como una superficie del tamaño del nivel completo. Se dividen en
+# chunks del tamaño del viewport que se generan la primera vez que la cámara
+# entra en ellos y se guardan en un LRU acotado: la memoria deja de depender
+# del área del nivel.
+
+from collections import OrderedDict
+
+import pygame
+from constants import OVERLAY_CHUNK_W, OVERLAY_CHUNK_H, OVERLAY_CHUNK_CACHE_SIZE
+
+
+class ChunkedOverlay:
+    """Capa de overlay generada on-demand por chunks, con desalojo LRU.
+
+    generate(chunk_col, chunk_row) debe retornar la superficie del chunk y ser
+    determinística: un chunk desalojado se vuelve a generar idéntico.
+    """
+
+    def __init__(self, width, height, generate, alpha=True, max_chunks=OVERLAY_CHUNK_CACHE_SIZE):
+        self.width = width      # tamaño del nivel en píxeles
+        self.height = height
+        self.chunk_cols = max(1, -(-width // OVERLAY_CHUNK_W))
+        self.chunk_rows = max(1, -(-height // OVERLAY_CHUNK_H))
+        self.alpha = alpha
+        self.max_chunks = max(1, max_chunks)
+        self._generate = generate
+        self._chunks = OrderedDict()  # (chunk_col, chunk_row) -> Surface
+        self._unconverted = set()     # chunks prefetcheados sin convertir al display
+
+    def loaded_chunks(self):
+        """Cantidad de chunks actualmente en memoria"""
+        return len(self._chunks)
+
+    def chunk(self, chunk_col, chunk_row):
+        """Superficie del chunk (la genera si no está en memoria)"""
+        key = (chunk_col, chunk_row)
+        surface = self._chunks.get(key)
+        if surface is not None:
+            self._chunks.move_to_end(key)
+            if key in self._unconverted:
+                self._unconverted.discard(key)
+                surface = self._convert(surface)
+                self._chunks[key] = surface
+            return surface
+
+        surface = self._convert(self._generate(chunk_col, chunk_row))
+        self._store(key, surface)
+        return surface
+
+    def prefetch(self, x, y):
+        """Genera el chunk que contiene el punto (x, y) sin convertirlo al display.
+        Se puede llamar desde otro thread mientras la capa todavía no se usa para
+        dibujar: la conversión se hace en chunk(), en el thread principal."""
+        chunk_col = int(x) // OVERLAY_CHUNK_W
+        chunk_row = int(y) // OVERLAY_CHUNK_H
+        key = (chunk_col, chunk_row)
+        if key in self._chunks or not (0 <= chunk_col < self.chunk_cols and
+                                       0 <= chunk_row < self.chunk_rows):
+            return
+        self._store(key, self._generate(chunk_col, chunk_row))
+        self._unconverted.add(key)
+
+    def _convert(self, surface):
+        # Convertir al formato del display para blits rápidos (si ya hay display)
+        if pygame.display.get_surface():
+            return surface.convert_alpha() if self.alpha else surface.convert()
+        return surface
+
+    def _store(self, key, surface):
+        self._chunks[key] = surface
+        while len(self._chunks) > self.max_chunks:
+            evicted, _ = self._chunks.popitem(last=False)
+            self._unconverted.discard(evicted)
+
+    def touch(self, x, y):
+        """Asegura que el chunk que contiene el punto (x, y) del nivel esté generado"""
+        chunk_col = int(x) // OVERLAY_CHUNK_W
+        chunk_row = int(y) // OVERLAY_CHUNK_H
+        if 0 <= chunk_col < self.chunk_cols and 0 <= chunk_row < self.chunk_rows:
+            self.chunk(chunk_col, chunk_row)
+
+    def blit_area(self, target, dest, area):
+        """Blitea la región area (Rect en píxeles del nivel) en target, en dest.
+        Con la cámara alineada al viewport toca un solo chunk."""
+        origin = pygame.Rect(area)
+        area = origin.clip(pygame.Rect(0, 0, self.width, self.height))
+        if area.w <= 0 or area.h <= 0:
+            return
+        first_col = area.left // OVERLAY_CHUNK_W
+        last_col = (area.right - 1) // OVERLAY_CHUNK_W
+        first_row = area.top // OVERLAY_CHUNK_H
+        last_row = (area.bottom - 1) // OVERLAY_CHUNK_H
+        for chunk_row in range(first_row, last_row + 1):
+            for chunk_col in range(first_col, last_col + 1):
+                chunk_x = chunk_col * OVERLAY_CHUNK_W
+                chunk_y = chunk_row * OVERLAY_CHUNK_H
+                part = area.clip(pygame.Rect(chunk_x, chunk_y, OVERLAY_CHUNK_W, OVERLAY_CHUNK_H))
+                if part.w <= 0 or part.h <= 0:
+                    continue
+                src = part.move(-chunk_x, -chunk_y)
+                target.blit(self.chunk(chunk_col, chunk_row),
+                            (dest[0] + part.x - origin.x, dest[1] + part.y - origin.y), src)
+
+    def clear(self):
+        """Libera todos los chunks en memoria"""
+        self._chunks.clear()
+        self._unconverted.clear()
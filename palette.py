@@ -6,7 +6,9 @@
 import pygame
 import random
 from constants import (
-    VIEWPORT_ROWS, TILE_SIZE, SOLID_TILES,
+    VIEWPORT_ROWS, TILE_SIZE, OVERLAY_CHUNK_W, OVERLAY_CHUNK_H,
+    # Fondo de caverna
+    CAVE_DOT_SIZE, CAVE_DOT_DENSITY, CAVE_DOT_BRIGHTNESS,
     # Textura C64 (suelo/lava)
     OVERLAY_CHEVRON_PERIOD, OVERLAY_CHEVRON_W, OVERLAY_CHEVRON_H, OVERLAY_CHEVRON_THICKNESS,
     OVERLAY_CHEVRON_SPACING, OVERLAY_CHEVRON_IRREGULARITY, OVERLAY_NOISE_DENSITY,
@@ -21,6 +23,14 @@ from constants import (
     MOSS_JAG_GAP_CHANCE, MOSS_JAG_CLUSTER_LEN, MOSS_JAG_PEAK_CHANCE,
     MOSS_JAG_PEAK_EXTRA,
 )
+from tilegrid import as_grid
+try:
+    import palette_numpy
+except ImportError:
+    palette_numpy = None
+
+# Backend de generación de texturas (entra en la clave del cache de niveles)
+TEXTURE_BACKEND = 'numpy' if palette_numpy else 'python'
 
 # Grosor del borde decorativo en píxeles (legacy, usado por draw_tile_edges)
 EDGE_THICKNESS = 3
@@ -95,14 +105,83 @@ def build_tinted_floors(base_tile, depth_palette):
     return tinted
 
 
+def generate_cave_background(level_map, depth_palette, seed=42, region=None):
+    """Genera superficie opaca de fondo con pintitas simulando textura de caverna.
+    Los colores se derivan del color 1 del nivel (depth_palette entrada 0).
+    region: pygame.Rect en píxeles del nivel a generar (None = nivel completo).
+    Cada chunk tiene su propio seed, así que con el mismo seed el resultado es
+    siempre el mismo, se genere completo o por partes."""
+    level_map = as_grid(level_map)
+    if region is None:
+        width = level_map.max_width * TILE_SIZE
+        height = level_map.height * TILE_SIZE
+        cave_bg = pygame.Surface((width, height))
+        for cy in range(0, height, OVERLAY_CHUNK_H):
+            for cx in range(0, width, OVERLAY_CHUNK_W):
+                chunk_rect = pygame.Rect(cx, cy, OVERLAY_CHUNK_W, OVERLAY_CHUNK_H)
+                cave_bg.blit(generate_cave_background(level_map, depth_palette, seed, chunk_rect),
+                             (cx, cy))
+        return cave_bg
+
+    region = pygame.Rect(region)
+    cave_bg = pygame.Surface(region.size)
+    cave_bg.fill((0, 0, 0))
+    rng = _tile_rng(seed, region.y // OVERLAY_CHUNK_H, region.x // OVERLAY_CHUNK_W)
+
+    # Se usan variantes oscuras (~15-25% del color original)
+    if depth_palette and len(depth_palette) > 0:
+        wc = depth_palette[0].get("wall", [255, 255, 255])
+        base_r, base_g, base_b = wc[0], wc[1], wc[2]
+    else:
+        base_r, base_g, base_b = 180, 120, 60  # Fallback marron
+    dot_colors = [
+        (max(0, base_r * pct // 100), max(0, base_g * pct // 100), max(0, base_b * pct // 100))
+        for pct in CAVE_DOT_BRIGHTNESS
+    ]
+
+    num_dots = int(region.w * region.h * CAVE_DOT_DENSITY)
+
+    for _ in range(num_dots):
+        dx = rng.randint(0, region.w - CAVE_DOT_SIZE)
+        dy = rng.randint(0, region.h - CAVE_DOT_SIZE)
+        color = rng.choice(dot_colors)
+        if CAVE_DOT_SIZE <= 1:
+            cave_bg.set_at((dx, dy), color)
+        else:
+            pygame.draw.rect(cave_bg, color, (dx, dy, CAVE_DOT_SIZE, CAVE_DOT_SIZE))
+
+    return cave_bg
+
+
+def _tile_rng(seed, row, col):
+    """RNG propio de cada tile (o chunk). Lo que se dibuja para un tile no depende
+    de qué otros tiles se generaron antes, así un chunk regenerado es idéntico."""
+    return random.Random((seed * 1000003 + row) * 1000003 + col)
+
+
+def _region_tiles(level_map, region, margin_rows=0, margin_cols=0):
+    """Itera (row, col) de los tiles que tocan la región (más un margen en tiles
+    para los efectos que se extienden fuera de su propio tile)."""
+    row_start = max(0, region.top // TILE_SIZE - margin_rows)
+    row_end = min(level_map.height, -(-region.bottom // TILE_SIZE) + margin_rows)
+    col_start = max(0, region.left // TILE_SIZE - margin_cols)
+    col_end = -(-region.right // TILE_SIZE) + margin_cols
+    for row in range(row_start, row_end):
+        for col in range(col_start, min(col_end, level_map.row_width(row))):
+            yield row, col
+
+
+def _overlay_region(level_map, region):
+    """Rect de la región a generar (None = nivel completo)"""
+    if region is None:
+        return pygame.Rect(0, 0, level_map.max_width * TILE_SIZE, level_map.height * TILE_SIZE)
+    return pygame.Rect(region)
+
+
 def _is_solid(level_map, row, col):
-    """Verificar si un tile es sólido (para detección de bordes)."""
-    if row < 0 or row >= len(level_map):
-        return True  # Fuera de límites = sólido
-    row_data = level_map[row]
-    if col < 0 or col >= len(row_data):
-        return True  # Fuera de límites = sólido
-    return row_data[col] in SOLID_TILES
+    """Verificar si un tile es sólido (para detección de bordes).
+    Fuera de límites = sólido."""
+    return level_map.is_solid(row, col)
 
 
 def draw_tile_edges(surface, x, y, row, col, level_map, edge_color):
@@ -112,6 +191,7 @@ def draw_tile_edges(surface, x, y, row, col, level_map, edge_color):
     Usado por el editor. El juego usa generate_edge_overlay()."""
     t = EDGE_THICKNESS
     color = tuple(edge_color)
+    level_map = as_grid(level_map)
 
     # Cara superior: si el vecino de arriba no es sólido
     if not _is_solid(level_map, row - 1, col):
@@ -124,7 +204,7 @@ def draw_tile_edges(surface, x, y, row, col, level_map, edge_color):
 
 # ---------------------------------------------------------------------------
 # Overlay de musgo/raíces (reemplaza draw_tile_edges en el juego principal)
-# Se pre-genera una vez al cargar el nivel y se blitea por viewport
+# Se genera por chunks del tamaño del viewport (ver overlay_chunks.py)
 # ---------------------------------------------------------------------------
 
 def _clamp_color(val):
@@ -165,67 +245,75 @@ def _jagged_heights(rng, count, min_h, max_h):
     return heights
 
 
-def generate_edge_overlay(level_map, edge_color, seed=42, skip_tiles=None):
+def generate_edge_overlay(level_map, edge_color, seed=42, skip_tiles=None, region=None):
     """Genera superficie SRCALPHA con musgo/raíces en bordes expuestos.
-    Se llama una vez al inicio del nivel. El resultado se blitea por viewport.
-    skip_tiles: set de (row, col) a excluir del musgo (ej: tiles de víbora)."""
-    level_h = len(level_map)
-    level_w = max(len(row) for row in level_map)
-    width = level_w * TILE_SIZE
-    height = level_h * TILE_SIZE
-    overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-    rng = random.Random(seed)
+    skip_tiles: set de (row, col) a excluir del musgo (ej: tiles de víbora).
+    region: pygame.Rect en píxeles del nivel a generar (None = nivel completo).
+    El musgo se sale de su tile, así que también se procesan los tiles vecinos
+    a la región; la superficie recorta lo que cae afuera."""
+    level_map = as_grid(level_map)
+    region = _overlay_region(level_map, region)
+    overlay = pygame.Surface(region.size, pygame.SRCALPHA)
     cr, cg, cb = edge_color[0], edge_color[1], edge_color[2]
 
-    for row in range(level_h):
-        for col in range(len(level_map[row])):
-            tile = level_map[row][col]
-            if tile != '.':
-                continue
-            if skip_tiles and (row, col) in skip_tiles:
-                continue
-            px = col * TILE_SIZE
-            py = row * TILE_SIZE
-
-            # Cara inferior expuesta (techo -> stalactitas cuelgan)
-            if not _is_solid(level_map, row + 1, col):
-                _draw_moss_down(overlay, px, py + TILE_SIZE,
-                                width, height, cr, cg, cb, rng)
-
-            # Cara superior expuesta (suelo -> stalagmitas crecen)
-            if not _is_solid(level_map, row - 1, col):
-                _draw_moss_up(overlay, px, py,
-                              width, height, cr, cg, cb, rng)
+    # Alcance máximo del musgo fuera de su tile (banda base + pico + tendril)
+    reach = MOSS_BASE_H + max(MOSS_MAX_DOWN, MOSS_MAX_UP) + 5 + MOSS_TENDRIL_LENGTH[1]
+    margin_rows = 1 + -(-reach // TILE_SIZE)
+
+    # Cara inferior expuesta (techo -> stalactitas cuelgan)
+    # Cara superior expuesta (suelo -> stalagmitas crecen)
+    down_tiles = []
+    up_tiles = []
+    for row, col in _region_tiles(level_map, region, margin_rows, 1):
+        if level_map.tile(row, col) != '.':
+            continue
+        if skip_tiles and (row, col) in skip_tiles:
+            continue
+        if not _is_solid(level_map, row + 1, col):
+            down_tiles.append((row, col))
+        if not _is_solid(level_map, row - 1, col):
+            up_tiles.append((row, col))
+
+    if palette_numpy:
+        palette_numpy.paint_edge_overlay(overlay, region.topleft, down_tiles, up_tiles,
+                                         edge_color, seed)
+        return overlay
+
+    # Un RNG por tile, compartido por sus dos caras (primero la de abajo)
+    down = set(down_tiles)
+    up = set(up_tiles)
+    for row, col in sorted(down | up):
+        px = col * TILE_SIZE - region.x
+        py = row * TILE_SIZE - region.y
+        rng = _tile_rng(seed, row, col)
+        if (row, col) in down:
+            _draw_moss_down(overlay, px, py + TILE_SIZE, cr, cg, cb, rng)
+        if (row, col) in up:
+            _draw_moss_up(overlay, px, py, cr, cg, cb, rng)
 
     return overlay
 
 
-def _draw_moss_down(overlay, x, y0, sw, sh, cr, cg, cb, rng):
-    """Stalactitas colgando del techo hacia abajo."""
+def _draw_moss_down(overlay, x, y0, cr, cg, cb, rng):
+    """Stalactitas colgando del techo hacia abajo.
+    No recorta a mano: set_at ignora píxeles fuera de la superficie, y así el
+    rng consume siempre la misma secuencia aunque el tile quede en el borde."""
     base_h = MOSS_BASE_H
     v = MOSS_COLOR_VARIATION
     # Banda base (sparse - no todos los píxeles)
     for i in range(TILE_SIZE):
         bx = x + i
-        if bx >= sw:
-            break
         if rng.random() < MOSS_BASE_GAP_CHANCE:
             continue  # huecos en la base
         for dy in range(base_h):
             by = y0 + dy
-            if by >= sh:
-                break
             overlay.set_at((bx, by), (cr, cg, cb, MOSS_ALPHA_BASE))
     # Dentado irregular
     heights = _jagged_heights(rng, TILE_SIZE, 1, MOSS_MAX_DOWN)
     for i, h in enumerate(heights):
         bx = x + i
-        if bx >= sw:
-            break
         for dy in range(h):
             by = y0 + base_h + dy
-            if by >= sh:
-                break
             a = MOSS_ALPHA_BASE if dy < h - 3 else max(MOSS_ALPHA_TIP, MOSS_ALPHA_BASE - (dy - (h - 3)) * 50)
             overlay.set_at((bx, by), (
                 _clamp_color(cr + rng.randint(-v, v)),
@@ -239,38 +327,27 @@ def _draw_moss_down(overlay, x, y0, sw, sh, cr, cg, cb, rng):
         tlen = rng.randint(*MOSS_TENDRIL_LENGTH)
         for dy in range(tlen):
             by = y0 + base_h + base + dy
-            if by >= sh:
-                break
             tx2 = tx + rng.randint(-1, 1)
-            if 0 <= tx2 < sw:
-                a = max(MOSS_ALPHA_TIP // 2, 180 - dy * 12)
-                overlay.set_at((tx2, by), (cr, cg, cb, a))
+            a = max(MOSS_ALPHA_TIP // 2, 180 - dy * 12)
+            overlay.set_at((tx2, by), (cr, cg, cb, a))
 
 
-def _draw_moss_up(overlay, x, y0, sw, sh, cr, cg, cb, rng):
+def _draw_moss_up(overlay, x, y0, cr, cg, cb, rng):
     """Stalagmitas creciendo del suelo hacia arriba."""
     base_h = MOSS_BASE_H
     v = MOSS_COLOR_VARIATION
     for i in range(TILE_SIZE):
         bx = x + i
-        if bx >= sw:
-            break
         if rng.random() < MOSS_BASE_GAP_CHANCE:
             continue  # huecos en la base
         for dy in range(base_h):
             by = y0 - 1 - dy
-            if by < 0:
-                break
             overlay.set_at((bx, by), (cr, cg, cb, MOSS_ALPHA_BASE))
     heights = _jagged_heights(rng, TILE_SIZE, 1, MOSS_MAX_UP)
     for i, h in enumerate(heights):
         bx = x + i
-        if bx >= sw:
-            break
         for dy in range(h):
             by = y0 - base_h - 1 - dy
-            if by < 0:
-                break
             a = MOSS_ALPHA_BASE if dy < h - 3 else max(MOSS_ALPHA_TIP, MOSS_ALPHA_BASE - (dy - (h - 3)) * 50)
             overlay.set_at((bx, by), (
                 _clamp_color(cr + rng.randint(-v, v)),
@@ -283,37 +360,26 @@ def _draw_moss_up(overlay, x, y0, sw, sh, cr, cg, cb, rng):
         tlen = rng.randint(*MOSS_TENDRIL_LENGTH)
         for dy in range(tlen):
             by = y0 - base_h - 1 - base - dy
-            if by < 0:
-                break
             tx2 = tx + rng.randint(-1, 1)
-            if 0 <= tx2 < sw:
-                a = max(MOSS_ALPHA_TIP // 2, 180 - dy * 14)
-                overlay.set_at((tx2, by), (cr, cg, cb, a))
+            a = max(MOSS_ALPHA_TIP // 2, 180 - dy * 14)
+            overlay.set_at((tx2, by), (cr, cg, cb, a))
 
 
-def _draw_moss_left(overlay, x0, y, sw, sh, cr, cg, cb, rng):
+def _draw_moss_left(overlay, x0, y, cr, cg, cb, rng):
     """Musgo creciendo hacia la izquierda."""
     base_w = MOSS_BASE_W
     v = MOSS_COLOR_VARIATION
     for i in range(TILE_SIZE):
         by = y + i
-        if by >= sh:
-            break
         bw = base_w + (1 if rng.random() < MOSS_BASE_GAP_CHANCE else 0)
         for dx in range(bw):
             bx = x0 - 1 - dx
-            if bx < 0:
-                break
             overlay.set_at((bx, by), (cr, cg, cb, MOSS_ALPHA_BASE))
     heights = _jagged_heights(rng, TILE_SIZE, 1, MOSS_MAX_SIDE)
     for i, h in enumerate(heights):
         by = y + i
-        if by >= sh:
-            break
         for dx in range(h):
             bx = x0 - base_w - 1 - dx
-            if bx < 0:
-                break
             a = MOSS_ALPHA_BASE if dx < h - 2 else max(MOSS_ALPHA_TIP, MOSS_ALPHA_BASE - (dx - (h - 2)) * 60)
             overlay.set_at((bx, by), (
                 _clamp_color(cr + rng.randint(-v, v)),
@@ -321,29 +387,21 @@ def _draw_moss_left(overlay, x0, y, sw, sh, cr, cg, cb, rng):
                 _clamp_color(cb + rng.randint(-v, v)), a))
 
 
-def _draw_moss_right(overlay, x0, y, sw, sh, cr, cg, cb, rng):
+def _draw_moss_right(overlay, x0, y, cr, cg, cb, rng):
     """Musgo creciendo hacia la derecha."""
     base_w = MOSS_BASE_W
     v = MOSS_COLOR_VARIATION
     for i in range(TILE_SIZE):
         by = y + i
-        if by >= sh:
-            break
         bw = base_w + (1 if rng.random() < MOSS_BASE_GAP_CHANCE else 0)
         for dx in range(bw):
             bx = x0 + dx
-            if bx >= sw:
-                break
             overlay.set_at((bx, by), (cr, cg, cb, MOSS_ALPHA_BASE))
     heights = _jagged_heights(rng, TILE_SIZE, 1, MOSS_MAX_SIDE)
     for i, h in enumerate(heights):
         by = y + i
-        if by >= sh:
-            break
         for dx in range(h):
             bx = x0 + base_w + dx
-            if bx >= sw:
-                break
             a = MOSS_ALPHA_BASE if dx < h - 2 else max(MOSS_ALPHA_TIP, MOSS_ALPHA_BASE - (dx - (h - 2)) * 60)
             overlay.set_at((bx, by), (
                 _clamp_color(cr + rng.randint(-v, v)),
@@ -361,119 +419,120 @@ _BLACK = (0, 0, 0, 255)
 
 
 def _is_empty(level_map, row, col):
-    """Verificar si un tile es vacío (aire, o fuera de límites)."""
-    if row < 0 or row >= len(level_map):
-        return False
-    row_data = level_map[row]
-    if col < 0 or col >= len(row_data):
-        return False
-    return row_data[col] not in SOLID_TILES
+    """Verificar si un tile es vacío (aire dentro del mapa; fuera de límites no cuenta)."""
+    return level_map.in_bounds(row, col) and not level_map.is_solid(row, col)
 
 
-def generate_floor_texture(level_map, seed=42):
+def generate_floor_texture(level_map, seed=42, region=None):
     """Genera overlay SRCALPHA estilo C64: solo negro puro sobre tiles de suelo/lava.
     Patrón de bandas zigzag horizontales + ruido disperso + dientes en bordes.
-    Se llama una vez al inicio del nivel."""
-    level_h = len(level_map)
-    level_w = max(len(row) for row in level_map)
-    width = level_w * TILE_SIZE
-    height = level_h * TILE_SIZE
-    overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-    rng = random.Random(seed)
+    region: pygame.Rect en píxeles del nivel a generar (None = nivel completo).
+    Cada tile dibuja solo dentro de sí mismo con su propio rng."""
+    level_map = as_grid(level_map)
+    region = _overlay_region(level_map, region)
+    overlay = pygame.Surface(region.size, pygame.SRCALPHA)
 
     _TEXTURED_TILES = {'.', 'X'}
 
-    for row in range(level_h):
-        for col in range(len(level_map[row])):
-            tile = level_map[row][col]
-            if tile not in _TEXTURED_TILES:
-                continue
-            px = col * TILE_SIZE
-            py = row * TILE_SIZE
-
-            # --- Filas de chevrones grandes (estilo C64) ---
-            period = OVERLAY_CHEVRON_PERIOD
-            y_offset = rng.randint(0, period - 1)
-
-            for band_y in range(y_offset, TILE_SIZE + period, period):
-                # Llenar la fila con chevrones uno al lado del otro
-                cx = rng.randint(-4, 2)  # offset inicial aleatorio
-                while cx < TILE_SIZE:
-                    cw = rng.randint(*OVERLAY_CHEVRON_W)
-                    ch = rng.randint(*OVERLAY_CHEVRON_H)
-                    thick = rng.randint(*OVERLAY_CHEVRON_THICKNESS)
-                    # Dibujar chevrón: forma de V invertida (∧)
-                    half = cw // 2
-                    for lx in range(cw):
-                        # Altura del trazo en esta columna (forma de V)
-                        dist_center = abs(lx - half)
-                        # La V baja desde los extremos hacia el centro
-                        stripe_y = ch * dist_center // max(1, half)
-                        for t in range(thick):
-                            bx = px + cx + lx
-                            by = py + band_y + stripe_y + t
-                            if px <= bx < px + TILE_SIZE and py <= by < py + TILE_SIZE:
-                                overlay.set_at((bx, by), _BLACK)
-                            # Píxeles extras para irregularidad
-                            if rng.random() < OVERLAY_CHEVRON_IRREGULARITY:
-                                by2 = by + rng.choice([-1, 1])
-                                if py <= by2 < py + TILE_SIZE and px <= bx < px + TILE_SIZE:
-                                    overlay.set_at((bx, by2), _BLACK)
-
-                    cx += cw + rng.randint(*OVERLAY_CHEVRON_SPACING)
-
-            # --- Clusters de píxeles negros (cavidades pequeñas) ---
-            num_clusters = rng.randint(*OVERLAY_CLUSTER_COUNT)
-            for _ in range(num_clusters):
-                cx = rng.randint(0, TILE_SIZE - 1)
-                cy = rng.randint(0, TILE_SIZE - 1)
-                size = rng.randint(*OVERLAY_CLUSTER_SIZE)
-                for dx in range(size):
-                    for dy in range(size):
-                        if rng.random() > OVERLAY_CLUSTER_FILL:
-                            continue
-                        bx = px + cx + dx
-                        by = py + cy + dy
+    tiles = [(row, col) for row, col in _region_tiles(level_map, region)
+             if level_map.tile(row, col) in _TEXTURED_TILES]
+
+    if palette_numpy:
+        # Caras expuestas al vacío (arriba, abajo, izquierda, derecha) para los dientes
+        exposed = [(_is_empty(level_map, row - 1, col), _is_empty(level_map, row + 1, col),
+                    _is_empty(level_map, row, col - 1), _is_empty(level_map, row, col + 1))
+                   for row, col in tiles]
+        palette_numpy.paint_floor_texture(overlay, region.topleft, tiles, exposed, seed)
+        return overlay
+
+    for row, col in tiles:
+        px = col * TILE_SIZE - region.x
+        py = row * TILE_SIZE - region.y
+        rng = _tile_rng(seed, row, col)
+
+        # --- Filas de chevrones grandes (estilo C64) ---
+        period = OVERLAY_CHEVRON_PERIOD
+        y_offset = rng.randint(0, period - 1)
+
+        for band_y in range(y_offset, TILE_SIZE + period, period):
+            # Llenar la fila con chevrones uno al lado del otro
+            cx = rng.randint(-4, 2)  # offset inicial aleatorio
+            while cx < TILE_SIZE:
+                cw = rng.randint(*OVERLAY_CHEVRON_W)
+                ch = rng.randint(*OVERLAY_CHEVRON_H)
+                thick = rng.randint(*OVERLAY_CHEVRON_THICKNESS)
+                # Dibujar chevrón: forma de V invertida (∧)
+                half = cw // 2
+                for lx in range(cw):
+                    # Altura del trazo en esta columna (forma de V)
+                    dist_center = abs(lx - half)
+                    # La V baja desde los extremos hacia el centro
+                    stripe_y = ch * dist_center // max(1, half)
+                    for t in range(thick):
+                        bx = px + cx + lx
+                        by = py + band_y + stripe_y + t
                         if px <= bx < px + TILE_SIZE and py <= by < py + TILE_SIZE:
                             overlay.set_at((bx, by), _BLACK)
-
-            # --- Agujeros grandes aleatorios ---
-            num_holes = rng.randint(*OVERLAY_BIG_HOLE_COUNT)
-            for _ in range(num_holes):
-                hx = rng.randint(1, TILE_SIZE - 4)
-                hy = rng.randint(1, TILE_SIZE - 4)
-                hw = rng.randint(*OVERLAY_BIG_HOLE_W)
-                hh = rng.randint(*OVERLAY_BIG_HOLE_H)
-                for dx in range(hw):
-                    for dy in range(hh):
-                        # Forma irregular: bordes con huecos aleatorios
-                        edge = (dx == 0 or dx == hw - 1 or dy == 0 or dy == hh - 1)
-                        if edge and rng.random() < OVERLAY_BIG_HOLE_EDGE_SKIP:
-                            continue
-                        bx = px + hx + dx
-                        by = py + hy + dy
-                        if px <= bx < px + TILE_SIZE and py <= by < py + TILE_SIZE:
-                            overlay.set_at((bx, by), _BLACK)
-
-            # --- Ruido disperso (píxeles sueltos) ---
-            for ly in range(TILE_SIZE):
-                for lx in range(TILE_SIZE):
-                    if rng.random() < OVERLAY_NOISE_DENSITY:
-                        overlay.set_at((px + lx, py + ly), _BLACK)
-
-            # --- Dientes irregulares en bordes expuestos al vacío ---
-            # Cara superior expuesta (dientes crecen hacia arriba = dentro del tile)
-            if _is_empty(level_map, row - 1, col):
-                _draw_c64_teeth_top(overlay, px, py, rng)
-            # Cara inferior expuesta (dientes cuelgan hacia abajo = dentro del tile)
-            if _is_empty(level_map, row + 1, col):
-                _draw_c64_teeth_bottom(overlay, px, py, rng)
-            # Cara izquierda expuesta
-            if _is_empty(level_map, row, col - 1):
-                _draw_c64_teeth_left(overlay, px, py, rng)
-            # Cara derecha expuesta
-            if _is_empty(level_map, row, col + 1):
-                _draw_c64_teeth_right(overlay, px, py, rng)
+                        # Píxeles extras para irregularidad
+                        if rng.random() < OVERLAY_CHEVRON_IRREGULARITY:
+                            by2 = by + rng.choice([-1, 1])
+                            if py <= by2 < py + TILE_SIZE and px <= bx < px + TILE_SIZE:
+                                overlay.set_at((bx, by2), _BLACK)
+
+                cx += cw + rng.randint(*OVERLAY_CHEVRON_SPACING)
+
+        # --- Clusters de píxeles negros (cavidades pequeñas) ---
+        num_clusters = rng.randint(*OVERLAY_CLUSTER_COUNT)
+        for _ in range(num_clusters):
+            cx = rng.randint(0, TILE_SIZE - 1)
+            cy = rng.randint(0, TILE_SIZE - 1)
+            size = rng.randint(*OVERLAY_CLUSTER_SIZE)
+            for dx in range(size):
+                for dy in range(size):
+                    if rng.random() > OVERLAY_CLUSTER_FILL:
+                        continue
+                    bx = px + cx + dx
+                    by = py + cy + dy
+                    if px <= bx < px + TILE_SIZE and py <= by < py + TILE_SIZE:
+                        overlay.set_at((bx, by), _BLACK)
+
+        # --- Agujeros grandes aleatorios ---
+        num_holes = rng.randint(*OVERLAY_BIG_HOLE_COUNT)
+        for _ in range(num_holes):
+            hx = rng.randint(1, TILE_SIZE - 4)
+            hy = rng.randint(1, TILE_SIZE - 4)
+            hw = rng.randint(*OVERLAY_BIG_HOLE_W)
+            hh = rng.randint(*OVERLAY_BIG_HOLE_H)
+            for dx in range(hw):
+                for dy in range(hh):
+                    # Forma irregular: bordes con huecos aleatorios
+                    edge = (dx == 0 or dx == hw - 1 or dy == 0 or dy == hh - 1)
+                    if edge and rng.random() < OVERLAY_BIG_HOLE_EDGE_SKIP:
+                        continue
+                    bx = px + hx + dx
+                    by = py + hy + dy
+                    if px <= bx < px + TILE_SIZE and py <= by < py + TILE_SIZE:
+                        overlay.set_at((bx, by), _BLACK)
+
+        # --- Ruido disperso (píxeles sueltos) ---
+        for ly in range(TILE_SIZE):
+            for lx in range(TILE_SIZE):
+                if rng.random() < OVERLAY_NOISE_DENSITY:
+                    overlay.set_at((px + lx, py + ly), _BLACK)
+
+        # --- Dientes irregulares en bordes expuestos al vacío ---
+        # Cara superior expuesta (dientes crecen hacia arriba = dentro del tile)
+        if _is_empty(level_map, row - 1, col):
+            _draw_c64_teeth_top(overlay, px, py, rng)
+        # Cara inferior expuesta (dientes cuelgan hacia abajo = dentro del tile)
+        if _is_empty(level_map, row + 1, col):
+            _draw_c64_teeth_bottom(overlay, px, py, rng)
+        # Cara izquierda expuesta
+        if _is_empty(level_map, row, col - 1):
+            _draw_c64_teeth_left(overlay, px, py, rng)
+        # Cara derecha expuesta
+        if _is_empty(level_map, row, col + 1):
+            _draw_c64_teeth_right(overlay, px, py, rng)
 
     return overlay
 
@@ -0,0 +1,342 @@
+# H.E.R.O. Remake - Backend NumPy de texturas procedurales
+# Versión vectorizada de la textura C64 del suelo y del musgo de palette.py.
+# Usa los mismos parámetros OVERLAY_* y MOSS_* con el mismo significado, pero
+# arma los píxeles en arrays y los escribe de una vez con pygame.surfarray en
+# lugar de llamar a set_at píxel por píxel.
+#
+# Los números aleatorios salen de un hash de (seed, fila, columna, contador):
+# cada tile tiene su propia secuencia sin importar qué región se genere, así
+# que los chunks coinciden entre sí igual que con el backend Python.
+
+import numpy as np
+import pygame
+from constants import (
+    TILE_SIZE,
+    OVERLAY_CHEVRON_PERIOD, OVERLAY_CHEVRON_W, OVERLAY_CHEVRON_H, OVERLAY_CHEVRON_THICKNESS,
+    OVERLAY_CHEVRON_SPACING, OVERLAY_CHEVRON_IRREGULARITY, OVERLAY_NOISE_DENSITY,
+    OVERLAY_CLUSTER_COUNT, OVERLAY_CLUSTER_SIZE, OVERLAY_CLUSTER_FILL,
+    OVERLAY_BIG_HOLE_COUNT, OVERLAY_BIG_HOLE_W, OVERLAY_BIG_HOLE_H, OVERLAY_BIG_HOLE_EDGE_SKIP,
+    OVERLAY_TEETH_COUNT, OVERLAY_TEETH_W, OVERLAY_TEETH_DEPTH, OVERLAY_TEETH_BASE_GAP,
+    OVERLAY_TEETH_BASE_EXTRA,
+    MOSS_BASE_H, MOSS_MAX_DOWN, MOSS_MAX_UP,
+    MOSS_BASE_GAP_CHANCE, MOSS_COLOR_VARIATION, MOSS_ALPHA_TIP, MOSS_ALPHA_BASE,
+    MOSS_TENDRIL_COUNT, MOSS_TENDRIL_LENGTH,
+    MOSS_JAG_GAP_CHANCE, MOSS_JAG_CLUSTER_LEN, MOSS_JAG_PEAK_CHANCE,
+    MOSS_JAG_PEAK_EXTRA,
+)
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+# Multiplicador impar para separar los contadores antes del mezclado
+_STEP = np.uint64(0xD1B54A32D192ED03)
+
+
+def _mix64(z):
+    """Finalizador splitmix64 (z es un array uint64; el overflow es intencional)"""
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class _TileRandom:
+    """Números aleatorios por tile, indexados por (stream, contador).
+
+    random(stream, *shape) retorna un array (N,) + shape: la fila i depende
+    solo del seed y de la posición del tile i, no del resto de los tiles."""
+
+    def __init__(self, seed, rows, cols):
+        rows = np.asarray(rows, dtype=np.uint64)
+        cols = np.asarray(cols, dtype=np.uint64)
+        seed_key = _mix64(np.array([seed & _MASK64], dtype=np.uint64))
+        self._keys = _mix64(seed_key ^ _mix64((rows << np.uint64(32)) | cols))
+        self.count = len(rows)
+
+    def random(self, stream, *shape):
+        size = int(np.prod(shape)) if shape else 1
+        counters = (np.arange(size, dtype=np.uint64) | np.uint64(stream << 40)) * _STEP
+        z = _mix64(self._keys[:, None] + counters[None, :])
+        return ((z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))).reshape((self.count,) + shape)
+
+    def randint(self, stream, low, high, *shape):
+        """Enteros en [low, high] (ambos incluidos, como random.randint)"""
+        return low + (self.random(stream, *shape) * (high - low + 1)).astype(np.int64)
+
+
+def _in_tile(*coords):
+    ok = True
+    for c in coords:
+        ok = ok & (c >= 0) & (c < TILE_SIZE)
+    return ok
+
+
+def _stamp(mask, valid, ys, xs):
+    """Marca en mask (N, y, x) los píxeles válidos (ys/xs se broadcastean con valid)"""
+    n_idx = np.broadcast_to(np.arange(mask.shape[0]).reshape((-1,) + (1,) * (valid.ndim - 1)),
+                            valid.shape)
+    ys = np.broadcast_to(ys, valid.shape)
+    xs = np.broadcast_to(xs, valid.shape)
+    mask[n_idx[valid], ys[valid], xs[valid]] = True
+
+
+# ---------------------------------------------------------------------------
+# Textura C64 del suelo
+# ---------------------------------------------------------------------------
+
+def _chevron_mask(rnd, mask):
+    ts = TILE_SIZE
+    period = OVERLAY_CHEVRON_PERIOD
+    w_min, w_max = OVERLAY_CHEVRON_W
+    t_max = OVERLAY_CHEVRON_THICKNESS[1]
+    bands = (ts + period) // period + 1
+    per_band = (ts + 4) // max(1, w_min + OVERLAY_CHEVRON_SPACING[0]) + 2
+
+    y_offset = rnd.randint(1, 0, period - 1)
+    cx0 = rnd.randint(2, -4, 2, bands)
+    cw = rnd.randint(3, w_min, w_max, bands, per_band)
+    ch = rnd.randint(4, *OVERLAY_CHEVRON_H, bands, per_band)
+    thick = rnd.randint(5, *OVERLAY_CHEVRON_THICKNESS, bands, per_band)
+    spacing = rnd.randint(6, *OVERLAY_CHEVRON_SPACING, bands, per_band)
+
+    # Chevrones uno al lado del otro: posición = suma acumulada de anchos + espacios
+    advance = np.cumsum(cw + spacing, axis=2) - (cw + spacing)
+    cx = cx0[:, :, None] + advance                                      # (N, B, K)
+    band_y = y_offset[:, None] + period * np.arange(bands)[None, :]    # (N, B)
+    alive = (band_y < ts + period)[:, :, None] & (cx < ts)              # (N, B, K)
+
+    lx = np.arange(w_max)
+    t = np.arange(t_max)
+    half = cw // 2
+    stripe = ch[..., None] * np.abs(lx - half[..., None]) // np.maximum(1, half)[..., None]
+    bx = (cx[..., None] + lx)[..., None]                                # (N, B, K, W, 1)
+    by = band_y[:, :, None, None, None] + stripe[..., None] + t        # (N, B, K, W, T)
+    drawn = (alive[..., None, None] & (lx < cw[..., None])[..., None] &
+             (t < thick[..., None, None]))
+    _stamp(mask, drawn & _in_tile(bx, by), by, bx)
+
+    # Píxeles extras para irregularidad
+    extra = rnd.random(7, bands, per_band, w_max, t_max) < OVERLAY_CHEVRON_IRREGULARITY
+    by2 = by + np.where(rnd.random(8, bands, per_band, w_max, t_max) < 0.5, -1, 1)
+    _stamp(mask, drawn & extra & _in_tile(bx, by2), by2, bx)
+
+
+def _cluster_mask(rnd, mask):
+    c_max = OVERLAY_CLUSTER_COUNT[1]
+    s_max = OVERLAY_CLUSTER_SIZE[1]
+    count = rnd.randint(10, *OVERLAY_CLUSTER_COUNT)
+    cx = rnd.randint(11, 0, TILE_SIZE - 1, c_max)
+    cy = rnd.randint(12, 0, TILE_SIZE - 1, c_max)
+    size = rnd.randint(13, *OVERLAY_CLUSTER_SIZE, c_max)
+    fill = rnd.random(14, c_max, s_max, s_max) <= OVERLAY_CLUSTER_FILL
+
+    d = np.arange(s_max)
+    bx = cx[:, :, None, None] + d[:, None]       # (N, C, dx, dy)
+    by = cy[:, :, None, None] + d[None, :]
+    valid = ((np.arange(c_max) < count[:, None])[:, :, None, None] &
+             (d[:, None] < size[:, :, None, None]) & (d[None, :] < size[:, :, None, None]) &
+             fill & _in_tile(bx, by))
+    _stamp(mask, valid, by, bx)
+
+
+def _hole_mask(rnd, mask):
+    h_max = OVERLAY_BIG_HOLE_COUNT[1]
+    w_max = OVERLAY_BIG_HOLE_W[1]
+    hh_max = OVERLAY_BIG_HOLE_H[1]
+    count = rnd.randint(20, *OVERLAY_BIG_HOLE_COUNT)
+    hx = rnd.randint(21, 1, TILE_SIZE - 4, h_max)
+    hy = rnd.randint(22, 1, TILE_SIZE - 4, h_max)
+    hw = rnd.randint(23, *OVERLAY_BIG_HOLE_W, h_max)[:, :, None, None]
+    hh = rnd.randint(24, *OVERLAY_BIG_HOLE_H, h_max)[:, :, None, None]
+    skip = rnd.random(25, h_max, w_max, hh_max) < OVERLAY_BIG_HOLE_EDGE_SKIP
+
+    dx = np.arange(w_max)[:, None]
+    dy = np.arange(hh_max)[None, :]
+    # Forma irregular: bordes con huecos aleatorios
+    edge = (dx == 0) | (dx == hw - 1) | (dy == 0) | (dy == hh - 1)
+    bx = hx[:, :, None, None] + dx
+    by = hy[:, :, None, None] + dy
+    valid = ((np.arange(h_max) < count[:, None])[:, :, None, None] &
+             (dx < hw) & (dy < hh) & ~(edge & skip) & _in_tile(bx, by))
+    _stamp(mask, valid, by, bx)
+
+
+def _teeth_mask(rnd, stream):
+    """Dientes del borde superior (y = profundidad dentro del tile). Los otros
+    tres bordes se obtienen espejando/transponiendo este patrón."""
+    ts = TILE_SIZE
+    mask = np.zeros((rnd.count, ts, ts), dtype=bool)
+    base = rnd.random(stream, ts) >= OVERLAY_TEETH_BASE_GAP
+    mask[:, 0, :] = base
+    mask[:, 1, :] = base & (rnd.random(stream + 1, ts) < OVERLAY_TEETH_BASE_EXTRA)
+
+    k_max = OVERLAY_TEETH_COUNT[1]
+    w_max = OVERLAY_TEETH_W[1]
+    d_max = OVERLAY_TEETH_DEPTH[1]
+    count = rnd.randint(stream + 2, *OVERLAY_TEETH_COUNT)
+    tx = rnd.randint(stream + 3, 0, ts - 1, k_max)[:, :, None, None]
+    tw = rnd.randint(stream + 4, *OVERLAY_TEETH_W, k_max)[:, :, None, None]
+    td = rnd.randint(stream + 5, *OVERLAY_TEETH_DEPTH, k_max)[:, :, None, None]
+
+    dy = np.arange(d_max)[:, None]
+    dx = np.arange(w_max)[None, :]
+    # Se angosta con la profundidad (forma triangular)
+    shrink = dy * tw // (td + 1)
+    bx = tx + dx
+    valid = ((np.arange(k_max) < count[:, None])[:, :, None, None] &
+             (dy < td) & (dx < np.maximum(1, tw - shrink)) & _in_tile(bx))
+    _stamp(mask, valid, dy, bx)
+    return mask
+
+
+def paint_floor_texture(overlay, origin, tiles, exposed, seed):
+    """Dibuja la textura C64 en overlay (SRCALPHA, ya transparente).
+    origin: (x, y) del overlay en píxeles del nivel.
+    tiles: lista de (row, col) de tiles de suelo/lava.
+    exposed: lista de (arriba, abajo, izquierda, derecha) vacíos por tile."""
+    if not tiles:
+        return
+    ts = TILE_SIZE
+    rows, cols = zip(*tiles)
+    rnd = _TileRandom(seed, rows, cols)
+    exposed = np.asarray(exposed, dtype=bool)
+
+    mask = rnd.random(0, ts, ts) < OVERLAY_NOISE_DENSITY   # ruido disperso
+    _chevron_mask(rnd, mask)
+    _cluster_mask(rnd, mask)
+    _hole_mask(rnd, mask)
+
+    # Dientes en bordes expuestos al vacío
+    mask |= _teeth_mask(rnd, 30) & exposed[:, 0, None, None]
+    mask |= _teeth_mask(rnd, 40)[:, ::-1, :] & exposed[:, 1, None, None]
+    mask |= _teeth_mask(rnd, 50).transpose(0, 2, 1) & exposed[:, 2, None, None]
+    mask |= _teeth_mask(rnd, 60).transpose(0, 2, 1)[:, :, ::-1] & exposed[:, 3, None, None]
+
+    n, ly, lx = np.nonzero(mask)
+    xs = np.asarray(cols)[n] * ts - origin[0] + lx
+    ys = np.asarray(rows)[n] * ts - origin[1] + ly
+    w, h = overlay.get_size()
+    inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    # Solo negro puro: el RGB del overlay ya es 0, alcanza con el alpha
+    alpha = pygame.surfarray.pixels_alpha(overlay)
+    alpha[xs[inside], ys[inside]] = 255
+    del alpha
+
+
+# ---------------------------------------------------------------------------
+# Musgo/raíces
+# ---------------------------------------------------------------------------
+
+def _jag_draws(rnd, stream, min_h, max_h):
+    """Sorteos de _jagged_heights, uno de cada tipo por posición del borde (N, TILE_SIZE)"""
+    ts = TILE_SIZE
+    return {
+        'length': rnd.randint(stream, *MOSS_JAG_CLUSTER_LEN, ts),
+        'gap': rnd.random(stream + 1, ts) < MOSS_JAG_GAP_CHANCE,
+        'level': rnd.randint(stream + 2, min_h, max_h, ts),
+        'resume': rnd.randint(stream + 3, min_h, max(min_h + 1, max_h), ts),  # al salir de un gap
+        'step': rnd.randint(stream + 4, -1, 1, ts),
+        'peak': rnd.random(stream + 5, ts) < MOSS_JAG_PEAK_CHANCE,
+        'peak_extra': rnd.randint(stream + 6, *MOSS_JAG_PEAK_EXTRA, ts),
+        'gap_h': rnd.randint(stream + 7, 0, min_h, ts),
+    }
+
+
+def _jagged_heights(draws, min_h, max_h):
+    """Alturas irregulares (N, TILE_SIZE) con clusters, gaps y picos. Mismas
+    reglas que palette._jagged_heights, paso a paso a lo largo del borde pero
+    para todos los tiles a la vez: clamp en cada paso de la caminata, ±1 también
+    en el primer elemento de cada cluster, y un gap nunca sigue a otro gap."""
+    count, ts = draws['step'].shape
+    heights = np.empty((count, ts), dtype=np.int64)
+    h = np.zeros(count, dtype=np.int64)
+    left = np.zeros(count, dtype=np.int64)     # lo que queda del cluster actual
+    in_gap = np.zeros(count, dtype=bool)
+    for i in range(ts):
+        start = left <= 0
+        to_gap = start & ~in_gap & draws['gap'][:, i]
+        h = np.where(start & in_gap, draws['resume'][:, i],
+                     np.where(start & ~to_gap, draws['level'][:, i], h))
+        in_gap = np.where(start, to_gap, in_gap)
+        left = np.where(start, draws['length'][:, i], left) - 1
+        h = np.clip(h + draws['step'][:, i], min_h, max_h)
+        # Picos largos ocasionales
+        tip = np.where(draws['peak'][:, i], np.minimum(max_h + 5, h + draws['peak_extra'][:, i]), h)
+        heights[:, i] = np.where(in_gap, draws['gap_h'][:, i], tip)
+    return heights
+
+
+def _moss_pixels(rnd, stream, px, anchor, sign, max_h, tendril_fade, color):
+    """Píxeles de musgo de una cara (stalactitas si sign=1, stalagmitas si -1).
+    Retorna lista de (xs, ys, rgb, alpha) en el orden en que se pintan."""
+    ts = TILE_SIZE
+    base_h = MOSS_BASE_H
+    v = MOSS_COLOR_VARIATION
+    cr, cg, cb = color
+    i = np.arange(ts)
+    layers = []
+
+    # Banda base (sparse - no todos los píxeles)
+    keep = rnd.random(stream, ts) >= MOSS_BASE_GAP_CHANCE
+    d = np.arange(base_h)
+    xs = np.broadcast_to((px[:, None] + i)[:, :, None], keep.shape + (base_h,))
+    ys = np.broadcast_to(anchor[:, None, None] + sign * d, xs.shape)
+    valid = np.broadcast_to(keep[:, :, None], xs.shape)
+    rgb = np.broadcast_to(np.array([cr, cg, cb]), (int(valid.sum()), 3))
+    layers.append((xs[valid], ys[valid], rgb, np.full(rgb.shape[0], MOSS_ALPHA_BASE)))
+
+    # Dentado irregular
+    heights = _jagged_heights(_jag_draws(rnd, stream + 1, 1, max_h), 1, max_h)
+    tall = max_h + 5
+    dy = np.arange(tall)
+    h = heights[:, :, None]
+    valid = np.broadcast_to(dy < h, heights.shape + (tall,))
+    xs = np.broadcast_to((px[:, None] + i)[:, :, None], valid.shape)
+    ys = np.broadcast_to(anchor[:, None, None] + sign * (base_h + dy), valid.shape)
+    alpha = np.where(dy < h - 3, MOSS_ALPHA_BASE,
+                     np.maximum(MOSS_ALPHA_TIP, MOSS_ALPHA_BASE - (dy - (h - 3)) * 50))
+    jitter = rnd.randint(stream + 10, -v, v, ts, tall, 3)
+    rgb = np.clip(np.array([cr, cg, cb]) + jitter, 0, 255)
+    layers.append((xs[valid], ys[valid], rgb[valid], np.broadcast_to(alpha, valid.shape)[valid]))
+
+    # Tendriles finos extra
+    t_max = MOSS_TENDRIL_COUNT[1]
+    l_max = MOSS_TENDRIL_LENGTH[1]
+    count = rnd.randint(stream + 20, *MOSS_TENDRIL_COUNT)
+    tx_off = rnd.randint(stream + 21, 0, ts - 1, t_max)
+    tlen = rnd.randint(stream + 22, *MOSS_TENDRIL_LENGTH, t_max)
+    base = np.take_along_axis(heights, tx_off, axis=1)
+    dy = np.arange(l_max)
+    valid = ((np.arange(t_max) < count[:, None])[:, :, None] & (dy < tlen[:, :, None]))
+    xs = (px[:, None] + tx_off)[:, :, None] + rnd.randint(stream + 23, -1, 1, t_max, l_max)
+    ys = anchor[:, None, None] + sign * (base_h + base[:, :, None] + dy)
+    alpha = np.broadcast_to(np.maximum(MOSS_ALPHA_TIP // 2, 180 - dy * tendril_fade), valid.shape)
+    rgb = np.broadcast_to(np.array([cr, cg, cb]), (int(valid.sum()), 3))
+    layers.append((xs[valid], ys[valid], rgb, alpha[valid]))
+    return layers
+
+
+def paint_edge_overlay(overlay, origin, down_tiles, up_tiles, edge_color, seed):
+    """Dibuja el musgo en overlay (SRCALPHA, ya transparente).
+    origin: (x, y) del overlay en píxeles del nivel.
+    down_tiles/up_tiles: listas de (row, col) con la cara inferior/superior expuesta."""
+    ts = TILE_SIZE
+    color = tuple(edge_color[:3])
+    w, h = overlay.get_size()
+    rgb_view = pygame.surfarray.pixels3d(overlay)
+    alpha_view = pygame.surfarray.pixels_alpha(overlay)
+
+    # Stalactitas cuelgan bajo el tile; stalagmitas crecen sobre él
+    faces = ((down_tiles, 100, ts, 1, MOSS_MAX_DOWN, 12),
+             (up_tiles, 200, -1, -1, MOSS_MAX_UP, 14))
+    for tiles, stream, anchor_off, sign, max_h, fade in faces:
+        if not tiles:
+            continue
+        rows, cols = zip(*tiles)
+        rnd = _TileRandom(seed, rows, cols)
+        px = np.asarray(cols, dtype=np.int64) * ts - origin[0]
+        py = np.asarray(rows, dtype=np.int64) * ts - origin[1]
+        for xs, ys, rgb, alpha in _moss_pixels(rnd, stream, px, py + anchor_off,
+                                               sign, max_h, fade, color):
+            inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+            rgb_view[xs[inside], ys[inside]] = rgb[inside]
+            alpha_view[xs[inside], ys[inside]] = alpha[inside]
+    del rgb_view, alpha_view
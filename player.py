@@ -1,8 +1,12 @@
 # H.E.R.O. Remake - Player Class
 
+import math
 import pygame
 from constants import *
 from evgamelib.entity import PhysicsEntity
+from tilegrid import as_grid
+from level_masks import level_masks, mask_extents
+from sprite_atlas import PLAIN_MODE
 
 class Player(PhysicsEntity):
     def __init__(self):
@@ -24,32 +28,29 @@ class Player(PhysicsEntity):
         self.propeller_timer = 0.0
         self.propeller_frame = 0
         self._prop_bodies = {}       # sprite_key -> Surface (cuerpo sin palas)
-        self._prop_bodies_flip = {}  # sprite_key -> Surface (cuerpo flippeado)
         self._prop_frames = {}       # sprite_key -> [frame0, frame1, frame2, frame3]
-        self._prop_frames_flip = {}  # sprite_key -> [frame0_flip, ...]
         # Mask para colisión pixel-perfect con tiles
-        self._tile_mask = pygame.mask.Mask((TILE_SIZE, TILE_SIZE), fill=True)
         self._current_mask = None    # Se actualiza cada frame
+        self._subpixel_masks = {}    # (id(mask), fx, fy) -> mask ensanchada 1px
         self._masks_ref = None       # Referencia al dict de masks del Game
         self._touched_lava = False   # Flag: check_collision detectó contacto con lava
 
     def init(self, level_map):
         """Initialize player position from map"""
-        for row_index, row in enumerate(level_map):
-            for col_index, tile in enumerate(row):
-                if tile == "S":
-                    self.x = col_index * TILE_SIZE
-                    self.y = row_index * TILE_SIZE
-                    self.vel_x = 0
-                    self.vel_y = 0
-                    return
+        for row_index, col_index, _ in as_grid(level_map).find("S"):
+            self.x = col_index * TILE_SIZE
+            self.y = row_index * TILE_SIZE
+            self.vel_x = 0
+            self.vel_y = 0
+            return
         # Default
         self.x = TILE_SIZE * 2
         self.y = TILE_SIZE * 2
 
     def update(self, dt, keys, joy_axis_x, joy_axis_y, level_map, game):
         """Update player with CORRECT HERO physics"""
-        level_h = len(level_map) if level_map else DEFAULT_LEVEL_HEIGHT
+        level_map = as_grid(level_map)
+        level_h = level_map.height if level_map.height else DEFAULT_LEVEL_HEIGHT
 
         # Actualizar mask de colisión pixel-perfect (antes de cualquier check_collision)
         if self._masks_ref:
@@ -76,21 +77,8 @@ class Player(PhysicsEntity):
             move_x = joy_axis_x  # Valor entre DEAD_ZONE y 1.0
             self.facing_right = True
 
-        self.vel_x = move_x * PLAYER_SPEED_X
-
-        # Check if grounded (standing on something)
-        self.is_grounded = self.check_collision(self.x, self.y + 2, level_map)
-
-        # GRAVITY - only apply if not grounded or using propulsor
-        if not self.is_grounded or self.vel_y < 0:
-            self.vel_y += GRAVITY * dt
-        else:
-            # Grounded and not jumping - zero velocity to prevent accumulation
-            self.vel_y = 0
-
-        # Propulsor - con warmup: arranca en hover y sube a potencia completa
-        # Solo funciona si hay energia
-        self.using_propulsor = False
+        # Propulsor: intensidad 0..1 (None = sin energía, no funciona)
+        propulsor_input = None
         if game.energy > 0:
             propulsor_input = 0  # 0 = no input, >0 = intensidad (0..1)
             if keys[pygame.K_UP]:
@@ -98,84 +86,34 @@ class Player(PhysicsEntity):
             elif joy_axis_y < -DEAD_ZONE:
                 propulsor_input = abs(joy_axis_y)  # 0.15 a 1.0
 
-            if propulsor_input > 0:
-                self.using_propulsor = True
-                self.propulsor_active_time += dt
-                # Propulsor siempre empuja a potencia completa
-                self.vel_y -= PROPULSOR_POWER * propulsor_input * dt
-                # Pero limitamos cuanto puede subir segun el warmup
-                warmup_t = min(self.propulsor_active_time / PROPULSOR_WARMUP_TIME, 1.0)
-                max_ascent = PROPULSOR_MAX_ASCENT_INITIAL + (PROPULSOR_MAX_ASCENT_FULL - PROPULSOR_MAX_ASCENT_INITIAL) * warmup_t
-                # Clampar velocidad de ascenso (vel_y negativo = subiendo)
-                if self.vel_y < -max_ascent:
-                    self.vel_y = -max_ascent
-            else:
-                # Reset warmup cuando suelta el propulsor
-                self.propulsor_active_time = 0
-
         # Descenso activo - helice invertida para bajar mas rapido
+        dive_input = 0
         if keys[pygame.K_DOWN]:
-            self.vel_y += DIVE_POWER * dt
+            dive_input = 1.0
         elif joy_axis_y > DEAD_ZONE:
-            intensity = abs(joy_axis_y)
-            self.vel_y += DIVE_POWER * intensity * dt
-
-        # Limit fall speed
-        if self.vel_y > MAX_FALL_SPEED:
-            self.vel_y = MAX_FALL_SPEED
-
-        # Apply velocities
-        new_x = self.x + self.vel_x * dt
-        new_y = self.y + self.vel_y * dt
-
-        # Check horizontal collision con búsqueda binaria sub-pixel
-        if not self.check_collision(new_x, self.y, level_map):
-            self.x = new_x
-        else:
-            # Búsqueda binaria: self.x es válido, new_x colisiona
-            # Encontrar la posición más cercana a new_x sin colisión
-            valid = self.x
-            invalid = new_x
-            for _ in range(10):  # ~0.01px de precisión
-                mid = (valid + invalid) * 0.5
-                if self.check_collision(mid, self.y, level_map):
-                    invalid = mid
-                else:
-                    valid = mid
-            self.x = valid
-            self.vel_x = 0
-
-        # Check vertical collision con búsqueda binaria sub-pixel
-        if not self.check_collision(self.x, new_y, level_map):
-            self.y = new_y
-        else:
-            # Búsqueda binaria: self.y es válido, new_y colisiona
-            valid = self.y
-            invalid = new_y
-            for _ in range(10):
-                mid = (valid + invalid) * 0.5
-                if self.check_collision(self.x, mid, level_map):
-                    invalid = mid
-                else:
-                    valid = mid
-            self.y = valid
-            self.vel_y = 0
+            dive_input = abs(joy_axis_y)
 
-        # Keep in level bounds (ancho por banda, alto total)
-        current_band_w = band_width(level_map, int(self.y / TILE_SIZE))
-        self.x = max(0, min(self.x, current_band_w * TILE_SIZE - self.width))
-        self.y = max(0, min(self.y, level_h * TILE_SIZE - self.height))
+        # Un paso de física por paso de simulación (dt es siempre SIM_DT, ver
+        # sim_clock). El barrido es exacto, así que un dt grande tampoco atraviesa tiles.
+        self.using_propulsor = False
+        self._physics_step(dt, move_x, propulsor_input, dive_input, level_map, level_h)
 
-        # Seguridad: si la posición actual colisiona (por bounds clamp u otro edge case),
-        # empujar al jugador hacia abajo o arriba hasta encontrar posición libre
+        # Seguridad: si la posición actual colisiona (por bounds
+        # clamp, cambio de frame de animación u otro edge case),
+        # empujar al jugador a la posición libre más cercana: abajo, arriba o,
+        # si el sprite nuevo quedó metido en una pared, a los costados
         if self.check_collision(self.x, self.y, level_map):
+            touched_lava = self._touched_lava  # las pruebas no son contacto
             for nudge in range(1, TILE_SIZE + 1):
-                if not self.check_collision(self.x, self.y + nudge, level_map):
-                    self.y += nudge
-                    break
-                if not self.check_collision(self.x, self.y - nudge, level_map):
-                    self.y -= nudge
-                    break
+                for ox, oy in ((0, nudge), (0, -nudge), (-nudge, 0), (nudge, 0)):
+                    if not self.check_collision(self.x + ox, self.y + oy, level_map):
+                        self.x += ox
+                        self.y += oy
+                        break
+                else:
+                    continue
+                break
+            self._touched_lava = touched_lava
 
         # Energia: se consume siempre, ritmo segun estado
         if self.using_propulsor:
@@ -208,10 +146,119 @@ class Player(PhysicsEntity):
             self.propeller_timer -= 1.0
             self.propeller_frame = (self.propeller_frame + 1) % PROPELLER_NUM_FRAMES
 
+    def _physics_step(self, dt, move_x, propulsor_input, dive_input, level_map, level_h):
+        """Un paso de física: gravedad, propulsor, movimiento con barrido y límites"""
+        # Check if grounded (standing on something)
+        self.is_grounded = self._on_ground(level_map)
+
+        # GRAVITY - only apply if not grounded or using propulsor
+        if not self.is_grounded or self.vel_y < 0:
+            self.vel_y += GRAVITY * dt
+        else:
+            # Grounded and not jumping - zero velocity to prevent accumulation
+            self.vel_y = 0
+
+        # Propulsor - con warmup: arranca en hover y sube a potencia completa
+        # Solo funciona si hay energia
+        if propulsor_input is not None:
+            if propulsor_input > 0:
+                self.using_propulsor = True
+                self.propulsor_active_time += dt
+                # Propulsor siempre empuja a potencia completa
+                self.vel_y -= PROPULSOR_POWER * propulsor_input * dt
+                # Pero limitamos cuanto puede subir segun el warmup
+                warmup_t = min(self.propulsor_active_time / PROPULSOR_WARMUP_TIME, 1.0)
+                max_ascent = PROPULSOR_MAX_ASCENT_INITIAL + (PROPULSOR_MAX_ASCENT_FULL - PROPULSOR_MAX_ASCENT_INITIAL) * warmup_t
+                # Clampar velocidad de ascenso (vel_y negativo = subiendo)
+                if self.vel_y < -max_ascent:
+                    self.vel_y = -max_ascent
+            else:
+                # Reset warmup cuando suelta el propulsor
+                self.propulsor_active_time = 0
+
+        # Descenso activo
+        if dive_input:
+            self.vel_y += DIVE_POWER * dive_input * dt
+
+        # Limit fall speed
+        if self.vel_y > MAX_FALL_SPEED:
+            self.vel_y = MAX_FALL_SPEED
+
+        # Mover cada eje hasta tocar un sólido (si choca, se anula la velocidad)
+        self.vel_x = move_x * PLAYER_SPEED_X
+        dx = self.vel_x * dt
+        moved = self._move_free(dx, 0, level_map)
+        self.x += moved
+        if moved != dx:
+            self.vel_x = 0
+
+        dy = self.vel_y * dt
+        moved = self._move_free(0, dy, level_map)
+        self.y += moved
+        if moved != dy:
+            self.vel_y = 0
+
+        # Keep in level bounds (ancho por banda, alto total)
+        current_band_w = level_map.band_width(int(self.y / TILE_SIZE))
+        self.x = max(0, min(self.x, current_band_w * TILE_SIZE - self.width))
+        self.y = max(0, min(self.y, level_h * TILE_SIZE - self.height))
+
+    def _on_ground(self, level_map):
+        """True si hay un sólido a menos de 2px debajo (pisar lava cuenta como contacto)"""
+        if not self._current_mask:
+            return self.check_collision(self.x, self.y + 2, level_map)
+        moved, lava = level_masks(level_map).sweep_y(mask_extents(self._current_mask),
+                                                     self.x, self.y, 2)
+        if lava:
+            self._touched_lava = True
+        return moved < 2
+
+    def _move_free(self, dx, dy, level_map):
+        """Cuánto se puede mover en un eje (dx o dy, el otro en 0) sin chocar.
+        Con mask: barrido exacto contra los tiles (una consulta, que también
+        detecta el contacto con lava). Sin mask: búsqueda binaria sub-pixel
+        sobre check_collision."""
+        delta = dx or dy
+        if delta == 0:
+            return 0.0
+        if self._current_mask:
+            masks = level_masks(level_map)
+            extents = mask_extents(self._current_mask)
+            if dx:
+                moved, lava = masks.sweep_x(extents, self.x, self.y, dx)
+            else:
+                moved, lava = masks.sweep_y(extents, self.x, self.y, dy)
+            if moved != delta:
+                # El contacto cae en un píxel entero: corregir el error de punto
+                # flotante, sin salirse nunca de [0, delta] (un redondeo en
+                # contra del movimiento metería al jugador en el sólido de atrás)
+                pos = self.x if dx else self.y
+                snapped = round(pos + moved) - pos
+                if abs(snapped - moved) < SWEEP_SNAP_EPSILON:
+                    moved = snapped
+                moved = min(max(moved, 0.0), delta) if delta > 0 else max(min(moved, 0.0), delta)
+                if lava:
+                    self._touched_lava = True
+            return moved
+
+        if not self.check_collision(self.x + dx, self.y + dy, level_map):
+            return delta
+        # Búsqueda binaria: 0 es válido, delta colisiona
+        valid = 0.0
+        invalid = delta
+        for _ in range(10):  # ~0.01px de precisión
+            mid = (valid + invalid) * 0.5
+            if self.check_collision(self.x + (mid if dx else 0), self.y + (mid if dy else 0), level_map):
+                invalid = mid
+            else:
+                valid = mid
+        return valid
+
     def check_collision(self, x, y, level_map):
-        """Check collision pixel-perfect: solo pixeles visibles del sprite contra tiles sólidos"""
-        level_h = len(level_map) if level_map else 0
-        if level_h == 0:
+        """Check collision pixel-perfect: solo pixeles visibles del sprite contra tiles sólidos.
+        Un solo overlap contra la mask sólida del nivel completo (ver level_masks)."""
+        level_map = as_grid(level_map)
+        if level_map.height == 0:
             return False
 
         mask = self._current_mask
@@ -219,36 +266,38 @@ class Player(PhysicsEntity):
             # Fallback a esquinas si no hay mask disponible
             return self._check_collision_corners(x, y, level_map)
 
-        # Tiles que el bounding rect del player podría tocar
-        left_tile = int(x / TILE_SIZE)
-        right_tile = int((x + self.width - 1) / TILE_SIZE)
-        top_tile = int(y / TILE_SIZE)
-        bottom_tile = int((y + self.height - 1) / TILE_SIZE)
-
-        for ty in range(top_tile, bottom_tile + 1):
-            if ty < 0 or ty >= level_h:
-                return True  # Fuera de límites = sólido
-            for tx in range(left_tile, right_tile + 1):
-                if tx < 0 or tx >= len(level_map[ty]):
-                    return True  # Fuera de límites = sólido
-                tile_char = level_map[ty][tx]
-                if tile_char in SOLID_TILES:
-                    # Verificar overlap pixel-perfect entre mask del player y el tile
-                    tile_px = tx * TILE_SIZE
-                    tile_py = ty * TILE_SIZE
-                    ox = int(x - tile_px)
-                    oy = int(y - tile_py)
-                    if mask.overlap(self._tile_mask, (-ox, -oy)):
-                        # Si es lava o roca lava, marcar contacto para que el game mate al héroe
-                        if tile_char in ('X', 'W'):
-                            self._touched_lava = True
-                        return True
-
-        return False
+        masks = level_masks(level_map)
+        px = math.floor(x)
+        py = math.floor(y)
+        mask = self._subpixel_mask(mask, x != px, y != py)
+        if not masks.hits_solid(mask, px, py):
+            return False
+        # Si toca lava o roca lava, marcar contacto para que el game mate al héroe
+        if masks.hits_lava(mask, px, py):
+            self._touched_lava = True
+        return True
+
+    def _subpixel_mask(self, mask, frac_x, frac_y):
+        """Con posición fraccionaria el sprite cubre en parte una columna/fila más:
+        se usa la mask ensanchada 1px (unión de las posiciones floor y ceil)."""
+        if not (frac_x or frac_y):
+            return mask
+        key = (id(mask), frac_x, frac_y)
+        wide = self._subpixel_masks.get(key)
+        if wide is None:
+            w, h = mask.get_size()
+            wide = pygame.mask.Mask((w + frac_x, h + frac_y))
+            wide.draw(mask, (0, 0))
+            wide.draw(mask, (int(frac_x), int(frac_y)))
+            if frac_x and frac_y:
+                wide.draw(mask, (1, 0))
+                wide.draw(mask, (0, 1))
+            self._subpixel_masks[key] = wide
+        return wide
 
     def _check_collision_corners(self, x, y, level_map):
         """Fallback: colisión por esquinas cuando no hay mask disponible"""
-        level_h = len(level_map) if level_map else 0
+        level_map = as_grid(level_map)
         corners = [
             (x + PLAYER_FOOT_INSET, y + 2),
             (x + self.width - PLAYER_FOOT_INSET - 1, y + 2),
@@ -258,11 +307,7 @@ class Player(PhysicsEntity):
         for corner_x, corner_y in corners:
             tile_x = int(corner_x / TILE_SIZE)
             tile_y = int(corner_y / TILE_SIZE)
-            if tile_y < 0 or tile_y >= level_h:
-                return True
-            if tile_x < 0 or tile_x >= len(level_map[tile_y]):
-                return True
-            if level_map[tile_y][tile_x] in SOLID_TILES:
+            if level_map.is_solid(tile_y, tile_x):
                 return True
         return False
 
@@ -284,7 +329,8 @@ class Player(PhysicsEntity):
             return masks.get(key + '_flip')
         return masks.get(key)
 
-    def draw(self, screen, camera_x, camera_y):
+    def draw(self, screen, camera_x, camera_y, mode=PLAIN_MODE):
+        """mode: RenderMode con las variantes (espejado/gris) de los sprites"""
         screen_x = self.x - camera_x
         screen_y = self.y - camera_y
         if self.image:
@@ -300,14 +346,12 @@ class Player(PhysicsEntity):
 
             pos = (int(screen_x), int(screen_y))
 
-            # Composición cuerpo + hélice animada (2 blits, sin transforms en runtime)
+            # Composición cuerpo + hélice animada (2 blits, sin transforms en runtime;
+            # el sprite base mira a la izquierda)
             if sprite_key in self._prop_bodies:
-                if self.facing_right:
-                    screen.blit(self._prop_bodies_flip[sprite_key], pos)
-                    screen.blit(self._prop_frames_flip[sprite_key][self.propeller_frame], pos)
-                else:
-                    screen.blit(self._prop_bodies[sprite_key], pos)
-                    screen.blit(self._prop_frames[sprite_key][self.propeller_frame], pos)
+                blade = self._prop_frames[sprite_key][self.propeller_frame]
+                screen.blit(mode.sprite(self._prop_bodies[sprite_key], self.facing_right), pos)
+                screen.blit(mode.sprite(blade, self.facing_right), pos)
             else:
                 # Fallback: sprite original sin animación de hélice
                 if sprite_key == 'player_shooting':
@@ -318,9 +362,7 @@ class Player(PhysicsEntity):
                     base_img = self.walk_frames[self.walk_frame_index]
                 else:
                     base_img = self.image
-                if self.facing_right:
-                    base_img = pygame.transform.flip(base_img, True, False)
-                screen.blit(base_img, pos)
+                screen.blit(mode.sprite(base_img, self.facing_right), pos)
         else:
             # Draw simple helicopter
             pygame.draw.rect(screen, COLOR_BLUE,
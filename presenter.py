@@ -0,0 +1,194 @@
+# H.E.R.O. Remake - Presentación por rectángulos sucios
+# El frame se describe como planos: una superficie fuente y el área que cubre
+# en screen (768x464). En juego son dos planos, game_surface (512x256) para la
+# zona de juego y la franja del HUD de screen; en el splash, el ingreso de
+# nombre o con overlays encima es un solo plano, screen entero. Cada plano se
+# escala una sola vez, directo a su rect final del display, sobre subsuperficies
+# del display preparadas al cambiar el layout (sin superficies intermedias ni
+# allocs por frame). Con escala 1:1 es un blit.
+#
+# Además el Presenter compara cada plano con el frame anterior por bloques:
+# solo se escalan los planos que cambiaron y solo se actualizan
+# (display.update) los rectángulos que cambiaron. El plano se escala entero
+# aunque cambie un bloque: con escala no entera, escalar un recorte muestrea
+# distinto que escalar el plano completo y dejaría costuras. Si cambia la mayor
+# parte del frame (o se invalida, ej. al pasar a pantalla completa) se hace el
+# camino completo: escalar todos los planos y flip.
+
+import math
+
+import numpy as np
+import pygame
+from constants import (COLOR_BLACK, SCREEN_WIDTH, SCREEN_HEIGHT,
+                       PRESENT_BLOCK_W, PRESENT_BLOCK_H, PRESENT_FULL_RATIO)
+
+
+def _scale_into(source, target):
+    """Escala source al tamaño de target (superficie ya creada) en una pasada"""
+    if source.get_size() == target.get_size():
+        target.blit(source, (0, 0))
+    else:
+        pygame.transform.scale(source, target.get_size(), target)
+
+
+class Presenter:
+    """Lleva los planos del frame al display actualizando solo los bloques que cambiaron"""
+
+    def __init__(self, block_w=PRESENT_BLOCK_W, block_h=PRESENT_BLOCK_H, full_ratio=PRESENT_FULL_RATIO,
+                 frame_size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        self.block_w = block_w
+        self.block_h = block_h
+        self.full_ratio = full_ratio
+        self.frame_w, self.frame_h = frame_size
+        self._layout = None         # (display, dest, planes) del último frame presentado
+        self._targets = []          # por plano: rect del display y su subsuperficie
+        self._prev = []             # por plano: píxeles del último frame presentado
+        self._marked = []           # rects (coords de screen) marcados a mano
+
+    def invalidate(self):
+        """El próximo present() escala todo y hace flip (cambio de modo, expose)"""
+        self._layout = None
+
+    def mark(self, rect):
+        """Marca un rect de screen como cambiado aunque los píxeles coincidan"""
+        self._marked.append(pygame.Rect(rect))
+
+    def dirty_rects(self, pixels, prev):
+        """Rects (coords de la fuente) de los bloques que difieren de prev"""
+        width, height = pixels.shape
+        bw, bh = self.block_w, self.block_h
+        nx = -(-width // bw)
+        ny = -(-height // bh)
+        changed = pixels != prev
+        if changed.shape != (nx * bw, ny * bh):
+            padded = np.zeros((nx * bw, ny * bh), dtype=bool)
+            padded[:width, :height] = changed
+            changed = padded
+        # La vista de surfarray es (x, y) sobre filas de memoria: reducir en (y, x)
+        blocks = changed.T.reshape(ny, bh, nx, bw).any(axis=(1, 3)).T
+
+        # Corridas horizontales de bloques; las iguales en filas seguidas se unen
+        rects = []
+        open_runs = {}  # (col inicial, col final) -> Rect en crecimiento
+        for by in range(ny):
+            row = blocks[:, by]
+            runs = {}
+            bx = 0
+            while bx < nx:
+                if not row[bx]:
+                    bx += 1
+                    continue
+                start = bx
+                while bx < nx and row[bx]:
+                    bx += 1
+                run = (start, bx)
+                rect = open_runs.get(run)
+                if rect is not None:
+                    rect.h += bh
+                else:
+                    rect = pygame.Rect(start * bw, by * bh, (bx - start) * bw, bh)
+                    rects.append(rect)
+                runs[run] = rect
+            open_runs = runs
+        bounds = pygame.Rect(0, 0, width, height)
+        return [rect.clip(bounds) for rect in rects]
+
+    def _to_display(self, dest, area):
+        """Rect del display que ocupa un área de screen. Bordes mapeados con
+        floor: áreas vecinas se tocan sin huecos ni solapes"""
+        sx = dest.w / self.frame_w
+        sy = dest.h / self.frame_h
+        left = dest.x + int(area.left * sx)
+        top = dest.y + int(area.top * sy)
+        return pygame.Rect(left, top, dest.x + int(area.right * sx) - left,
+                           dest.y + int(area.bottom * sy) - top)
+
+    def _set_layout(self, display, dest, planes):
+        self._targets = []
+        bounds = display.get_rect()
+        for source, area in planes:
+            target = self._to_display(dest, area).clip(bounds)
+            surface = display.subsurface(target) if target.w > 0 and target.h > 0 else None
+            self._targets.append((target, surface))
+        self._prev = [None] * len(planes)
+
+    def _marked_in(self, source, area):
+        """Rects marcados que tocan el área del plano, en coords de la fuente"""
+        sw, sh = source.get_size()
+        fx = sw / area.w
+        fy = sh / area.h
+        rects = []
+        for rect in self._marked:
+            rect = rect.clip(area)
+            if rect.w <= 0 or rect.h <= 0:
+                continue
+            left = int((rect.left - area.x) * fx)
+            top = int((rect.top - area.y) * fy)
+            right = math.ceil((rect.right - area.x) * fx)
+            bottom = math.ceil((rect.bottom - area.y) * fy)
+            rects.append(pygame.Rect(left, top, right - left, bottom - top).clip(source.get_rect()))
+        return rects
+
+    def present(self, display, dest, planes):
+        """Escala los planos [(superficie, área de screen)] al rect dest del
+        display y los muestra. Retorna la lista de rects actualizados del
+        display (o [dest] si fue completo)."""
+        if display is None:
+            return []
+        dest = pygame.Rect(dest)
+        planes = [(source, pygame.Rect(area)) for source, area in planes]
+        layout = (display, tuple(dest), [(source.get_size(), tuple(area)) for source, area in planes])
+        new_layout = layout != self._layout
+        if new_layout:
+            self._set_layout(display, dest, planes)
+            self._layout = layout
+
+        full = new_layout
+        dirty = []      # por plano: rects sucios en coords de la fuente
+        area_changed = 0
+        for i, (source, area) in enumerate(planes):
+            # Vista directa a los píxeles (sin copia); se suelta antes de escalar
+            pixels = pygame.surfarray.pixels2d(source)
+            prev = self._prev[i]
+            rects = [] if full else self.dirty_rects(pixels, prev)
+            if prev is None or prev.shape != pixels.shape:
+                self._prev[i] = pixels.copy(order='K')  # mismo layout que la vista
+            else:
+                np.copyto(prev, pixels)
+            del pixels
+            rects.extend(self._marked_in(source, area))
+            dirty.append(rects)
+            scale = (area.w * area.h) / (source.get_width() * source.get_height())
+            area_changed += scale * sum(rect.w * rect.h for rect in rects)
+        self._marked = []
+
+        if not full:
+            full = area_changed > self.full_ratio * self.frame_w * self.frame_h
+        if full:
+            if new_layout:
+                display.fill(COLOR_BLACK)
+            for (source, _), (_, surface) in zip(planes, self._targets):
+                if surface:
+                    _scale_into(source, surface)
+            pygame.display.flip()
+            return [dest]
+
+        updated = []
+        for (source, _), (target, surface), rects in zip(planes, self._targets, dirty):
+            if not surface or not rects:
+                continue
+            _scale_into(source, surface)
+            sx = target.w / source.get_width()
+            sy = target.h / source.get_height()
+            for rect in rects:
+                # Un píxel de margen: transform.scale redondea el muestreo a su modo
+                left = target.x + int(rect.left * sx) - 1
+                top = target.y + int(rect.top * sy) - 1
+                right = target.x + math.ceil(rect.right * sx) + 1
+                bottom = target.y + math.ceil(rect.bottom * sy) + 1
+                part = pygame.Rect(left, top, right - left, bottom - top).clip(target)
+                if part.w > 0 and part.h > 0:
+                    updated.append(part)
+        if updated:
+            pygame.display.update(updated)
+        return updated
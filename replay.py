@@ -0,0 +1,212 @@
+# H.E.R.O. Remake - Grabación y replay determinista
+# Una sesión se graba como el input de cada frame (teclas de movimiento, ejes
+# del joystick y los eventos que el juego procesa) más la cantidad de pasos de
+# simulación de ese frame y un checksum del estado después de simularlos.
+# Toda la aleatoriedad sale de streams sembrados desde la semilla de la sesión
+# (ver stream_seed), que va en el encabezado del archivo. Al reproducir, el
+# checksum de cada frame se compara contra el grabado y la primera divergencia
+# se reporta en el acto. El replay puede correr a cualquier velocidad, o sin
+# límite, con o sin dibujar.
+#
+# Formato (gzip): encabezado "HREP" + versión + semilla de sesión + nivel
+# inicial, y después un registro por frame:
+#   pasos (u8), teclas (u8, bits), eje X, eje Y (float32), checksum (u32),
+#   cantidad de eventos (u8) y cada evento como (tipo u8, código u16, unicode u16)
+
+import gzip
+import struct
+import time
+import zlib
+
+import pygame
+from constants import SIM_DT
+from headless import HeldKeys
+
+REPLAY_MAGIC = b'HREP'
+REPLAY_VERSION = 1
+
+_HEADER = struct.Struct('<4sBQi')       # magic, versión, semilla de sesión, nivel inicial (-1 = splash)
+_FRAME = struct.Struct('<BBffIB')       # pasos, teclas, eje X, eje Y, checksum, eventos
+_EVENT = struct.Struct('<BHH')          # tipo, tecla/botón, unicode
+_F32 = struct.Struct('<f')
+
+# Teclas mantenidas que la simulación lee (Player.update), un bit cada una
+KEY_BITS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+
+# Eventos que procesa Game.handle_events (el resto no cambia la simulación)
+EVENT_QUIT = 0
+EVENT_KEYDOWN = 1
+EVENT_JOYBUTTONDOWN = 2
+
+
+class ReplayDivergence(Exception):
+    """El estado reproducido no coincide con el grabado"""
+
+    def __init__(self, frame, expected, actual):
+        super().__init__(f"Replay divergió en el frame {frame}: "
+                         f"checksum {actual:08x}, grabado {expected:08x}")
+        self.frame = frame
+        self.expected = expected
+        self.actual = actual
+
+
+def stream_seed(seed, *parts):
+    """Semilla derivada para un stream de aleatoriedad (ej. ('enemies', nivel)).
+    Estable entre procesos y corridas (no depende del hash de Python)."""
+    key = ":".join(str(part) for part in (seed,) + parts)
+    return zlib.crc32(key.encode('utf-8'))
+
+
+def _float32(value):
+    """El valor tal como queda guardado en el archivo"""
+    return _F32.unpack(_F32.pack(value))[0]
+
+
+def state_checksum(game):
+    """CRC32 del estado de simulación: jugador, partida y entidades"""
+    values = [game.score, game.lives, game.energy, game.dynamite_count, game.level_num]
+    player = game.player
+    if player:
+        values += (player.x, player.y, player.vel_x, player.vel_y)
+    for enemy in game.enemies:
+        values += (enemy.x, enemy.y, enemy.active)
+    for laser in game.lasers:
+        values += (laser.x, laser.y)
+    for dynamite in game.dynamites:
+        values += (dynamite.x, dynamite.y, dynamite.active)
+    crc = zlib.crc32(str(game.state).encode('utf-8'))
+    return zlib.crc32(struct.pack(f'<{len(values)}d', *values), crc)
+
+
+class InputSample:
+    """Input de un frame: teclas mantenidas, ejes del joystick y eventos"""
+
+    def __init__(self, keys, joy_x, joy_y, events):
+        self.keys = keys
+        self.joy_x = joy_x
+        self.joy_y = joy_y
+        self.events = events
+
+
+def _encode_event(event):
+    """(tipo, código, unicode) de un evento que afecta la simulación, o None"""
+    if event.type == pygame.QUIT:
+        return (EVENT_QUIT, 0, 0)
+    if event.type == pygame.KEYDOWN:
+        if event.key == pygame.K_F11:
+            return None  # pantalla completa: no toca la simulación
+        char = getattr(event, 'unicode', '') or ''
+        return (EVENT_KEYDOWN, event.key & 0xFFFF, ord(char[0]) & 0xFFFF if char else 0)
+    if event.type == pygame.JOYBUTTONDOWN:
+        return (EVENT_JOYBUTTONDOWN, event.button, 0)
+    return None
+
+
+def _decode_event(kind, code, char):
+    if kind == EVENT_QUIT:
+        return pygame.event.Event(pygame.QUIT)
+    if kind == EVENT_KEYDOWN:
+        return pygame.event.Event(pygame.KEYDOWN, key=code, mod=0, scancode=0,
+                                  unicode=chr(char) if char else '')
+    return pygame.event.Event(pygame.JOYBUTTONDOWN, button=code, joy=0, instance_id=0)
+
+
+class ReplayWriter:
+    """Graba los frames de una sesión. capture() normaliza el input del frame
+    (el juego usa exactamente lo que queda en el archivo) y end_frame() cierra
+    el registro con los pasos simulados y el checksum resultante."""
+
+    def __init__(self, path, session_seed, start_level=-1):
+        self._file = gzip.open(path, 'wb')
+        self._file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, session_seed, start_level))
+        self._pending = None
+        self.frames = 0
+
+    def capture(self, sample):
+        held = 0
+        for bit, key in enumerate(KEY_BITS):
+            if sample.keys[key]:
+                held |= 1 << bit
+        joy_x = _float32(sample.joy_x)
+        joy_y = _float32(sample.joy_y)
+        events = [code for code in map(_encode_event, sample.events) if code is not None]
+        self._pending = (held, joy_x, joy_y, events)
+        return InputSample(_keys_from_bits(held), joy_x, joy_y, sample.events)
+
+    def end_frame(self, steps, checksum):
+        held, joy_x, joy_y, events = self._pending or (0, 0.0, 0.0, [])
+        self._pending = None
+        parts = [_FRAME.pack(steps, held, joy_x, joy_y, checksum, len(events))]
+        parts.extend(_EVENT.pack(*event) for event in events)
+        self._file.write(b''.join(parts))
+        self.frames += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def _keys_from_bits(held):
+    return HeldKeys(key for bit, key in enumerate(KEY_BITS) if held & (1 << bit))
+
+
+class ReplayReader:
+    """Lee un archivo de replay: encabezado y frames (steps, InputSample, checksum)"""
+
+    def __init__(self, path):
+        with gzip.open(path, 'rb') as f:
+            self._data = f.read()
+        magic, version, self.session_seed, self.start_level = _HEADER.unpack_from(self._data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path}: no es un replay compatible")
+
+    def __iter__(self):
+        data = self._data
+        pos = _HEADER.size
+        while pos < len(data):
+            steps, held, joy_x, joy_y, checksum, count = _FRAME.unpack_from(data, pos)
+            pos += _FRAME.size
+            events = []
+            for _ in range(count):
+                events.append(_decode_event(*_EVENT.unpack_from(data, pos)))
+                pos += _EVENT.size
+            yield steps, InputSample(_keys_from_bits(held), joy_x, joy_y, events), checksum
+
+
+def play_replay(game, reader, speed=1.0, render=True):
+    """Reproduce reader sobre game (ya inicializado). speed: 1.0 = tiempo real,
+    0 = sin límite. Levanta ReplayDivergence en el primer frame que no coincide.
+    Retorna la cantidad de frames reproducidos."""
+    game.session_seed = reader.session_seed
+    game.games_started = 0
+    game.persist_scores = False  # el replay no escribe en la tabla de records
+    if reader.start_level >= 0:
+        game.start_new_game(reader.start_level)
+
+    start = time.perf_counter()
+    sim_time = 0.0
+    frames = 0
+    for steps, sample, expected in reader:
+        if not game.handle_events(sample):
+            break
+        for _ in range(steps):
+            game.step(SIM_DT)
+        actual = state_checksum(game)
+        if actual != expected:
+            raise ReplayDivergence(frames, expected, actual)
+        frames += 1
+
+        if speed > 0:
+            # Esperar a que el reloj real alcance al tiempo simulado / speed
+            sim_time += steps * SIM_DT
+            wait = start + sim_time / speed - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        if render:
+            # Los eventos reales no se usan; solo se atiende cerrar la ventana
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            game.update_music()
+            game.render_frame()
+    return frames
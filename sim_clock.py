@@ -0,0 +1,65 @@
+# H.E.R.O. Remake - Reloj de simulación a paso fijo
+# La simulación avanza siempre en pasos de SIM_DT (60 Hz) con un acumulador
+# de tiempo; el render corre a la tasa del display e interpola las posiciones
+# de las entidades entre los dos últimos pasos. Así el juego es determinista
+# sin importar los FPS, y la simulación puede correr sin dibujar (o más rápido
+# que el tiempo real).
+
+from contextlib import contextmanager
+
+
+class FixedStepClock:
+    """Acumulador de tiempo para pasos fijos de step_dt segundos"""
+
+    def __init__(self, step_dt, max_steps):
+        self.step_dt = step_dt
+        self.max_steps = max_steps    # tope de pasos de recuperación por frame
+        self.accumulator = 0.0
+
+    def advance(self, frame_dt):
+        """Suma el tiempo del frame y retorna cuántos pasos fijos simular.
+        Si se acumula más de max_steps pasos (frame muy lento) el atraso se
+        descarta en lugar de intentar recuperarlo."""
+        self.accumulator += frame_dt
+        steps = int(self.accumulator / self.step_dt)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = self.step_dt * steps
+        self.accumulator -= self.step_dt * steps
+        return steps
+
+    @property
+    def alpha(self):
+        """Fracción del paso siguiente ya transcurrida (0..1), para interpolar"""
+        return min(1.0, self.accumulator / self.step_dt)
+
+    def reset(self):
+        self.accumulator = 0.0
+
+
+def snapshot_positions(entities):
+    """Guarda la posición de cada entidad antes de un paso (para interpolar)"""
+    for entity in entities:
+        entity.prev_pos = (entity.x, entity.y)
+
+
+@contextmanager
+def interpolated(entities, alpha):
+    """Ubica las entidades entre su posición anterior y la actual mientras se
+    dibujan, y restaura la posición simulada al salir. Las entidades sin
+    posición anterior (recién creadas) se dibujan donde están."""
+    saved = []
+    for entity in entities:
+        prev = getattr(entity, 'prev_pos', None)
+        if prev is None:
+            continue
+        x, y = entity.x, entity.y
+        saved.append((entity, x, y))
+        entity.x = prev[0] + (x - prev[0]) * alpha
+        entity.y = prev[1] + (y - prev[1]) * alpha
+    try:
+        yield
+    finally:
+        for entity, x, y in saved:
+            entity.x = x
+            entity.y = y
@@ -0,0 +1,69 @@
+# H.E.R.O. Remake - Banco de animación de víboras
+# La víbora solo tiene TILE_SIZE + 1 formas posibles (extensión 0..32 px) por
+# orientación. El banco arma una vez el compuesto cuello escalado + cabeza y
+# la mask de hitbox de cada extensión, así dibujar y colisionar una víbora son
+# búsquedas en lugar de escalar sprites y crear masks en cada frame.
+
+import pygame
+from constants import TILE_SIZE, SNAKE_BODY_H
+
+FACING_LEFT = -1
+FACING_RIGHT = 1
+
+
+class SnakeBank:
+    """Compuestos y masks precalculados para cada extensión y orientación.
+    head es el sprite de la cabeza mirando a la izquierda (se flipea para la
+    derecha); head y neck pueden ser None si no se cargaron."""
+
+    def __init__(self, head, neck):
+        heads = {
+            FACING_LEFT: head,
+            FACING_RIGHT: pygame.transform.flip(head, True, False) if head else None,
+        }
+        # (orientación, ext) -> (superficie o None, dx, dy) relativo a la esquina de la pared
+        self._frames = {}
+        for facing, head_sprite in heads.items():
+            for ext in range(TILE_SIZE + 1):
+                self._frames[(facing, ext)] = self._compose(facing, ext, head_sprite, neck)
+
+        # Hitbox = rect visible del cuerpo (ext x SNAKE_BODY_H), igual en ambas orientaciones
+        self._masks = [None] + [pygame.mask.Mask((ext, SNAKE_BODY_H), fill=True)
+                                for ext in range(1, TILE_SIZE + 1)]
+
+    @staticmethod
+    def _compose(facing, ext, head, neck):
+        """Cuello escalado a ext + cabeza en la punta, en una sola superficie"""
+        if ext <= 0:
+            return (None, 0, 0)
+        # Piezas en coordenadas relativas a la esquina superior izquierda de la pared
+        parts = []
+        body_oy = (TILE_SIZE - SNAKE_BODY_H) // 2
+        neck_x = -ext if facing == FACING_LEFT else TILE_SIZE
+        if neck:
+            parts.append((pygame.transform.scale(neck, (ext, SNAKE_BODY_H)), neck_x, body_oy))
+        if head:
+            head_w, head_h = head.get_size()
+            head_x = -ext if facing == FACING_LEFT else TILE_SIZE + ext - head_w
+            parts.append((head, head_x, (TILE_SIZE - head_h) // 2))
+        if not parts:
+            return (None, 0, 0)
+
+        left = min(x for _, x, _ in parts)
+        top = min(y for _, _, y in parts)
+        right = max(x + surf.get_width() for surf, x, _ in parts)
+        bottom = max(y + surf.get_height() for surf, _, y in parts)
+        composite = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
+        for surf, x, y in parts:
+            composite.blit(surf, (x - left, y - top))
+        return (composite, left, top)
+
+    def frame(self, facing, ext):
+        """(superficie, dx, dy) de la víbora con extensión ext; superficie None si no se ve"""
+        ext = max(0, min(int(ext), TILE_SIZE))
+        return self._frames[(facing, ext)]
+
+    def hitbox_mask(self, ext):
+        """Mask llena del rect visible del cuerpo (ext x SNAKE_BODY_H), o None si ext <= 0"""
+        ext = max(0, min(int(ext), TILE_SIZE))
+        return self._masks[ext]
@@ -0,0 +1,97 @@
+# H.E.R.O. Remake - Índice espacial de entidades
+# Las entidades quedan encerradas en el viewport donde aparecen
+# (get_viewport_bounds), así que el índice se agrupa por viewport
+# (vp_col, vp_row) y, dentro de cada uno, en celdas más chicas. Las pasadas de
+# colisión consultan solo las entidades que comparten celda con el rect dado,
+# en lugar de recorrer todas las del nivel.
+
+import pygame
+from constants import GAME_WIDTH, GAME_VIEWPORT_HEIGHT, SPATIAL_CELL_W, SPATIAL_CELL_H
+
+# Celdas por viewport en cada eje (las celdas dividen exacto al viewport)
+_CELLS_X = GAME_WIDTH // SPATIAL_CELL_W
+_CELLS_Y = GAME_VIEWPORT_HEIGHT // SPATIAL_CELL_H
+
+
+def _cell_keys(rect):
+    """Claves (vp_col, vp_row, sub_col, sub_row) de las celdas que toca rect"""
+    right = rect.x + max(rect.width, 1) - 1
+    bottom = rect.y + max(rect.height, 1) - 1
+    keys = []
+    for cy in range(rect.y // SPATIAL_CELL_H, bottom // SPATIAL_CELL_H + 1):
+        vp_row, sub_row = divmod(cy, _CELLS_Y)
+        for cx in range(rect.x // SPATIAL_CELL_W, right // SPATIAL_CELL_W + 1):
+            vp_col, sub_col = divmod(cx, _CELLS_X)
+            keys.append((vp_col, vp_row, sub_col, sub_row))
+    return tuple(keys)
+
+
+class SpatialIndex:
+    """Entidades agrupadas por viewport y celda. bounds_fn(entidad) retorna el
+    pygame.Rect que la contiene (por defecto entity.get_rect())."""
+
+    def __init__(self, bounds_fn=None):
+        self._bounds_fn = bounds_fn or (lambda entity: entity.get_rect())
+        # Por id(): las entidades no tienen por qué ser hashables
+        self._cells = {}    # clave de celda -> {id: (orden, entidad)}
+        self._entries = {}  # id -> (orden, claves de celda)
+        self._next_order = 0
+
+    def __contains__(self, entity):
+        return id(entity) in self._entries
+
+    def insert(self, entity):
+        """Registra la entidad (al aparecer)"""
+        if id(entity) in self._entries:
+            self.move(entity)
+            return
+        order = self._next_order
+        self._next_order += 1
+        self._link(entity, order, _cell_keys(self._bounds_fn(entity)))
+
+    def move(self, entity):
+        """Actualiza las celdas de la entidad después de moverse"""
+        entry = self._entries.get(id(entity))
+        if entry is None:
+            self.insert(entity)
+            return
+        order, old_keys = entry
+        keys = _cell_keys(self._bounds_fn(entity))
+        if keys == old_keys:
+            return
+        self._unlink(entity, old_keys)
+        self._link(entity, order, keys)
+
+    def remove(self, entity):
+        """Saca la entidad del índice (si estaba)"""
+        entry = self._entries.pop(id(entity), None)
+        if entry is not None:
+            self._unlink(entity, entry[1])
+
+    def _link(self, entity, order, keys):
+        self._entries[id(entity)] = (order, keys)
+        for key in keys:
+            self._cells.setdefault(key, {})[id(entity)] = (order, entity)
+
+    def _unlink(self, entity, keys):
+        for key in keys:
+            cell = self._cells.get(key)
+            if cell is not None:
+                cell.pop(id(entity), None)
+                if not cell:
+                    del self._cells[key]
+
+    def query(self, rect):
+        """Entidades en las celdas que toca rect, en orden de registro.
+        Es un filtro grueso: cada pasada de colisión hace su propio test fino."""
+        found = {}
+        for key in _cell_keys(pygame.Rect(rect)):
+            cell = self._cells.get(key)
+            if cell:
+                found.update(cell)
+        return [entity for _, entity in sorted(found.values(), key=lambda item: item[0])]
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
+        self._next_order = 0
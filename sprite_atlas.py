@@ -0,0 +1,69 @@
+# H.E.R.O. Remake - Variantes precalculadas de sprites
+# Cada sprite se guarda en sus cuatro variantes {normal, espejado} x {color,
+# gris}, armadas una vez al cargar (incluye el cuerpo y los frames de palas de
+# la hélice). Los draw() de las entidades reciben un RenderMode: el modo color
+# y el modo oscuridad (estilo C64: sprites en gris, sin nivel) son la misma
+# pasada de dibujo con otra tabla de variantes y otra paleta para las
+# primitivas (explosiones, hilo de araña). Las variantes se indexan por la
+# Surface original (no por id(), que se reusa cuando una superficie se libera).
+
+import pygame
+from constants import COLOR_WHITE, COLOR_GRAY
+
+# Colores de primitivas en modo oscuridad
+DARK_COLORS = {
+    (139, 69, 19): (100, 100, 100),   # explosión, anillo exterior
+    (101, 67, 33): (70, 70, 70),      # explosión, anillo interior
+    COLOR_WHITE: COLOR_GRAY,          # hilo de araña
+}
+
+
+class SpriteAtlas:
+    """Variantes (normal, espejado, gris, gris espejado) de cada sprite"""
+
+    def __init__(self):
+        self._variants = {}  # Surface original -> (normal, flip, gris, gris flip)
+
+    def add(self, surface):
+        if surface is None or surface in self._variants:
+            return
+        flipped = pygame.transform.flip(surface, True, False)
+        gray = pygame.transform.grayscale(surface)
+        self._variants[surface] = (surface, flipped, gray, pygame.transform.flip(gray, True, False))
+
+    def add_all(self, surfaces):
+        for surface in surfaces:
+            self.add(surface)
+
+    def variant(self, surface, flipped=False, gray=False):
+        variants = self._variants.get(surface)
+        if variants is None:
+            # Sprite no registrado al cargar: se arma la primera vez
+            self.add(surface)
+            variants = self._variants[surface]
+        return variants[2 * gray + flipped]
+
+    def __len__(self):
+        return len(self._variants)
+
+
+class RenderMode:
+    """Tabla de variantes y paleta de primitivas con la que dibujan las entidades.
+    Sin atlas, los sprites se usan tal cual (espejados en el momento)."""
+
+    def __init__(self, atlas=None, dark=False, colors=None):
+        self.atlas = atlas
+        self.dark = dark
+        self._colors = colors or {}
+
+    def sprite(self, surface, flipped=False):
+        if self.atlas is not None:
+            return self.atlas.variant(surface, flipped, self.dark)
+        return pygame.transform.flip(surface, True, False) if flipped else surface
+
+    def color(self, color):
+        return self._colors.get(color, color)
+
+
+# Modo por defecto de los draw(): color, sin atlas
+PLAIN_MODE = RenderMode()
@@ -0,0 +1,133 @@
+# H.E.R.O. Remake - Compuestos estáticos por viewport
+# La cámara salta de a viewports enteros, así que lo que no se mueve dentro de
+# un viewport (fondo de caverna, tiles, textura del suelo y musgo) se compone
+# una sola vez en una superficie de 512x256. Cada frame el nivel es un blit de
+# ese compuesto más los pocos tiles animados (agua tóxica). Cuando un tile
+# cambia (pared destruida, roca agrietada) se repinta solo el rect de ese tile
+# en los compuestos que lo contienen.
+
+from collections import OrderedDict
+
+import pygame
+from constants import TILE_SIZE, GAME_WIDTH, GAME_VIEWPORT_HEIGHT, COLOR_BLACK, STATIC_LAYER_CACHE_SIZE
+
+# Tiles que se dibujan cada frame (no entran en el compuesto)
+ANIMATED_TILES = ('~',)
+
+
+class _ViewportComposite:
+    def __init__(self, surface, animated):
+        self.surface = surface
+        self.animated = animated    # set de (row, col) de tiles animados del viewport
+
+
+class StaticLayerCache:
+    """Compuestos estáticos por viewport, con LRU y parches por tile.
+
+    tile_image(row, col) retorna el sprite estático del tile o None (aire o
+    animado). background es la capa de fondo y overlays las capas que van
+    encima de los tiles (ChunkedOverlay o None). Se registra como listener del
+    grid para repintar los tiles que cambian.
+    """
+
+    def __init__(self, grid, tile_image, background, overlays, max_viewports=STATIC_LAYER_CACHE_SIZE):
+        self._grid = grid
+        self._tile_image = tile_image
+        self._background = background
+        self._overlays = [layer for layer in overlays if layer]
+        self._max_viewports = max(1, max_viewports)
+        self._composites = OrderedDict()  # (cam_x, cam_y) -> _ViewportComposite
+        grid.add_listener(self._on_tile_changed)
+
+    def _tile_range(self, cam_x, cam_y):
+        """Filas y columnas que tocan el viewport (con un tile de margen, como el render directo)"""
+        grid = self._grid
+        start_col = max(0, cam_x // TILE_SIZE - 1)
+        end_col = min(grid.max_width, (cam_x + GAME_WIDTH) // TILE_SIZE + 2)
+        start_row = max(0, cam_y // TILE_SIZE - 1)
+        end_row = min(grid.height, (cam_y + GAME_VIEWPORT_HEIGHT) // TILE_SIZE + 2)
+        return range(start_row, end_row), range(start_col, end_col)
+
+    def _compose(self, cam_x, cam_y):
+        surface = pygame.Surface((GAME_WIDTH, GAME_VIEWPORT_HEIGHT))
+        if pygame.display.get_surface():
+            surface = surface.convert()
+        surface.fill(COLOR_BLACK)
+        view = pygame.Rect(cam_x, cam_y, GAME_WIDTH, GAME_VIEWPORT_HEIGHT)
+        if self._background:
+            self._background.blit_area(surface, (0, 0), view)
+        animated = set()
+        rows, cols = self._tile_range(cam_x, cam_y)
+        for row in rows:
+            for col in cols:
+                if self._grid.tile(row, col) in ANIMATED_TILES:
+                    animated.add((row, col))
+                    continue
+                image = self._tile_image(row, col)
+                if image:
+                    surface.blit(image, (col * TILE_SIZE - cam_x, row * TILE_SIZE - cam_y))
+        for layer in self._overlays:
+            layer.blit_area(surface, (0, 0), view)
+        return _ViewportComposite(surface, animated)
+
+    def _get(self, cam_x, cam_y):
+        key = (cam_x, cam_y)
+        composite = self._composites.get(key)
+        if composite is None:
+            composite = self._compose(cam_x, cam_y)
+            self._composites[key] = composite
+            while len(self._composites) > self._max_viewports:
+                self._composites.popitem(last=False)
+        else:
+            self._composites.move_to_end(key)
+        return composite
+
+    def blit(self, target, cam_x, cam_y, animated_image):
+        """Dibuja el viewport en target: el compuesto y encima los tiles
+        animados (animated_image(char) da el frame actual), cada uno sobre el
+        fondo y con las capas de overlay repuestas encima"""
+        composite = self._get(cam_x, cam_y)
+        target.blit(composite.surface, (0, 0))
+        for row, col in composite.animated:
+            x = col * TILE_SIZE - cam_x
+            y = row * TILE_SIZE - cam_y
+            tile_rect = pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            # El compuesto ya tiene los overlays en ese tile: volver al fondo solo
+            if self._background:
+                self._background.blit_area(target, (x, y), tile_rect)
+            target.blit(animated_image(self._grid.tile(row, col)), (x, y))
+            for layer in self._overlays:
+                layer.blit_area(target, (x, y), tile_rect)
+
+    def invalidate_tile(self, row, col):
+        """Repinta el tile (row, col) en los compuestos que lo contienen
+        (ej. una roca que cambió a su sprite agrietado)"""
+        for (cam_x, cam_y), composite in self._composites.items():
+            rows, cols = self._tile_range(cam_x, cam_y)
+            if row not in rows or col not in cols:
+                continue
+            x = col * TILE_SIZE - cam_x
+            y = row * TILE_SIZE - cam_y
+            dest = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
+            tile_rect = dest.move(cam_x, cam_y)
+            surface = composite.surface
+            surface.set_clip(dest)
+            surface.fill(COLOR_BLACK)
+            if self._background:
+                self._background.blit_area(surface, (x, y), tile_rect)
+            composite.animated.discard((row, col))
+            if self._grid.tile(row, col) in ANIMATED_TILES:
+                composite.animated.add((row, col))
+            else:
+                image = self._tile_image(row, col)
+                if image:
+                    surface.blit(image, (x, y))
+            for layer in self._overlays:
+                layer.blit_area(surface, (x, y), tile_rect)
+            surface.set_clip(None)
+
+    def _on_tile_changed(self, row, col, old, new):
+        self.invalidate_tile(row, col)
+
+    def clear(self):
+        self._composites.clear()
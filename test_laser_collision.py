@@ -6,6 +6,7 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from laser import Laser
+from tilegrid import TileGrid
 from constants import *
 
 def create_test_map_with_blocks():
@@ -124,6 +125,58 @@ def test_laser_size():
         print(f"  [FALLO] Laser tiene width={laser.width}, esperado: 10")
         return False
 
+def create_cast_map():
+    """Viewport de 16x8 tiles para los rayos precalculados (cast)"""
+    return [
+        "GGGGGGGGGGGGGGGG",  # Row 0
+        "G    #     R   G",  # Row 1 - tierra en col 5, roca en col 11
+        "G              G",  # Row 2
+        "G       .      G",  # Row 3 - piso en col 8
+        "G               ",  # Row 4 - sin pared a la derecha
+        "GGGGGGGGGGGGGGGG",  # Row 5
+    ]
+
+def test_laser_cast_stops():
+    """Test 6: cast() calcula dónde se detiene el rayo"""
+    print("\nTest 6: Posiciones de corte del rayo (cast)...")
+    grid = TileGrid(create_cast_map())
+    # (descripción, láser, stop_x esperado, tile que lo detiene)
+    cases = [
+        ("derecha contra tierra", Laser(40, 40, 1), 160, (1, 5, '#')),
+        ("izquierda contra tierra", Laser(300, 40, -1), 192, (1, 5, '#')),
+        ("derecha contra roca", Laser(200, 40, 1), 352, (1, 11, 'R')),
+        # y=95: el alto del rayo cruza las filas 2 y 3, solo la 3 tiene piso
+        ("rayo entre dos filas", Laser(40, 95, 1), 256, (3, 8, '.')),
+        ("izquierda entre dos filas", Laser(400, 95, -1), 288, (3, 8, '.')),
+        ("sin sólido hasta el borde", Laser(40, 136, 1), None, None),
+        ("arranca dentro de un sólido", Laser(165, 40, 1), 160, (1, 5, '#')),
+    ]
+    failed = []
+    for name, laser, stop_x, stop_tile in cases:
+        laser.cast(grid)
+        if (laser.stop_x, laser._stop_tile) != (stop_x, stop_tile):
+            failed.append(f"{name}: {laser.stop_x}, {laser._stop_tile} (esperado {stop_x}, {stop_tile})")
+
+    # Al romper la roca el rayo se recalcula y sigue hasta la pared
+    laser = Laser(200, 40, 1)
+    laser.update(0.001, grid)
+    grid.set(1, 11, ' ')
+    laser.update(0.001, grid)
+    if laser.stop_x != 480:
+        failed.append(f"roca rota: {laser.stop_x} (esperado 480)")
+    # Un láser que arranca dentro del sólido impacta en el primer update
+    laser = Laser(165, 40, 1)
+    laser.update(0.001, grid)
+    if laser.active:
+        failed.append("arranca dentro de un sólido: sigue activo después del update")
+
+    if not failed:
+        print(f"  [OK] {len(cases) + 2} rayos cortan donde corresponde")
+        return True
+    for message in failed:
+        print(f"  [FALLO] {message}")
+    return False
+
 if __name__ == "__main__":
     import pygame
     pygame.init()
@@ -138,6 +191,7 @@ if __name__ == "__main__":
     results.append(test_laser_stops_at_block())
     results.append(test_laser_corner_detection())
     results.append(test_laser_size())
+    results.append(test_laser_cast_stops())
 
     print("\n" + "=" * 60)
     print(f"RESULTADOS: {sum(results)}/{len(results)} tests pasados")
@@ -0,0 +1,96 @@
+"""
+Tests para verificar el análisis de alcanzabilidad de level_analysis
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import json
+import random
+from tilegrid import TileGrid
+from level_analysis import LevelAnalyzer, STATUS_OK, STATUS_UNREACHABLE
+
+def create_ceiling_map():
+    """Minero encima de un techo de tierra (#): la dinamita no llega arriba"""
+    return [
+        "GGGGGGG",  # Row 0
+        "G  M  G",  # Row 1 - minero
+        "G#####G",  # Row 2 - techo de tierra
+        "G  S  G",  # Row 3 - inicio
+        "GGGGGGG",  # Row 4 - piso
+    ]
+
+def create_floor_map():
+    """El mismo mapa invertido: el minero está debajo del piso de tierra"""
+    return list(reversed(create_ceiling_map()))
+
+def test_bomb_ceiling():
+    """Test 1: Una bomba rompe el piso pero no el techo"""
+    print("Test 1: Dinamita contra techo y piso de tierra...")
+    ceiling = LevelAnalyzer(TileGrid(create_ceiling_map())).result()
+    floor = LevelAnalyzer(TileGrid(create_floor_map())).result()
+    ok = True
+    if ceiling.status == STATUS_UNREACHABLE:
+        print("  [OK] Minero detrás de un techo: inalcanzable")
+    else:
+        print(f"  [FALLO] Minero detrás de un techo: {ceiling.status} (esperado {STATUS_UNREACHABLE})")
+        ok = False
+    if floor.status == STATUS_OK and floor.bombs == 1:
+        print("  [OK] Minero debajo del piso: alcanzable con 1 bomba")
+    else:
+        print(f"  [FALLO] Minero debajo del piso: {floor.status}, {floor.bombs} bombas (esperado {STATUS_OK}, 1)")
+        ok = False
+    return ok
+
+def _partition(analyzer):
+    """Regiones como conjuntos de tiles (los ids de región no importan)"""
+    return {frozenset(tiles) for tiles in analyzer._regions.values()}
+
+def test_incremental_relabel():
+    """Test 2: Reetiquetar tile por tile da lo mismo que construir de cero"""
+    print("\nTest 2: Reetiquetado incremental vs análisis nuevo...")
+    with open(os.path.join(os.path.dirname(__file__), 'screens.json')) as f:
+        levels = [level['map'] for level in json.load(f)]
+    rng = random.Random(18)
+    edits = 0
+    mismatches = 0
+    for level_map in levels:
+        grid = TileGrid(level_map)
+        analyzer = LevelAnalyzer(grid)
+        for _ in range(60):
+            # Abrir o cerrar tiles (une y parte regiones), a veces mover S o M
+            row = rng.randrange(grid.height)
+            col = rng.randrange(grid.row_width(row))
+            grid.set(row, col, rng.choice(' ' * 4 + '#RGW~SM'))
+            edits += 1
+            fresh = LevelAnalyzer(grid.copy())
+            got, want = analyzer.result(), fresh.result()
+            if (_partition(analyzer) != _partition(fresh) or analyzer._cells != fresh._cells
+                    or (got.status, got.energy, got.bombs, got.regions)
+                    != (want.status, want.energy, want.bombs, want.regions)):
+                mismatches += 1
+    if mismatches == 0:
+        print(f"  [OK] {edits} cambios de tile en {len(levels)} niveles coinciden")
+        return True
+    print(f"  [FALLO] {mismatches}/{edits} cambios con regiones o resultado distintos")
+    return False
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTS DE ANÁLISIS DE NIVELES")
+    print("=" * 60)
+
+    results = []
+    results.append(test_bomb_ceiling())
+    results.append(test_incremental_relabel())
+
+    print("\n" + "=" * 60)
+    print(f"RESULTADOS: {sum(results)}/{len(results)} tests pasados")
+    print("=" * 60)
+
+    if all(results):
+        print("[OK] TODOS LOS TESTS PASARON")
+        sys.exit(0)
+    else:
+        print("[FALLO] ALGUNOS TESTS FALLARON")
+        sys.exit(1)
@@ -0,0 +1,116 @@
+"""
+Tests para verificar los barridos (sweep_x / sweep_y) de level_masks
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import random
+import pygame
+from tilegrid import TileGrid
+from level_masks import level_masks, mask_extents
+from constants import *
+
+def create_test_map():
+    """Caja de 10x6 tiles con una pared, un bloque de lava y piso"""
+    return [
+        "##########",  # Row 0 - techo
+        "#        #",  # Row 1
+        "#    #   #",  # Row 2 - pared en col 5
+        "#        #",  # Row 3
+        "#  X     #",  # Row 4 - lava en col 3
+        "##########",  # Row 5 - piso
+    ]
+
+def create_sprite_mask():
+    """Mask de 20x24 en forma de triángulo: ancho 4px arriba, 20px abajo"""
+    mask = pygame.mask.Mask((20, 24))
+    for y in range(24):
+        width = 4 + (y * 16) // 23
+        for x in range((20 - width) // 2, (20 - width) // 2 + width):
+            mask.set_at((x, y), 1)
+    return mask
+
+def test_sweep_contacts():
+    """Test 1: Contactos conocidos (pared, piso, lava, bordes, sin obstáculo)"""
+    print("Test 1: Contactos de barrido conocidos...")
+    masks = level_masks(TileGrid(create_test_map()))
+    ext = mask_extents(create_sprite_mask())
+    # (descripción, resultado, esperado)
+    cases = [
+        # Filas 64..87 (banda 2): base del triángulo x+0..x+19, la pared arranca en x=160
+        ("derecha contra la pared", masks.sweep_x(ext, 100, 64, 50), (40.0, False)),
+        ("derecha sin llegar", masks.sweep_x(ext, 100, 64, 30), (30.0, False)),
+        # Izquierda desde la pared hacia el borde del mapa (col 0 sólida, termina en x=32)
+        ("izquierda contra el borde", masks.sweep_x(ext, 60, 40, -50), (-28.0, False)),
+        # Punta del triángulo (4px en la fila 0) contra el techo (termina en y=32)
+        ("arriba contra el techo", masks.sweep_y(ext, 40, 50, -30), (-18.0, False)),
+        # Piso en y=160
+        ("abajo contra el piso", masks.sweep_y(ext, 200, 120, 30), (16.0, False)),
+        # Lava: tile (4, 3) empieza en y=128, x=96..127
+        ("abajo contra la lava", masks.sweep_y(ext, 100, 90, 30), (14.0, True)),
+        # Posición fraccionaria: el sprite cruza las bandas 1 y 2; solo la 2 tiene pared
+        ("derecha con y fraccionaria", masks.sweep_x(ext, 120.5, 50.25, 50), (19.5, False)),
+        ("sin movimiento", masks.sweep_x(ext, 100, 64, 0), (0.0, False)),
+    ]
+    failed = [(name, got, want) for name, got, want in cases if got != want]
+    if not failed:
+        print(f"  [OK] {len(cases)} barridos con el contacto esperado")
+        return True
+    for name, got, want in failed:
+        print(f"  [FALLO] {name}: {got} (esperado {want})")
+    return False
+
+def test_sweep_matches_overlap():
+    """Test 2: En posiciones enteras el barrido coincide con probar píxel a píxel"""
+    print("\nTest 2: Barrido vs overlap píxel a píxel...")
+    masks = level_masks(TileGrid(create_test_map()))
+    mask = create_sprite_mask()
+    ext = mask_extents(mask)
+    rng = random.Random(8)
+    mismatches = 0
+    tried = 0
+    while tried < 300:
+        x = rng.randint(0, 10 * TILE_SIZE - 20)
+        y = rng.randint(0, 6 * TILE_SIZE - 24)
+        if masks.hits_solid(mask, x, y):
+            continue
+        tried += 1
+        dx, dy = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+        # Referencia: avanzar de a un píxel mientras la mask no toque nada
+        free = 0
+        while free < 40 and not masks.hits_solid(mask, x + dx * (free + 1), y + dy * (free + 1)):
+            free += 1
+        if dx:
+            moved, _ = masks.sweep_x(ext, x, y, dx * 40)
+        else:
+            moved, _ = masks.sweep_y(ext, x, y, dy * 40)
+        if abs(moved) != free:
+            mismatches += 1
+    if mismatches == 0:
+        print(f"  [OK] {tried} barridos coinciden con el overlap")
+        return True
+    print(f"  [FALLO] {mismatches}/{tried} barridos distintos del overlap")
+    return False
+
+if __name__ == "__main__":
+    pygame.init()
+
+    print("=" * 60)
+    print("TESTS DE BARRIDOS DE LEVEL_MASKS")
+    print("=" * 60)
+
+    results = []
+    results.append(test_sweep_contacts())
+    results.append(test_sweep_matches_overlap())
+
+    print("\n" + "=" * 60)
+    print(f"RESULTADOS: {sum(results)}/{len(results)} tests pasados")
+    print("=" * 60)
+
+    if all(results):
+        print("[OK] TODOS LOS TESTS PASARON")
+        sys.exit(0)
+    else:
+        print("[FALLO] ALGUNOS TESTS FALLARON")
+        sys.exit(1)
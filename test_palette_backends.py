@@ -0,0 +1,143 @@
+"""
+Tests para comparar el backend NumPy de texturas con el de Python (palette.py)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import json
+import numpy as np
+import pygame
+import palette
+import palette_numpy
+from constants import *
+
+SEEDS = (1, 7, 42)
+
+
+class DrawsRandom:
+    """random.Random de mentira para palette._jagged_heights (con min_h=1):
+    contesta cada sorteo con el de la misma posición del borde en los arrays de
+    palette_numpy._jag_draws. El tipo de sorteo sale de los argumentos y del
+    orden de las llamadas: el random() que sigue al paso ±1 es el del pico, el
+    otro es el del gap; randint(min_h, max_h) es 'level' si en esa posición se
+    sorteó el gap y 'resume' si no."""
+
+    def __init__(self, draws, n, max_h):
+        self.draws = {k: v[n] for k, v in draws.items()}
+        self.max_h = max_h
+        self.pos = 0          # elementos del borde ya empezados
+        self.last = None
+        self.rolled_gap = False
+        self.first = True
+
+    def _take(self, kind, pos):
+        return int(self.draws[kind][pos])
+
+    def random(self):
+        if self.last == 'step':
+            self.last = 'peak'
+            return 0.0 if self.draws['peak'][self.pos - 1] else 0.999
+        self.last = 'gap'
+        self.rolled_gap = True
+        return 0.0 if self.draws['gap'][self.pos] else 0.999
+
+    def randint(self, a, b):
+        if self.first:  # altura inicial: la pisa siempre el primer cluster
+            self.first = False
+            return a
+        if (a, b) == (-1, 1):
+            value = self._take('step', self.pos)
+            self.pos += 1
+            self.rolled_gap = False
+            self.last = 'step'
+        elif (a, b) == (0, 1):
+            value = self._take('gap_h', self.pos)
+            self.pos += 1
+            self.rolled_gap = False
+            self.last = 'gap_h'
+        elif (a, b) == MOSS_JAG_CLUSTER_LEN:
+            value = self._take('length', self.pos)
+            self.last = 'length'
+        elif (a, b) == MOSS_JAG_PEAK_EXTRA:
+            value = self._take('peak_extra', self.pos - 1)
+            self.last = 'peak_extra'
+        elif (a, b) == (1, self.max_h):
+            value = self._take('level' if self.rolled_gap else 'resume', self.pos)
+            self.last = 'level'
+        else:
+            raise AssertionError(f"randint({a}, {b}) inesperado")
+        return value
+
+
+def test_jagged_heights_rules():
+    """Test 1: Con los mismos sorteos, las alturas del musgo son idénticas"""
+    print("Test 1: Alturas del dentado NumPy vs Python...")
+    count = 500
+    rows = np.arange(count) // 40
+    cols = np.arange(count) % 40
+    mismatches = 0
+    for seed in SEEDS:
+        for max_h in (MOSS_MAX_DOWN, MOSS_MAX_UP):
+            rnd = palette_numpy._TileRandom(seed, rows, cols)
+            draws = palette_numpy._jag_draws(rnd, 101, 1, max_h)
+            heights = palette_numpy._jagged_heights(draws, 1, max_h)
+            for n in range(count):
+                expected = palette._jagged_heights(DrawsRandom(draws, n, max_h), TILE_SIZE, 1, max_h)
+                if list(heights[n]) != expected:
+                    mismatches += 1
+    if mismatches == 0:
+        print(f"  [OK] {len(SEEDS) * 2 * count} bordes coinciden regla por regla")
+        return True
+    print(f"  [FALLO] {mismatches} bordes distintos")
+    return False
+
+
+def _moss_coverage(level_map, seed, numpy_backend):
+    saved = palette.palette_numpy
+    palette.palette_numpy = palette_numpy if numpy_backend else None
+    try:
+        overlay = palette.generate_edge_overlay(level_map, (60, 140, 40), seed=seed)
+    finally:
+        palette.palette_numpy = saved
+    return int(np.count_nonzero(pygame.surfarray.array_alpha(overlay)))
+
+
+def test_moss_coverage():
+    """Test 2: Ambos backends cubren con musgo una superficie parecida"""
+    print("\nTest 2: Cobertura del musgo por backend...")
+    with open(os.path.join(os.path.dirname(__file__), 'screens.json')) as f:
+        level_map = json.load(f)[1]['map']
+    ratios = []
+    for seed in SEEDS:
+        python_px = _moss_coverage(level_map, seed, False)
+        numpy_px = _moss_coverage(level_map, seed, True)
+        ratios.append(numpy_px / python_px)
+    if all(abs(r - 1) < 0.05 for r in ratios):
+        print(f"  [OK] Relación NumPy/Python: {', '.join(f'{r:.3f}' for r in ratios)}")
+        return True
+    print(f"  [FALLO] Relación NumPy/Python fuera de rango: {ratios}")
+    return False
+
+
+if __name__ == "__main__":
+    pygame.init()
+    print("=" * 60)
+    print("TESTS DE BACKENDS DE TEXTURAS")
+    print("=" * 60)
+
+    results = []
+    results.append(test_jagged_heights_rules())
+    results.append(test_moss_coverage())
+
+    print("\n" + "=" * 60)
+    print(f"RESULTADOS: {sum(results)}/{len(results)} tests pasados")
+    print("=" * 60)
+
+    if all(results):
+        print("[OK] TODOS LOS TESTS PASARON")
+        sys.exit(0)
+    else:
+        print("[FALLO] ALGUNOS TESTS FALLARON")
+        sys.exit(1)
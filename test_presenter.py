@@ -0,0 +1,124 @@
+"""
+Tests para verificar la presentación por rectángulos sucios de presenter
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import random
+import numpy as np
+import pygame
+from presenter import Presenter
+from constants import *
+
+# Resoluciones de display con escalas no enteras (y 2x exacto como control)
+DISPLAY_SIZES = [(1920, 1080), (1366, 768), (1280, 1024), (3840, 2160), (1536, 928)]
+
+def fit_dest(display_size):
+    """Rect de screen escalado al display manteniendo aspect ratio"""
+    dw, dh = display_size
+    scale = min(dw / SCREEN_WIDTH, dh / SCREEN_HEIGHT)
+    w = int(SCREEN_WIDTH * scale)
+    h = int(SCREEN_HEIGHT * scale)
+    return pygame.Rect((dw - w) // 2, (dh - h) // 2, w, h)
+
+def create_planes(rng):
+    """Planos del juego (viewport y HUD) llenos de ruido"""
+    game = pygame.Surface((GAME_WIDTH, GAME_VIEWPORT_HEIGHT))
+    hud = pygame.Surface((SCREEN_WIDTH, HUD_HEIGHT))
+    for surface in (game, hud):
+        pygame.surfarray.blit_array(surface, rng.integers(0, 1 << 24, surface.get_size()))
+    return [(game, (0, 0, SCREEN_WIDTH, VIEWPORT_HEIGHT)),
+            (hud, (0, VIEWPORT_HEIGHT, SCREEN_WIDTH, HUD_HEIGHT))]
+
+def paint_noise(surface, rect, rng):
+    """Pinta ruido en un rect de la superficie"""
+    sub = surface.subsurface(rect)
+    pygame.surfarray.blit_array(sub, rng.integers(0, 1 << 24, sub.get_size()))
+
+def full_present(size, display, dest, planes):
+    """Frame de referencia: todos los planos escalados enteros"""
+    reference = pygame.Surface(size, 0, display)
+    Presenter().present(reference, dest, planes)
+    return pygame.surfarray.array2d(reference)
+
+def test_partial_matches_full():
+    """Test 1: Los presents parciales coinciden con escalar el frame entero"""
+    print("Test 1: Present parcial vs escalado completo...")
+    ok = True
+    for size in DISPLAY_SIZES:
+        display = pygame.display.set_mode(size)
+        dest = fit_dest(size)
+        rng = np.random.default_rng(20)
+        pick = random.Random(20)
+        planes = create_planes(rng)
+        presenter = Presenter()
+        presenter.present(display, dest, planes)
+        before = pygame.surfarray.array2d(display)
+        mismatched = 0
+        uncovered = 0
+        for _ in range(20):
+            # Unos pocos rects chicos cambiados (muy por debajo del flip completo)
+            for source, _ in planes:
+                for _ in range(3):
+                    w = pick.randint(1, 40)
+                    h = pick.randint(1, 30)
+                    x = pick.randint(0, source.get_width() - w)
+                    y = pick.randint(0, source.get_height() - h)
+                    paint_noise(source, (x, y, w, h), rng)
+            updated = presenter.present(display, dest, planes)
+            after = pygame.surfarray.array2d(display)
+            if not np.array_equal(after, full_present(size, display, dest, planes)):
+                mismatched += 1
+            # Todo píxel que cambió tiene que estar en algún rect actualizado
+            covered = np.zeros(after.shape, dtype=bool)
+            for rect in updated:
+                covered[rect.left:rect.right, rect.top:rect.bottom] = True
+            if np.any((after != before) & ~covered):
+                uncovered += 1
+            before = after
+        label = f"{size[0]}x{size[1]}"
+        if mismatched or uncovered:
+            print(f"  [FALLO] {label}: {mismatched} frames distintos, {uncovered} con cambios fuera de los rects")
+            ok = False
+        else:
+            print(f"  [OK] {label}: 20 frames parciales iguales al escalado completo")
+    return ok
+
+def test_unchanged_frame():
+    """Test 2: Un frame sin cambios no actualiza nada"""
+    print("\nTest 2: Frame sin cambios...")
+    size = (1920, 1080)
+    display = pygame.display.set_mode(size)
+    planes = create_planes(np.random.default_rng(3))
+    presenter = Presenter()
+    presenter.present(display, fit_dest(size), planes)
+    updated = presenter.present(display, fit_dest(size), planes)
+    if updated == []:
+        print("  [OK] Sin rects actualizados")
+        return True
+    print(f"  [FALLO] Se actualizaron {len(updated)} rects")
+    return False
+
+if __name__ == "__main__":
+    pygame.init()
+
+    print("=" * 60)
+    print("TESTS DE PRESENTACIÓN POR RECTÁNGULOS SUCIOS")
+    print("=" * 60)
+
+    results = []
+    results.append(test_partial_matches_full())
+    results.append(test_unchanged_frame())
+
+    print("\n" + "=" * 60)
+    print(f"RESULTADOS: {sum(results)}/{len(results)} tests pasados")
+    print("=" * 60)
+
+    if all(results):
+        print("[OK] TODOS LOS TESTS PASARON")
+        sys.exit(0)
+    else:
+        print("[FALLO] ALGUNOS TESTS FALLARON")
+        sys.exit(1)
@@ -0,0 +1,108 @@
+"""
+Tests para verificar la grabación y el replay determinista (replay.py)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import random
+import tempfile
+import pygame
+from hero import Game
+from headless import HeldKeys, explorer_bot
+from replay import (InputSample, ReplayWriter, ReplayReader, ReplayDivergence,
+                    state_checksum, play_replay)
+from constants import *
+
+SESSION_SEED = 1234
+FRAMES = 300
+TAMPERED_FRAME = 120
+
+def new_game():
+    game = Game()
+    game.init(headless=True)
+    game.session_seed = SESSION_SEED
+    game.persist_scores = False
+    return game
+
+def record_session(path, tampered_path):
+    """Graba FRAMES frames con el bot y de 0 a 3 pasos de simulación por frame.
+    En tampered_path graba lo mismo con un checksum alterado en TAMPERED_FRAME."""
+    game = new_game()
+    game.start_new_game(0)
+    writer = ReplayWriter(path, SESSION_SEED, 0)
+    tampered = ReplayWriter(tampered_path, SESSION_SEED, 0)
+    steps_rng = random.Random(17)
+    held_before = frozenset()
+    for frame in range(FRAMES):
+        held = frozenset(explorer_bot(game, frame))
+        # Las teclas recién apretadas llegan como KEYDOWN (disparo, dinamita)
+        events = [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0)
+                  for key in sorted(held - held_before)]
+        held_before = held
+        sample = InputSample(HeldKeys(held), 0.0, 0.0, events)
+        tampered.capture(sample)
+        game.handle_events(writer.capture(sample))
+        steps = steps_rng.randint(0, 3)
+        for _ in range(steps):
+            game.step(SIM_DT)
+        checksum = state_checksum(game)
+        writer.end_frame(steps, checksum)
+        tampered.end_frame(steps, checksum ^ 1 if frame == TAMPERED_FRAME else checksum)
+    writer.close()
+    tampered.close()
+    return game
+
+def test_round_trip():
+    """Test 1: Grabar y reproducir con pasos variables por frame"""
+    print("Test 1: Grabación -> replay con pasos variables...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'session.hrep')
+        tampered_path = os.path.join(tmp, 'tampered.hrep')
+        recorded = record_session(path, tampered_path)
+        ok = True
+
+        game = new_game()
+        try:
+            frames = play_replay(game, ReplayReader(path), speed=0, render=False)
+        except ReplayDivergence as e:
+            print(f"  [FALLO] {e}")
+            return False
+        if frames == FRAMES and state_checksum(game) == state_checksum(recorded):
+            print(f"  [OK] {frames} frames reproducidos sin divergencia")
+        else:
+            print(f"  [FALLO] {frames}/{FRAMES} frames, estado final distinto")
+            ok = False
+
+        try:
+            play_replay(new_game(), ReplayReader(tampered_path), speed=0, render=False)
+            print("  [FALLO] Checksum alterado no detectado")
+            ok = False
+        except ReplayDivergence as e:
+            if e.frame == TAMPERED_FRAME:
+                print(f"  [OK] Divergencia detectada en el frame {e.frame}")
+            else:
+                print(f"  [FALLO] Divergencia en el frame {e.frame} (esperado {TAMPERED_FRAME})")
+                ok = False
+    return ok
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTS DE GRABACIÓN Y REPLAY")
+    print("=" * 60)
+
+    results = []
+    results.append(test_round_trip())
+
+    print("\n" + "=" * 60)
+    print(f"RESULTADOS: {sum(results)}/{len(results)} tests pasados")
+    print("=" * 60)
+
+    if all(results):
+        print("[OK] TODOS LOS TESTS PASARON")
+        sys.exit(0)
+    else:
+        print("[FALLO] ALGUNOS TESTS FALLARON")
+        sys.exit(1)
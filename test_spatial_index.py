@@ -0,0 +1,128 @@
+"""
+Tests para verificar las consultas del índice espacial (spatial_index.py)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import random
+import pygame
+from spatial_index import SpatialIndex
+from constants import *
+
+# Mundo de 3x2 viewports
+WORLD_W = GAME_WIDTH * 3
+WORLD_H = GAME_VIEWPORT_HEIGHT * 2
+
+class Box:
+    """Entidad mínima: solo un rect"""
+
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+
+    def get_rect(self):
+        return self.rect
+
+def random_rect(rng):
+    w = rng.randint(0, 80)
+    h = rng.randint(0, 80)
+    return pygame.Rect(rng.randint(0, WORLD_W - w), rng.randint(0, WORLD_H - h), w, h)
+
+def test_known_queries():
+    """Test 1: Consultas conocidas (misma celda, otro viewport, borde entre viewports)"""
+    print("Test 1: Consultas conocidas...")
+    index = SpatialIndex()
+    a = Box((10, 10, 20, 20))
+    b = Box((GAME_WIDTH + 10, 10, 20, 20))               # viewport vecino
+    c = Box((GAME_WIDTH - 10, 30, 20, 20))               # cruza el borde entre viewports
+    # Justo en el borde entre celdas: d empieza en la segunda, e asoma 1px a ella
+    d = Box((SPATIAL_CELL_W, 150, 1, 1))
+    e = Box((SPATIAL_CELL_W - 5, 200, 6, 6))
+    for box in (a, b, c, d, e):
+        index.insert(box)
+    cases = [
+        ("rect sobre a", index.query((12, 12, 4, 4)), [a]),
+        # c asoma a la primera celda del viewport vecino: filtro grueso, sale con b
+        ("rect sobre b", index.query((GAME_WIDTH + 12, 12, 4, 4)), [b, c]),
+        ("borde, lado izquierdo", index.query((GAME_WIDTH - 4, 32, 2, 2)), [c]),
+        ("borde, lado derecho", index.query((GAME_WIDTH + 2, 32, 2, 2)), [b, c]),
+        ("viewport de abajo vacío", index.query((10, GAME_VIEWPORT_HEIGHT + 10, 20, 20)), []),
+        ("rect de tamaño 0", index.query((12, 12, 0, 0)), [a]),
+        ("celda 1x1 en el borde", index.query((SPATIAL_CELL_W + 10, 140, 4, 4)), [d, e]),
+        ("antes del borde", index.query((SPATIAL_CELL_W - 20, 140, 4, 4)), [e]),
+    ]
+    index.remove(a)
+    cases.append(("a sacado", index.query((12, 12, 4, 4)), []))
+    c.rect.x = 10
+    index.move(c)
+    cases.append(("c movido junto a a", index.query((12, 32, 4, 4)), [c]))
+    cases.append(("c ya no está en el borde", index.query((GAME_WIDTH + 2, 32, 2, 2)), [b]))
+    failed = [(name, got, want) for name, got, want in cases if got != want]
+    if not failed:
+        print(f"  [OK] {len(cases)} consultas con las entidades esperadas")
+        return True
+    for name, got, want in failed:
+        print(f"  [FALLO] {name}: {[e.rect for e in got]} (esperado {[e.rect for e in want]})")
+    return False
+
+def test_random_queries():
+    """Test 2: Consultas al azar vs recorrer todas las entidades"""
+    print("\nTest 2: Consultas al azar vs fuerza bruta...")
+    rng = random.Random(9)
+    index = SpatialIndex()
+    alive = []
+    missing = 0
+    misordered = 0
+    stale = 0
+    queries = 0
+    for _ in range(2000):
+        action = rng.random()
+        if action < 0.3 or not alive:
+            box = Box(random_rect(rng))
+            index.insert(box)
+            alive.append(box)
+        elif action < 0.7:
+            box = rng.choice(alive)
+            box.rect.move_ip(rng.randint(-40, 40), rng.randint(-40, 40))
+            box.rect.clamp_ip((0, 0, WORLD_W, WORLD_H))
+            index.move(box)
+        elif action < 0.8:
+            box = alive.pop(rng.randrange(len(alive)))
+            index.remove(box)
+        query = random_rect(rng)
+        found = index.query(query)
+        queries += 1
+        # Filtro grueso: nunca falta una entidad que toca el rect
+        if any(box.rect.colliderect(query) and box not in found for box in alive):
+            missing += 1
+        # Sin duplicados, sin entidades sacadas y en orden de registro
+        order = [alive.index(box) if box in alive else -1 for box in found]
+        if -1 in order:
+            stale += 1
+        elif order != sorted(set(order)):
+            misordered += 1
+    if not (missing or misordered or stale):
+        print(f"  [OK] {queries} consultas sin faltantes, en orden y sin entidades sacadas")
+        return True
+    print(f"  [FALLO] faltantes: {missing}, fuera de orden: {misordered}, sacadas: {stale}")
+    return False
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTS DEL ÍNDICE ESPACIAL")
+    print("=" * 60)
+
+    results = []
+    results.append(test_known_queries())
+    results.append(test_random_queries())
+
+    print("\n" + "=" * 60)
+    print(f"RESULTADOS: {sum(results)}/{len(results)} tests pasados")
+    print("=" * 60)
+
+    if all(results):
+        print("[OK] TODOS LOS TESTS PASARON")
+        sys.exit(0)
+    else:
+        print("[FALLO] ALGUNOS TESTS FALLARON")
+        sys.exit(1)
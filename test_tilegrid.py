@@ -0,0 +1,106 @@
+"""
+Tests para verificar el TileGrid (mapa respaldado por bytearray)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from tilegrid import TileGrid, as_grid
+from constants import *
+
+def create_jagged_map():
+    """Crea un mapa jagged: banda superior de 32 columnas, inferior de 16"""
+    top = ["#" * 32] + ["#" + " " * 30 + "#"] * (VIEWPORT_ROWS - 2) + ["#" * 32]
+    bottom = ["#" + "." * 14 + "#"] * VIEWPORT_ROWS
+    return top + bottom
+
+def test_string_view():
+    """Test 1: La vista de strings debe coincidir con el mapa original"""
+    print("Test 1: Vista de strings...")
+    rows = create_jagged_map()
+    grid = TileGrid(rows)
+    if grid.to_rows() == rows and len(grid) == len(rows) and grid[3] == rows[3]:
+        print("  [OK] to_rows(), len() y [] coinciden con el mapa original")
+        return True
+    print("  [FALLO] La vista de strings no coincide")
+    return False
+
+def test_set_tile():
+    """Test 2: set() cambia el tile, la solidez y la vista de strings"""
+    print("\nTest 2: set() actualiza tile y solidez...")
+    grid = TileGrid(create_jagged_map())
+    old = grid.set(0, 5, ' ')
+    ok = (old == '#' and grid.tile(0, 5) == ' ' and not grid.is_solid(0, 5)
+          and grid[0][5] == ' ')
+    grid.set(1, 1, 'R')
+    ok = ok and grid.is_solid(1, 1) and grid.tile(1, 1) == 'R'
+    if ok:
+        print("  [OK] Tile, bitmap de solidez y fila cacheada actualizados")
+        return True
+    print("  [FALLO] set() no actualizó el estado correctamente")
+    return False
+
+def test_out_of_bounds():
+    """Test 3: Fuera del mapa y fuera de la banda cuenta como sólido"""
+    print("\nTest 3: Fuera de límites = sólido...")
+    grid = TileGrid(create_jagged_map())
+    checks = [
+        grid.is_solid(-1, 0),
+        grid.is_solid(0, -1),
+        grid.is_solid(len(grid), 0),
+        grid.is_solid(VIEWPORT_ROWS, 20),   # fuera de la banda angosta
+        grid.tile(VIEWPORT_ROWS, 20) is None,
+    ]
+    if all(checks):
+        print("  [OK] Todos los accesos fuera de límites son sólidos")
+        return True
+    print(f"  [FALLO] Resultados: {checks}")
+    return False
+
+def test_widths():
+    """Test 4: Anchos por fila y por banda"""
+    print("\nTest 4: Anchos por fila y banda...")
+    grid = TileGrid(create_jagged_map())
+    ok = (grid.max_width == 32 and grid.row_width(0) == 32 and
+          grid.row_width(VIEWPORT_ROWS) == 16 and grid.band_width(VIEWPORT_ROWS + 3) == 16 and
+          grid.row_width(len(grid)) == 0)
+    if ok:
+        print("  [OK] Anchos correctos")
+        return True
+    print("  [FALLO] Anchos incorrectos")
+    return False
+
+def test_copy_is_independent():
+    """Test 5: copy() no comparte estado con el original"""
+    print("\nTest 5: copy() independiente...")
+    grid = TileGrid(create_jagged_map())
+    clone = grid.copy()
+    clone.set(0, 0, ' ')
+    if grid.tile(0, 0) == '#' and clone.tile(0, 0) == ' ' and as_grid(grid) is grid:
+        print("  [OK] La copia es independiente")
+        return True
+    print("  [FALLO] La copia comparte estado con el original")
+    return False
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTS DE TILEGRID")
+    print("=" * 60)
+
+    results = []
+    results.append(test_string_view())
+    results.append(test_set_tile())
+    results.append(test_out_of_bounds())
+    results.append(test_widths())
+    results.append(test_copy_is_independent())
+
+    print("\n" + "=" * 60)
+    print(f"RESULTADOS: {sum(results)}/{len(results)} tests pasados")
+    print("=" * 60)
+
+    if all(results):
+        print("[OK] TODOS LOS TESTS PASARON")
+        sys.exit(0)
+    else:
+        print("[FALLO] ALGUNOS TESTS FALLARON")
+        sys.exit(1)
@@ -0,0 +1,189 @@
+# H.E.R.O. Remake - Atlas de glifos para el texto
+# PressStart2P es un font de grilla fija (8x8 escalado): cada glifo tiene el
+# mismo avance y no hay kerning, así que un texto es la concatenación exacta
+# de sus glifos. AtlasFont envuelve un pygame.font.Font y arma, la primera vez
+# que se usa cada color, un atlas con los glifos ASCII renderizados una sola
+# vez. Componer un texto es un único Surface.blits con un rect del atlas por
+# letra, sin pasar por el rasterizador TTF. Las líneas compuestas se guardan en
+# un LRU chico: el texto que se repite frame a frame (splash, ingreso de
+# nombre, puntajes flotantes) es un solo blit.
+#
+# - Contorno: un atlas aparte con el contorno de cada glifo precompuesto (el
+#   glifo corrido a todos los offsets). Se dibujan todos los contornos del texto
+#   y encima todos los glifos.
+# - Recoloreo por paleta: un atlas de 8 bits (índice 0 transparente, 1 el
+#   glifo); cambiar el color es cambiar la entrada 1 de la paleta. Lo usa el
+#   "VICTORY!" que cicla colores por letra en cada frame.
+
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+from constants import TEXT_LINE_CACHE_SIZE
+
+# Glifos que van al atlas al crearlo (el resto se agrega al pedirlos)
+GLYPHS = ''.join(chr(code) for code in range(32, 127))
+
+
+class GlyphAtlas:
+    """Glifos de un font en una superficie, de un color. Con outline > 0 cada
+    glifo es su contorno precompuesto, con outline píxeles de margen"""
+
+    def __init__(self, font, color, outline=0):
+        self.font = font
+        self.color = color
+        self.outline = outline
+        glyphs = [self._render(ch) for ch in GLYPHS]
+        width = sum(glyph.get_width() for glyph in glyphs)
+        height = max(glyph.get_height() for glyph in glyphs)
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.rects = {}
+        x = 0
+        for ch, glyph in zip(GLYPHS, glyphs):
+            self.surface.blit(glyph, (x, 0))
+            self.rects[ch] = pygame.Rect(x, 0, glyph.get_width(), glyph.get_height())
+            x += glyph.get_width()
+        self._extra = {}  # glifos fuera del atlas: char -> superficie propia
+
+    def _render(self, ch):
+        glyph = self.font.render(ch, True, self.color)
+        o = self.outline
+        if not o:
+            return glyph
+        contour = pygame.Surface((glyph.get_width() + 2 * o, glyph.get_height() + 2 * o), pygame.SRCALPHA)
+        for dx in range(-o, o + 1):
+            for dy in range(-o, o + 1):
+                if dx or dy:
+                    contour.blit(glyph, (o + dx, o + dy))
+        return contour
+
+    def blit_item(self, ch, x, y):
+        """(superficie, destino, área) del glifo ch con su esquina en (x, y)"""
+        rect = self.rects.get(ch)
+        if rect is not None:
+            return self.surface, (x - self.outline, y - self.outline), rect
+        glyph = self._extra.get(ch)
+        if glyph is None:
+            glyph = self._extra[ch] = self._render(ch)
+        return glyph, (x - self.outline, y - self.outline), glyph.get_rect()
+
+
+class PaletteGlyphs:
+    """Glifos en una superficie de 8 bits: índice 0 transparente, 1 el glifo.
+    Pensado para tamaños múltiplos de 8, donde el font no tiene grises."""
+
+    def __init__(self, atlas):
+        self.rects = atlas.rects
+        coverage = pygame.surfarray.array_alpha(atlas.surface) >= 128
+        self.surface = pygame.Surface(atlas.surface.get_size(), depth=8)
+        self.surface.set_palette([(0, 0, 0), (255, 255, 255)] + [(0, 0, 0)] * 254)
+        pygame.surfarray.blit_array(self.surface, coverage.astype(np.uint8))
+        self.surface.set_colorkey(0)
+
+    def draw(self, target, ch, pos, color):
+        rect = self.rects.get(ch)
+        if rect is None:
+            return
+        self.surface.set_palette_at(1, color)
+        target.blit(self.surface, pos, rect)
+
+
+class AtlasFont:
+    """pygame.font.Font con atlas de glifos por color. Lo que no define se
+    delega al font (get_height, metrics, ...)"""
+
+    def __init__(self, font):
+        self.font = font
+        self._atlases = {}    # (color, outline) -> GlyphAtlas
+        self._advances = {}   # char -> avance en píxeles
+        self._lines = OrderedDict()  # (texto, color, contorno) -> línea compuesta
+        self._palette = None
+
+    def __getattr__(self, name):
+        if name == 'font':  # todavía sin inicializar (copy/pickle)
+            raise AttributeError(name)
+        return getattr(self.font, name)
+
+    def atlas(self, color, outline=0):
+        key = (tuple(color), outline)
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = GlyphAtlas(self.font, color, outline)
+        return atlas
+
+    def _advance(self, ch):
+        advance = self._advances.get(ch)
+        if advance is None:
+            advance = self._advances[ch] = self.font.size(ch)[0]
+        return advance
+
+    def size(self, text):
+        return sum(self._advance(ch) for ch in text), self.font.get_height()
+
+    def _rect(self, text, anchor):
+        """Rect que ocupa text ubicado por un anchor de pygame.Rect (ej. center=(x, y))"""
+        rect = pygame.Rect((0, 0), self.size(text))
+        for name, value in anchor.items():
+            setattr(rect, name, value)
+        return rect
+
+    def _items(self, atlas, text, x, y):
+        items = []
+        for ch in text:
+            items.append(atlas.blit_item(ch, x, y))
+            x += self._advance(ch)
+        return items
+
+    def _line(self, text, color, outline_color=None, outline=0):
+        """Línea compuesta desde el atlas (con outline píxeles de margen si
+        tiene contorno: todos los contornos y encima todos los glifos)"""
+        key = (text, tuple(color), outline_color and tuple(outline_color), outline)
+        line = self._lines.get(key)
+        if line is not None:
+            self._lines.move_to_end(key)
+            return line
+        width, height = self.size(text)
+        line = pygame.Surface((width + 2 * outline, height + 2 * outline), pygame.SRCALPHA)
+        items = []
+        if outline_color is not None:
+            items = self._items(self.atlas(outline_color, outline), text, outline, outline)
+        items += self._items(self.atlas(color), text, outline, outline)
+        line.blits(items, doreturn=False)
+        self._lines[key] = line
+        while len(self._lines) > TEXT_LINE_CACHE_SIZE:
+            self._lines.popitem(last=False)
+        return line
+
+    def draw(self, target, text, color, **anchor):
+        """Dibuja text en target ubicado por anchor; retorna el rect"""
+        line = self._line(text, color)
+        rect = line.get_rect(**anchor)
+        target.blit(line, rect)
+        return rect
+
+    def draw_outlined(self, target, text, color, outline_color, center, outline=1):
+        """Texto con contorno de outline píxeles centrado en center"""
+        line = self._line(text, color, outline_color, outline)
+        rect = line.get_rect(center=center)
+        target.blit(line, rect)
+        return rect.inflate(-2 * outline, -2 * outline)
+
+    def draw_recolored(self, target, text, colors, **anchor):
+        """Cada letra de text con su color de colors (recoloreo por paleta)"""
+        if self._palette is None:
+            self._palette = PaletteGlyphs(self.atlas((255, 255, 255)))
+        rect = self._rect(text, anchor)
+        x = rect.x
+        for ch, color in zip(text, colors):
+            self._palette.draw(target, ch, (x, rect.y), color)
+            x += self._advance(ch)
+        return rect
+
+    def render(self, text, antialias=True, color=(255, 255, 255), background=None):
+        """Como Font.render, pero desde el LRU de líneas compuestas (sin
+        antialias o con fondo se delega al font). Retorna una copia: quien
+        llama puede modificarla (set_alpha en los puntajes flotantes) sin
+        tocar la línea cacheada."""
+        if not antialias or background is not None:
+            return self.font.render(text, antialias, color, background)
+        return self._line(text, color).copy()
@@ -0,0 +1,188 @@
+# H.E.R.O. Remake - TileGrid
+# Mapa del nivel respaldado por un bytearray (reemplaza la lista de strings).
+# Lecturas y escrituras O(1), bitmap de solidez precalculado y anchos por banda
+# cacheados. Mantiene una vista de solo lectura como strings por fila para que
+# el código que espera el formato de screens.json siga funcionando.
+
+from constants import SOLID_TILES, VIEWPORT_ROWS
+
+# Tabla de lookup: byte del tile -> 1 si es sólido
+_SOLID_LUT = bytes(1 if chr(i) in SOLID_TILES else 0 for i in range(256))
+
+# Relleno de celdas fuera del ancho de la fila (bandas angostas en mapas jagged)
+_PAD = ord(' ')
+
+
+class TileGrid:
+    """Grilla de tiles de ancho variable por fila.
+
+    Las celdas se guardan en un bytearray de alto x ancho máximo (stride fijo).
+    Las celdas más allá del ancho de su fila existen solo como relleno: para
+    colisiones cuentan como sólidas y tile() retorna None.
+    """
+
+    def __init__(self, rows):
+        rows = [str(r) for r in rows]
+        self.height = len(rows)
+        self._widths = [len(r) for r in rows]
+        self.max_width = max(self._widths) if rows else 0
+        self._stride = max(self.max_width, 1)
+
+        self._cells = bytearray(bytes([_PAD]) * (self.height * self._stride))
+        # Bitmap de solidez: 1 = sólido (incluye relleno fuera de la fila)
+        self._solid = bytearray(b'\x01' * (self.height * self._stride))
+        for r, row in enumerate(rows):
+            base = r * self._stride
+            data = row.encode('ascii', 'replace')
+            self._cells[base:base + len(data)] = data
+            self._solid[base:base + len(data)] = data.translate(_SOLID_LUT)
+
+        # Ancho de la banda de cada fila (primera fila de la banda de VIEWPORT_ROWS)
+        self._band_widths = []
+        for r in range(self.height):
+            band_start = (r // VIEWPORT_ROWS) * VIEWPORT_ROWS
+            self._band_widths.append(self._widths[band_start])
+
+        # Cache de strings por fila (vista de solo lectura)
+        self._row_cache = list(rows)
+        self._listeners = []
+        self._derived = {}
+
+    @classmethod
+    def _from_parts(cls, height, widths, max_width, stride, cells, solid, band_widths):
+        grid = cls.__new__(cls)
+        grid.height = height
+        grid._widths = widths
+        grid.max_width = max_width
+        grid._stride = stride
+        grid._cells = cells
+        grid._solid = solid
+        grid._band_widths = band_widths
+        grid._row_cache = [None] * height
+        grid._listeners = []
+        grid._derived = {}
+        return grid
+
+    # --- Vista de strings (compatibilidad con la lista de strings) ---
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.height
+        if not 0 <= row < self.height:
+            raise IndexError("fila fuera de rango")
+        cached = self._row_cache[row]
+        if cached is None:
+            base = row * self._stride
+            cached = self._cells[base:base + self._widths[row]].decode('ascii')
+            self._row_cache[row] = cached
+        return cached
+
+    def __iter__(self):
+        for r in range(self.height):
+            yield self[r]
+
+    def to_rows(self):
+        """Retorna el mapa como lista de strings (formato de screens.json)"""
+        return [self[r] for r in range(self.height)]
+
+    def copy(self):
+        """Copia independiente de la grilla (las filas se copian en bloque).
+        Los listeners y las estructuras derivadas no se copian."""
+        return TileGrid._from_parts(self.height, list(self._widths), self.max_width,
+                                    self._stride, bytearray(self._cells),
+                                    bytearray(self._solid), list(self._band_widths))
+
+    def cell_bytes(self):
+        """(celdas, stride): vista sin copia de los bytes de la grilla, fila por
+        fila de stride bytes (relleno incluido), para volcarla de una vez"""
+        return memoryview(self._cells), self._stride
+
+    def solid_bytes(self):
+        """(sólidos, stride): vista sin copia del bitmap de solidez (1 = sólido,
+        el relleno fuera del ancho de cada fila incluido), fila por fila"""
+        return memoryview(self._solid), self._stride
+
+    # --- Anchos ---
+
+    def row_width(self, row):
+        """Ancho en tiles de una fila (0 si la fila no existe)"""
+        if 0 <= row < self.height:
+            return self._widths[row]
+        return 0
+
+    def band_width(self, row):
+        """Ancho en tiles de la banda que contiene la fila (clampeada al mapa)"""
+        if self.height == 0:
+            return 0
+        if row < 0:
+            row = 0
+        elif row >= self.height:
+            row = self.height - 1
+        return self._band_widths[row]
+
+    # --- Acceso a tiles ---
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self._widths[row]
+
+    def tile(self, row, col):
+        """Caracter del tile, o None si está fuera del mapa"""
+        if 0 <= row < self.height and 0 <= col < self._widths[row]:
+            return chr(self._cells[row * self._stride + col])
+        return None
+
+    def is_solid(self, row, col):
+        """True si el tile es sólido. Fuera de límites cuenta como sólido."""
+        if 0 <= row < self.height and 0 <= col < self._stride:
+            return self._solid[row * self._stride + col] == 1
+        return True
+
+    def set(self, row, col, char):
+        """Cambia un tile en O(1). Retorna el caracter anterior."""
+        if not (0 <= row < self.height and 0 <= col < self._widths[row]):
+            raise IndexError("tile fuera del mapa")
+        idx = row * self._stride + col
+        old = chr(self._cells[idx])
+        code = ord(char)
+        self._cells[idx] = code
+        self._solid[idx] = _SOLID_LUT[code]
+        self._row_cache[row] = None
+        for listener in self._listeners:
+            listener(row, col, old, char)
+        return old
+
+    # --- Estructuras derivadas (se actualizan solas con set) ---
+
+    def add_listener(self, listener):
+        """Registra listener(row, col, old_char, new_char), llamado en cada set()"""
+        self._listeners.append(listener)
+
+    def derived(self, name, factory):
+        """Estructura derivada del mapa, creada una vez con factory(grid) y
+        cacheada en la grilla. La fábrica debe registrar un listener si
+        necesita enterarse de los cambios."""
+        value = self._derived.get(name)
+        if value is None:
+            value = factory(self)
+            self._derived[name] = value
+        return value
+
+    def find(self, chars):
+        """Itera (row, col, char) de todos los tiles cuyo caracter está en chars"""
+        codes = {ord(c) for c in chars}
+        cells = self._cells
+        for r in range(self.height):
+            base = r * self._stride
+            for c in range(self._widths[r]):
+                if cells[base + c] in codes:
+                    yield r, c, chr(cells[base + c])
+
+
+def as_grid(level_map):
+    """Acepta un TileGrid o una lista de strings y retorna un TileGrid"""
+    if isinstance(level_map, TileGrid):
+        return level_map
+    return TileGrid(level_map or [])
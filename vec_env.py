@@ -0,0 +1,323 @@
+# H.E.R.O. Remake - Entornos vectorizados (simulación masiva)
+# HeroVecEnv avanza N instancias independientes de Game al mismo paso. Las
+# instancias se reparten entre procesos worker; cada paso recibe un lote de
+# acciones (move_x, thrust, dive, shoot, bomb) y las observaciones compactas
+# (grilla de tiles, entidades, energía, vidas...) vuelven por memoria
+# compartida, sin pickle. No se dibuja nada salvo que se pida con render().
+# Pensado para correr miles de partidas simuladas al balancear niveles.
+
+import multiprocessing
+import traceback
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from constants import (
+    SIM_DT, VEC_ENV_MAX_ENTITIES,
+    STATE_SPLASH, STATE_PLAYING, STATE_GAME_OVER, STATE_ENTERING_NAME,
+    STATE_LEVEL_COMPLETE, STATE_DYING,
+)
+
+# Columnas del lote de acciones
+ACTION_MOVE_X = 0   # -1.0 (izquierda) .. 1.0 (derecha), como el eje X del joystick
+ACTION_THRUST = 1   # 0.0 .. 1.0, propulsor
+ACTION_DIVE = 2     # 0.0 .. 1.0, bajar rápido
+ACTION_SHOOT = 3    # > 0.5 dispara el láser (respeta el cooldown)
+ACTION_BOMB = 4     # > 0.5 suelta una dinamita (cada paso con bomb es un toque)
+NUM_ACTIONS = 5
+
+# Columnas de obs['scalars']
+SCALAR_FIELDS = ('player_x', 'player_y', 'vel_x', 'vel_y', 'grounded',
+                 'energy', 'lives', 'dynamite', 'score', 'level', 'state')
+
+# Estados del juego en obs['scalars'][:, 'state'] (índice en esta tupla)
+STATES = (STATE_SPLASH, STATE_PLAYING, STATE_GAME_OVER, STATE_ENTERING_NAME,
+          STATE_LEVEL_COMPLETE, STATE_DYING)
+
+# Filas de obs['entities']: (tipo, x, y, ancho); tipo 0 = fila vacía
+ENTITY_KINDS = {'bat': 1, 'spider': 2, 'bug': 3, 'snake_left': 4, 'snake_right': 5,
+                'miner': 6, 'laser': 7, 'dynamite': 8}
+ENTITY_FIELDS = 4
+
+
+def _array_specs(num_envs, grid_h, grid_w):
+    """Nombre -> (shape, dtype) de cada bloque de memoria compartida"""
+    return {
+        'actions': ((num_envs, NUM_ACTIONS), np.float32),
+        'tiles': ((num_envs, grid_h, grid_w), np.uint8),
+        'entities': ((num_envs, VEC_ENV_MAX_ENTITIES, ENTITY_FIELDS), np.float32),
+        'entity_count': ((num_envs,), np.int32),
+        'scalars': ((num_envs, len(SCALAR_FIELDS)), np.float32),
+        'dones': ((num_envs,), np.bool_),
+    }
+
+
+def _attach(layout):
+    """Abre los bloques compartidos de layout {nombre: (shm_name, shape, dtype)}.
+    Retorna (lista de SharedMemory, {nombre: ndarray})"""
+    shms = []
+    arrays = {}
+    for name, (shm_name, shape, dtype) in layout.items():
+        shm = SharedMemory(name=shm_name)
+        shms.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return shms, arrays
+
+
+##################################################################################################
+# Lado worker
+##################################################################################################
+
+def _apply_action(game, action):
+    """Traduce una fila de acciones al camino de input de Player.update
+    (keys + ejes del joystick) y a las acciones del juego"""
+    game.joy_axis_x = float(action[ACTION_MOVE_X])
+    # Eje Y del joystick: negativo = propulsor, positivo = bajar
+    game.joy_axis_y = float(action[ACTION_DIVE]) - float(action[ACTION_THRUST])
+    if game.state == STATE_PLAYING:
+        if action[ACTION_SHOOT] > 0.5:
+            game.shoot_laser()
+        if action[ACTION_BOMB] > 0.5:
+            game.drop_dynamite()
+
+
+def _write_obs(game, i, arrays):
+    """Vuelca el estado compacto de game en la fila i de los arrays compartidos"""
+    tiles = arrays['tiles'][i]
+    tiles.fill(0)  # 0 = fuera del mapa
+    grid = game.level_map
+    if grid:
+        cells, stride = grid.cell_bytes()
+        rows = np.frombuffer(cells, dtype=np.uint8).reshape(grid.height, stride)
+        h = min(grid.height, tiles.shape[0])
+        w = min(stride, tiles.shape[1])
+        tiles[:h, :w] = rows[:h, :w]
+
+    rows = []
+    for enemy in game.enemies:
+        if enemy.active:
+            rows.append((ENTITY_KINDS.get(enemy.enemy_type, 0), enemy.x, enemy.y, enemy.width))
+    if game.miner:
+        rows.append((ENTITY_KINDS['miner'], game.miner.x, game.miner.y, game.miner.width))
+    for laser in game.lasers:
+        if laser.active:
+            rows.append((ENTITY_KINDS['laser'], laser.x, laser.y, laser.width))
+    for dynamite in game.dynamites:
+        if dynamite.active:
+            rows.append((ENTITY_KINDS['dynamite'], dynamite.x, dynamite.y, dynamite.width))
+    del rows[VEC_ENV_MAX_ENTITIES:]
+    entities = arrays['entities'][i]
+    entities.fill(0)
+    if rows:
+        entities[:len(rows)] = rows
+    arrays['entity_count'][i] = len(rows)
+
+    player = game.player
+    scalars = arrays['scalars'][i]
+    if player:
+        scalars[0:5] = (player.x, player.y, player.vel_x, player.vel_y, player.is_grounded)
+    else:
+        scalars[0:5] = 0
+    scalars[5:] = (game.energy, game.lives, game.dynamite_count, game.score,
+                   game.level_num, STATES.index(game.state))
+
+
+def _worker(conn, env_ids, start_levels, layout):
+    """Proceso worker: dueño de las instancias de Game en env_ids"""
+    shms, arrays = _attach(layout)
+    try:
+        import pygame
+        from hero import Game
+        from headless import HeldKeys
+
+        no_keys = HeldKeys()
+        games = []
+        for level in start_levels:
+            game = Game()
+            game.init(headless=True)
+            game.start_new_game(level)
+            games.append(game)
+
+        def reset(k):
+            games[k].start_new_game(start_levels[k])
+            _write_obs(games[k], env_ids[k], arrays)
+
+        for k in range(len(games)):
+            _write_obs(games[k], env_ids[k], arrays)
+        conn.send(('ok', None))
+
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == 'step':
+                frame_skip = arg
+                dones = arrays['dones']
+                for k, game in enumerate(games):
+                    i = env_ids[k]
+                    game.keys = no_keys
+                    _apply_action(game, arrays['actions'][i])
+                    for _ in range(frame_skip):
+                        game.step(SIM_DT)
+                        if game.state in (STATE_SPLASH, STATE_ENTERING_NAME):
+                            break
+                    # Fin de partida (game over o victoria): se reinicia sola
+                    dones[i] = game.state in (STATE_SPLASH, STATE_ENTERING_NAME)
+                    if dones[i]:
+                        reset(k)
+                    else:
+                        _write_obs(game, i, arrays)
+                # Sin display nadie consume la cola de eventos
+                pygame.event.clear()
+                conn.send(('ok', None))
+            elif cmd == 'reset':
+                for k in range(len(games)):
+                    reset(k)
+                    arrays['dones'][env_ids[k]] = False
+                conn.send(('ok', None))
+            elif cmd == 'render':
+                game = games[env_ids.index(arg)]
+                game.render_frame()
+                pixels = pygame.surfarray.array3d(game.game_surface).swapaxes(0, 1)
+                conn.send(('ok', pixels))
+            elif cmd == 'close':
+                break
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        del arrays
+        for shm in shms:
+            shm.close()
+        conn.close()
+
+
+##################################################################################################
+# Lado principal
+##################################################################################################
+
+class HeroVecEnv:
+    """N partidas independientes avanzando al mismo paso en un pool de procesos.
+
+    levels: nivel inicial (0-based) de cada entorno; su largo es N.
+    workers: procesos a usar (default: uno por CPU, como --build-cache).
+    frame_skip: pasos de simulación (SIM_DT) por step(), repitiendo la acción.
+
+    obs es un dict de arrays numpy sobre la memoria compartida (se sobrescriben
+    en cada step; copiar lo que se quiera conservar):
+      tiles        (N, alto, ancho) uint8, byte del caracter de cada tile (0 = fuera del mapa)
+      entities     (N, VEC_ENV_MAX_ENTITIES, 4) float32, filas (tipo, x, y, ancho)
+      entity_count (N,) int32
+      scalars      (N, len(SCALAR_FIELDS)) float32
+    """
+
+    def __init__(self, levels, workers=None, frame_skip=1, context='spawn'):
+        from hero import LEVELS
+
+        self.num_envs = len(levels)
+        self.frame_skip = max(1, int(frame_skip))
+        # La grilla de la observación es la más grande de los niveles usados
+        maps = [LEVELS[level] for level in levels if 0 <= level < len(LEVELS)] or [[]]
+        grid_h = max(len(rows) for rows in maps)
+        grid_w = max((len(row) for rows in maps for row in rows), default=0)
+
+        self._shms = []
+        self._arrays = {}
+        layout = {}
+        for name, (shape, dtype) in _array_specs(self.num_envs, grid_h, grid_w).items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            shm = SharedMemory(create=True, size=size)
+            self._shms.append(shm)
+            self._arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            self._arrays[name].fill(0)
+            layout[name] = (shm.name, shape, dtype)
+
+        workers = min(workers or multiprocessing.cpu_count(), self.num_envs) or 1
+        ctx = multiprocessing.get_context(context)
+        self._conns = []
+        self._procs = []
+        self._shards = []
+        for env_ids in np.array_split(np.arange(self.num_envs), workers):
+            env_ids = [int(i) for i in env_ids]
+            if not env_ids:
+                continue
+            parent_conn, child_conn = ctx.Pipe()
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(child_conn, env_ids, [levels[i] for i in env_ids], layout))
+            proc.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._procs.append(proc)
+            self._shards.append(env_ids)
+        self._closed = False
+        self._gather()
+
+    @property
+    def obs(self):
+        return {name: self._arrays[name]
+                for name in ('tiles', 'entities', 'entity_count', 'scalars')}
+
+    def _gather(self):
+        """Espera la respuesta de todos los workers; retorna sus resultados"""
+        results = []
+        for conn in self._conns:
+            status, payload = conn.recv()
+            if status == 'error':
+                self.close()
+                raise RuntimeError(f"Worker de HeroVecEnv falló:\n{payload}")
+            results.append(payload)
+        return results
+
+    def reset(self):
+        """Reinicia todas las partidas en su nivel inicial. Retorna obs."""
+        for conn in self._conns:
+            conn.send(('reset', None))
+        self._gather()
+        return self.obs
+
+    def step(self, actions):
+        """Avanza todas las partidas con actions (N, NUM_ACTIONS).
+        Retorna (obs, dones); un entorno con done ya fue reiniciado y obs
+        muestra su partida nueva."""
+        self._arrays['actions'][:] = actions
+        for conn in self._conns:
+            conn.send(('step', self.frame_skip))
+        self._gather()
+        return self.obs, self._arrays['dones']
+
+    def render(self, index):
+        """Dibuja el entorno index y retorna sus píxeles (alto, ancho, 3) uint8"""
+        for conn, env_ids in zip(self._conns, self._shards):
+            if index in env_ids:
+                conn.send(('render', index))
+                status, payload = conn.recv()
+                if status == 'error':
+                    self.close()
+                    raise RuntimeError(f"Worker de HeroVecEnv falló:\n{payload}")
+                return payload
+        raise IndexError("entorno fuera de rango")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for conn in self._conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._arrays = {}
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()